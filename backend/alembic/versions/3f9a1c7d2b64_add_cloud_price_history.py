@@ -0,0 +1,85 @@
+"""add_cloud_price_history
+
+Revision ID: 3f9a1c7d2b64
+Revises: bde05dbdad35
+Create Date: 2026-10-19 10:12:41.118204
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c7d2b64'
+down_revision = 'bde05dbdad35'
+branch_labels = None
+depends_on = None
+
+
+def _create_price_history_table() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.create_table(
+        "cloud_price_history",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("vendor", sa.String(length=16), nullable=False),
+        sa.Column("sku_id", sa.Text(), nullable=False),
+        sa.Column("source_api", sa.String(length=64), nullable=False),
+        sa.Column("price_per_unit", sa.Numeric(precision=20, scale=10), nullable=False),
+        sa.Column("price_per_hour", sa.Numeric(precision=20, scale=10), nullable=True),
+        sa.Column("unit", sa.Text(), nullable=False),
+        sa.Column("currency", sa.String(length=8), nullable=False),
+        sa.Column("valid_during", postgresql.TSTZRANGE(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        postgresql.ExcludeConstraint(
+            (sa.column("vendor"), "="),
+            (sa.column("sku_id"), "="),
+            (sa.column("source_api"), "="),
+            (sa.column("valid_during"), "&&"),
+            name="ex_price_history_no_overlap",
+            using="gist",
+        ),
+    )
+
+
+def _backfill_open_rows() -> None:
+    # Seed one open row per existing SKU so lookups work before the next sync.
+    op.execute(
+        """
+        INSERT INTO cloud_price_history (
+            id, vendor, sku_id, source_api, price_per_unit, price_per_hour, unit,
+            currency, valid_during, created_at
+        )
+        SELECT
+            gen_random_uuid(), vendor, sku_id, source_api, price_per_unit, price_per_hour,
+            unit, currency, tstzrange(LEAST(COALESCE(effective_date, updated_at), updated_at), NULL), now()
+        FROM cloud_pricing
+        """
+    )
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        _create_price_history_table()
+        _backfill_open_rows()
+        return
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table("cloud_price_history"):
+        _create_price_history_table()
+        if inspector.has_table("cloud_pricing"):
+            _backfill_open_rows()
+
+
+def downgrade() -> None:
+    if context.is_offline_mode():
+        op.drop_table("cloud_price_history")
+        return
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if inspector.has_table("cloud_price_history"):
+        op.drop_table("cloud_price_history")
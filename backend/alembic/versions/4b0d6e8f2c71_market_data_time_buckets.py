@@ -0,0 +1,68 @@
+"""market_data_time_buckets
+
+Revision ID: 4b0d6e8f2c71
+Revises: e2b8f05c6a19
+Create Date: 2026-10-19 14:22:03.557190
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '4b0d6e8f2c71'
+down_revision = 'e2b8f05c6a19'
+branch_labels = None
+depends_on = None
+
+_UNIQUE = "uq_market_data_bucket"
+_INDEX = "ix_market_data_granularity_timestamp"
+
+
+def _inspect() -> tuple[set[str], set[str]] | None:
+    """(column names, index/constraint names) on market_data; None when the table is missing."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("market_data"):
+        return None
+    columns = {c["name"] for c in inspector.get_columns("market_data")}
+    names = {i["name"] for i in inspector.get_indexes("market_data")}
+    names |= {u["name"] for u in inspector.get_unique_constraints("market_data")}
+    return columns, names
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        columns, names = set(), set()
+    else:
+        state = _inspect()
+        if state is None:
+            return
+        columns, names = state
+
+    # Existing rows become one-sample hourly observations.
+    if "granularity" not in columns:
+        op.add_column("market_data", sa.Column("granularity", sa.String(length=8), nullable=False, server_default="hour"))
+    if "sample_count" not in columns:
+        op.add_column("market_data", sa.Column("sample_count", sa.Integer(), nullable=False, server_default="1"))
+    if _UNIQUE not in names:
+        op.create_unique_constraint(_UNIQUE, "market_data", ["name", "category", "granularity", "timestamp"])
+    if _INDEX not in names:
+        op.create_index(_INDEX, "market_data", ["granularity", "timestamp"], unique=False)
+
+
+def downgrade() -> None:
+    if context.is_offline_mode():
+        columns, names = {"granularity", "sample_count"}, {_UNIQUE, _INDEX}
+    else:
+        state = _inspect()
+        if state is None:
+            return
+        columns, names = state
+
+    if _INDEX in names:
+        op.drop_index(_INDEX, table_name="market_data")
+    if _UNIQUE in names:
+        op.drop_constraint(_UNIQUE, "market_data", type_="unique")
+    if "sample_count" in columns:
+        op.drop_column("market_data", "sample_count")
+    if "granularity" in columns:
+        op.drop_column("market_data", "granularity")
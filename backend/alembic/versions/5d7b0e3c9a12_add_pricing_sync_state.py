@@ -0,0 +1,45 @@
+"""add_pricing_sync_state
+
+Revision ID: 5d7b0e3c9a12
+Revises: 8c2e5d71a9f0
+Create Date: 2026-10-19 11:48:05.302771
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5d7b0e3c9a12'
+down_revision = '8c2e5d71a9f0'
+branch_labels = None
+depends_on = None
+
+
+def _create_pricing_sync_state_table() -> None:
+    op.create_table(
+        "pricing_sync_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("generation", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        _create_pricing_sync_state_table()
+        return
+
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("pricing_sync_state"):
+        _create_pricing_sync_state_table()
+
+
+def downgrade() -> None:
+    if context.is_offline_mode():
+        op.drop_table("pricing_sync_state")
+        return
+
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("pricing_sync_state"):
+        op.drop_table("pricing_sync_state")
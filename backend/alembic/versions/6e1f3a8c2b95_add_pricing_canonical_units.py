@@ -0,0 +1,142 @@
+"""add_pricing_canonical_units
+
+Revision ID: 6e1f3a8c2b95
+Revises: 9a3c5e7b1d04
+Create Date: 2026-10-19 16:22:09.417380
+
+"""
+import re
+from fractions import Fraction
+from typing import Optional
+
+from alembic import op, context
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '6e1f3a8c2b95'
+down_revision = '9a3c5e7b1d04'
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (
+    sa.Column("unit_dimension", sa.String(length=16), nullable=True),
+    sa.Column("canonical_unit", sa.String(length=16), nullable=True),
+    sa.Column("canonical_price", sa.Numeric(precision=20, scale=10), nullable=True),
+)
+_INDEX = "ix_cloud_pricing_vendor_dimension_price"
+
+# Snapshot of app.pricing.units as of this revision, so the backfill always
+# produces the same data however that table evolves later.
+_HOURS_PER_MONTH = 730
+_CANONICAL_UNITS = {"time": "hour", "storage": "GB-month", "transfer": "GB", "request": "request"}
+_SPELLINGS = (
+    ("time", Fraction(1), ("h", "hr", "hour")),
+    ("time", Fraction(1, 60), ("min", "minute")),
+    ("time", Fraction(1, 3600), ("sec", "second")),
+    ("time", Fraction(24), ("day",)),
+    ("time", Fraction(_HOURS_PER_MONTH), ("mo", "month")),
+    ("storage", Fraction(1), ("gbmo", "gbmonth", "gibmo", "gibmonth", "gibymo", "gibibytemonth", "gigabytemonth")),
+    ("storage", Fraction(1024), ("tbmo", "tbmonth", "tibmo", "tibymo")),
+    ("storage", Fraction(1, _HOURS_PER_MONTH), ("gbh", "gbhr", "gbhour", "gibyh", "gibhour")),
+    ("transfer", Fraction(1), ("gb", "gib", "giby", "gigabyte", "gibibyte")),
+    ("transfer", Fraction(1024), ("tb", "tib", "tiby", "terabyte")),
+    ("transfer", Fraction(1, 1024), ("mb", "mib", "miby", "megabyte")),
+    ("request", Fraction(1), ("", "request", "req", "count", "call", "operation", "op", "query", "queries")),
+)
+_BASE_UNITS = {spelling: (dimension, factor) for dimension, factor, spellings in _SPELLINGS for spelling in spellings}
+_MULTIPLIERS = {"": 1, "k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+_UNIT_RE = re.compile(r"^\s*(?:(?P<qty>\d[\d,]*(?:\.\d+)?)\s*(?P<mult>[kmb])?(?![a-z]))?\s*(?P<base>.*)$")
+_STRIP_RE = re.compile(r"\(s\)|[\s\-/.]")
+
+
+def _canonicalize(unit: Optional[str]) -> Optional[tuple[str, str, Fraction]]:
+    """(dimension, canonical unit, canonical units per raw unit); None if unrecognised."""
+    if not unit or not unit.strip():
+        return None
+    match = _UNIT_RE.match(unit.lower())
+    qty, mult, base = match.group("qty"), match.group("mult") or "", match.group("base")
+    key = _STRIP_RE.sub("", base)
+    if key.startswith("per"):
+        key = key[3:]
+    if key not in _BASE_UNITS and key.endswith("s"):
+        key = key[:-1]
+    if key not in _BASE_UNITS or (key == "" and qty is None):
+        return None
+    dimension, factor = _BASE_UNITS[key]
+    if qty is not None:
+        factor *= Fraction(qty.replace(",", "")) * _MULTIPLIERS[mult]
+    if factor <= 0:
+        return None
+    return dimension, _CANONICAL_UNITS[dimension], factor
+
+
+_BACKFILL = sa.text(
+    """
+    UPDATE cloud_pricing
+    SET unit_dimension = :dimension,
+        canonical_unit = :canonical_unit,
+        canonical_price = price_per_unit * :den / :num,
+        price_per_hour = CASE WHEN :dimension = 'time' THEN price_per_unit * :den / :num END
+    WHERE unit IS NOT DISTINCT FROM :unit
+    """
+)
+
+
+def _backfill() -> None:
+    """One UPDATE per distinct raw unit; there are only a few hundred of them."""
+    bind = op.get_bind()
+    units = bind.execute(sa.text("SELECT DISTINCT unit FROM cloud_pricing")).scalars().all()
+    for unit in units:
+        canonical = _canonicalize(unit)
+        if canonical is None:
+            # Unknown units were never comparable; drop any stale hourly price too.
+            bind.execute(sa.text("UPDATE cloud_pricing SET price_per_hour = NULL WHERE unit IS NOT DISTINCT FROM :unit"), {"unit": unit})
+            continue
+        dimension, canonical_unit, factor = canonical
+        bind.execute(
+            _BACKFILL,
+            {
+                "unit": unit,
+                "dimension": dimension,
+                "canonical_unit": canonical_unit,
+                "num": factor.numerator,
+                "den": factor.denominator,
+            },
+        )
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        for column in _COLUMNS:
+            op.add_column("cloud_pricing", column.copy())
+        op.create_index(_INDEX, "cloud_pricing", ["vendor", "unit_dimension", "canonical_price"], unique=False)
+        return
+
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("cloud_pricing"):
+        return
+    existing = {column["name"] for column in inspector.get_columns("cloud_pricing")}
+    for column in _COLUMNS:
+        if column.name not in existing:
+            op.add_column("cloud_pricing", column.copy())
+    if _INDEX not in {index["name"] for index in inspector.get_indexes("cloud_pricing")}:
+        op.create_index(_INDEX, "cloud_pricing", ["vendor", "unit_dimension", "canonical_price"], unique=False)
+    _backfill()
+
+
+def downgrade() -> None:
+    if context.is_offline_mode():
+        op.drop_index(_INDEX, table_name="cloud_pricing")
+        for column in _COLUMNS:
+            op.drop_column("cloud_pricing", column.name)
+        return
+
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("cloud_pricing"):
+        return
+    if _INDEX in {index["name"] for index in inspector.get_indexes("cloud_pricing")}:
+        op.drop_index(_INDEX, table_name="cloud_pricing")
+    existing = {column["name"] for column in inspector.get_columns("cloud_pricing")}
+    for column in _COLUMNS:
+        if column.name in existing:
+            op.drop_column("cloud_pricing", column.name)
@@ -0,0 +1,44 @@
+"""add_pricing_instance_type_lower_index
+
+Revision ID: 8c2e5d71a9f0
+Revises: 3f9a1c7d2b64
+Create Date: 2026-10-19 11:03:27.540118
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8c2e5d71a9f0'
+down_revision = '3f9a1c7d2b64'
+branch_labels = None
+depends_on = None
+
+_INDEX_NAME = "ix_cloud_pricing_vendor_lower_instance_type"
+
+
+def _index_exists(inspector: sa.Inspector, table_name: str, index_name: str) -> bool:
+    return any(index["name"] == index_name for index in inspector.get_indexes(table_name))
+
+
+def upgrade() -> None:
+    if not context.is_offline_mode():
+        inspector = sa.inspect(op.get_bind())
+        if not inspector.has_table("cloud_pricing") or _index_exists(inspector, "cloud_pricing", _INDEX_NAME):
+            return
+
+    op.create_index(
+        _INDEX_NAME,
+        "cloud_pricing",
+        ["vendor", sa.text("lower(instance_type)")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    if not context.is_offline_mode():
+        inspector = sa.inspect(op.get_bind())
+        if not inspector.has_table("cloud_pricing") or not _index_exists(inspector, "cloud_pricing", _INDEX_NAME):
+            return
+
+    op.drop_index(_INDEX_NAME, table_name="cloud_pricing")
@@ -0,0 +1,54 @@
+"""add_pricing_sync_runs
+
+Revision ID: 9a3c5e7b1d04
+Revises: 4b0d6e8f2c71
+Create Date: 2026-10-19 15:03:48.921644
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '9a3c5e7b1d04'
+down_revision = '4b0d6e8f2c71'
+branch_labels = None
+depends_on = None
+
+
+def _create_pricing_sync_runs_table() -> None:
+    op.create_table(
+        "pricing_sync_runs",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("phase", sa.String(length=16), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("records_seen", sa.Integer(), nullable=True),
+        sa.Column("rows_affected", sa.Integer(), nullable=True),
+        sa.Column("sources", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_pricing_sync_runs_status"), "pricing_sync_runs", ["status"], unique=False)
+    op.create_index("ix_pricing_sync_runs_started_at_id", "pricing_sync_runs", ["started_at", "id"], unique=False)
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        _create_pricing_sync_runs_table()
+        return
+
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("pricing_sync_runs"):
+        _create_pricing_sync_runs_table()
+
+
+def downgrade() -> None:
+    if context.is_offline_mode():
+        op.drop_table("pricing_sync_runs")
+        return
+
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("pricing_sync_runs"):
+        op.drop_table("pricing_sync_runs")
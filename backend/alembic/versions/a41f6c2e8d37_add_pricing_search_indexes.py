@@ -0,0 +1,75 @@
+"""add_pricing_search_indexes
+
+Revision ID: a41f6c2e8d37
+Revises: 5d7b0e3c9a12
+Create Date: 2026-10-19 12:26:50.814533
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a41f6c2e8d37'
+down_revision = '5d7b0e3c9a12'
+branch_labels = None
+depends_on = None
+
+_TRGM_COLUMNS = ("region", "instance_type", "service_name")
+_SEARCH_INDEX = "ix_cloud_pricing_search_tsv"
+_SEARCH_DOCUMENT = (
+    "to_tsvector('simple'::regconfig, "
+    "coalesce(service_name, '') || ' ' || coalesce(description, '') || ' ' || coalesce(instance_type, ''))"
+)
+
+
+def _existing_indexes() -> set[str] | None:
+    """Index names on cloud_pricing; None when the table is missing (nothing to do)."""
+    if context.is_offline_mode():
+        return set()
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("cloud_pricing"):
+        return None
+    return {index["name"] for index in inspector.get_indexes("cloud_pricing")}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    existing = _existing_indexes()
+    if existing is None:
+        return
+
+    for column in _TRGM_COLUMNS:
+        name = f"ix_cloud_pricing_{column}_trgm"
+        if name not in existing:
+            op.create_index(
+                name,
+                "cloud_pricing",
+                [column],
+                unique=False,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+
+    if _SEARCH_INDEX not in existing:
+        op.create_index(
+            _SEARCH_INDEX,
+            "cloud_pricing",
+            [sa.text(_SEARCH_DOCUMENT)],
+            unique=False,
+            postgresql_using="gin",
+        )
+
+
+def downgrade() -> None:
+    names = (_SEARCH_INDEX, *(f"ix_cloud_pricing_{c}_trgm" for c in _TRGM_COLUMNS))
+    if context.is_offline_mode():
+        for name in names:
+            op.drop_index(name, table_name="cloud_pricing")
+        return
+
+    existing = _existing_indexes()
+    if existing is None:
+        return
+    for name in names:
+        if name in existing:
+            op.drop_index(name, table_name="cloud_pricing")
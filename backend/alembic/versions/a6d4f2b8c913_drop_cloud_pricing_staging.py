@@ -0,0 +1,27 @@
+"""drop_cloud_pricing_staging
+
+Revision ID: a6d4f2b8c913
+Revises: e5c9a1d7f246
+Create Date: 2026-10-20 11:04:52.730166
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a6d4f2b8c913'
+down_revision = 'e5c9a1d7f246'
+branch_labels = None
+depends_on = None
+
+# Bulk syncs now stage into a per-transaction temp table; drop the shared
+# unlogged table that older code created on first use.
+_TABLE = "cloud_pricing_staging"
+
+
+def upgrade() -> None:
+    op.execute(f"DROP TABLE IF EXISTS {_TABLE}")
+
+
+def downgrade() -> None:
+    # Code from before this revision creates the table itself on first sync.
+    pass
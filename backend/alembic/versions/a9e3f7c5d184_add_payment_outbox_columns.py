@@ -0,0 +1,51 @@
+"""add_payment_outbox_columns
+
+Revision ID: a9e3f7c5d184
+Revises: f8b4d2a6c319
+Create Date: 2026-10-19 19:26:44.730518
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a9e3f7c5d184'
+down_revision = 'f8b4d2a6c319'
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (
+    sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+    sa.Column("last_error", sa.Text(), nullable=True),
+)
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        for column in _COLUMNS:
+            op.add_column("payments", column.copy())
+        return
+
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("payments"):
+        return
+    existing = {column["name"] for column in inspector.get_columns("payments")}
+    for column in _COLUMNS:
+        if column.name not in existing:
+            op.add_column("payments", column.copy())
+
+
+def downgrade() -> None:
+    if context.is_offline_mode():
+        for column in _COLUMNS:
+            op.drop_column("payments", column.name)
+        return
+
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("payments"):
+        return
+    existing = {column["name"] for column in inspector.get_columns("payments")}
+    for column in _COLUMNS:
+        if column.name in existing:
+            op.drop_column("payments", column.name)
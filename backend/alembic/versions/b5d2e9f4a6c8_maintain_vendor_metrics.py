@@ -0,0 +1,143 @@
+"""maintain_vendor_metrics
+
+Revision ID: b5d2e9f4a6c8
+Revises: 6e1f3a8c2b95
+Create Date: 2026-10-19 17:05:41.552093
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b5d2e9f4a6c8'
+down_revision = '6e1f3a8c2b95'
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (
+    sa.Column("invoice_total_sum", sa.Numeric(), nullable=False, server_default=sa.text("0")),
+    sa.Column("invoice_total_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    sa.Column("confidence_sum", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+)
+
+# The trigger and backfill as of this revision. Kept literal so the revision
+# does not change with app.models.invoice / app.repositories.vendor.
+_APPLY_VENDOR_METRICS = """
+CREATE OR REPLACE FUNCTION apply_vendor_invoice_metrics(
+    vid uuid, d_count integer, d_sum numeric, d_totals integer, d_conf bigint
+) RETURNS void AS $$
+    UPDATE vendors SET
+        invoice_count = invoice_count + d_count,
+        invoice_total_sum = invoice_total_sum + d_sum,
+        invoice_total_count = invoice_total_count + d_totals,
+        confidence_sum = confidence_sum + d_conf,
+        avg_invoice_amount = (invoice_total_sum + d_sum) / NULLIF(invoice_total_count + d_totals, 0),
+        trust_score = CASE
+            WHEN invoice_count + d_count <= 0 THEN 0.5
+            ELSE LEAST(GREATEST((confidence_sum + d_conf)::numeric / (invoice_count + d_count), 0), 100) / 100
+        END
+    WHERE id = vid
+$$ LANGUAGE sql
+"""
+
+_TRACK_VENDOR_METRICS = """
+CREATE OR REPLACE FUNCTION track_vendor_invoice_metrics() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.vendor_id IS NOT DISTINCT FROM NEW.vendor_id
+       AND OLD.total IS NOT DISTINCT FROM NEW.total
+       AND OLD.confidence_score IS NOT DISTINCT FROM NEW.confidence_score THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP <> 'INSERT' AND OLD.vendor_id IS NOT NULL THEN
+        PERFORM apply_vendor_invoice_metrics(
+            OLD.vendor_id, -1, -COALESCE(OLD.total, 0),
+            -(OLD.total IS NOT NULL)::int, -COALESCE(OLD.confidence_score, 0)
+        );
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.vendor_id IS NOT NULL THEN
+        PERFORM apply_vendor_invoice_metrics(
+            NEW.vendor_id, 1, COALESCE(NEW.total, 0),
+            (NEW.total IS NOT NULL)::int, COALESCE(NEW.confidence_score, 0)
+        );
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+_VENDOR_METRICS_TRIGGER = """
+CREATE TRIGGER invoices_vendor_metrics
+AFTER INSERT OR DELETE OR UPDATE OF vendor_id, total, confidence_score ON invoices
+FOR EACH ROW EXECUTE FUNCTION track_vendor_invoice_metrics()
+"""
+
+# Seeds the running sums from the invoices present at upgrade time.
+_BACKFILL_VENDOR_METRICS = """
+WITH actual AS (
+    SELECT v.id,
+           count(i.id) AS invoice_count,
+           COALESCE(sum(i.total), 0) AS invoice_total_sum,
+           count(i.total) AS invoice_total_count,
+           COALESCE(sum(i.confidence_score), 0) AS confidence_sum
+    FROM vendors v
+    LEFT JOIN invoices i ON i.vendor_id = v.id
+    GROUP BY v.id
+)
+UPDATE vendors v SET
+    invoice_count = a.invoice_count,
+    invoice_total_sum = a.invoice_total_sum,
+    invoice_total_count = a.invoice_total_count,
+    confidence_sum = a.confidence_sum,
+    avg_invoice_amount = a.invoice_total_sum / NULLIF(a.invoice_total_count, 0),
+    trust_score = CASE
+        WHEN a.invoice_count = 0 THEN 0.5
+        ELSE LEAST(GREATEST(a.confidence_sum::numeric / a.invoice_count, 0), 100) / 100
+    END
+FROM actual a
+WHERE v.id = a.id
+"""
+
+
+def _install() -> None:
+    op.execute("DROP TRIGGER IF EXISTS invoices_vendor_metrics ON invoices")
+    for statement in (_APPLY_VENDOR_METRICS, _TRACK_VENDOR_METRICS, _VENDOR_METRICS_TRIGGER):
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        for column in _COLUMNS:
+            op.add_column("vendors", column.copy())
+        _install()
+        op.execute(_BACKFILL_VENDOR_METRICS)
+        return
+
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("vendors") or not inspector.has_table("invoices"):
+        return
+    existing = {column["name"] for column in inspector.get_columns("vendors")}
+    for column in _COLUMNS:
+        if column.name not in existing:
+            op.add_column("vendors", column.copy())
+    _install()
+    op.execute(_BACKFILL_VENDOR_METRICS)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS invoices_vendor_metrics ON invoices")
+    op.execute("DROP FUNCTION IF EXISTS track_vendor_invoice_metrics()")
+    op.execute("DROP FUNCTION IF EXISTS apply_vendor_invoice_metrics(uuid, integer, numeric, integer, bigint)")
+
+    if context.is_offline_mode():
+        for column in _COLUMNS:
+            op.drop_column("vendors", column.name)
+        return
+
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("vendors"):
+        return
+    existing = {column["name"] for column in inspector.get_columns("vendors")}
+    for column in _COLUMNS:
+        if column.name in existing:
+            op.drop_column("vendors", column.name)
@@ -0,0 +1,51 @@
+"""add_stripe_webhook_failed_at
+
+Revision ID: b7e3d9f1a582
+Revises: a6d4f2b8c913
+Create Date: 2026-10-20 11:38:17.904215
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3d9f1a582'
+down_revision = 'a6d4f2b8c913'
+branch_labels = None
+depends_on = None
+
+_TABLE = "stripe_webhook_events"
+_INDEX = "ix_stripe_webhook_events_pending"
+
+
+def _has_failed_at() -> bool | None:
+    """None when the events table does not exist (nothing to do)."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(_TABLE):
+        return None
+    return "failed_at" in {column["name"] for column in inspector.get_columns(_TABLE)}
+
+
+def upgrade() -> None:
+    if not context.is_offline_mode():
+        present = _has_failed_at()
+        if present is None or present:
+            return
+    op.add_column(_TABLE, sa.Column("failed_at", sa.DateTime(timezone=True), nullable=True))
+    # Dead letters are never claimed, so keep them out of the pending index.
+    op.drop_index(_INDEX, table_name=_TABLE)
+    op.create_index(
+        _INDEX, _TABLE, ["next_attempt_at", "received_at"],
+        unique=False, postgresql_where=sa.text("processed_at IS NULL AND failed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    if not context.is_offline_mode() and not _has_failed_at():
+        return
+    op.drop_index(_INDEX, table_name=_TABLE)
+    op.create_index(
+        _INDEX, _TABLE, ["next_attempt_at", "received_at"],
+        unique=False, postgresql_where=sa.text("processed_at IS NULL"),
+    )
+    op.drop_column(_TABLE, "failed_at")
@@ -0,0 +1,48 @@
+"""add_stripe_webhook_events
+
+Revision ID: c2f6a8e4b073
+Revises: a9e3f7c5d184
+Create Date: 2026-10-19 20:03:18.661902
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c2f6a8e4b073'
+down_revision = 'a9e3f7c5d184'
+branch_labels = None
+depends_on = None
+
+_TABLE = "stripe_webhook_events"
+
+
+def upgrade() -> None:
+    if not context.is_offline_mode() and sa.inspect(op.get_bind()).has_table(_TABLE):
+        return
+    op.create_table(
+        _TABLE,
+        sa.Column("id", sa.Text(), nullable=False),
+        sa.Column("type", sa.Text(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("received_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_stripe_webhook_events_pending", _TABLE, ["next_attempt_at", "received_at"],
+        unique=False, postgresql_where=sa.text("processed_at IS NULL"),
+    )
+    op.create_index("ix_stripe_webhook_events_processed_at", _TABLE, ["processed_at"], unique=False)
+
+
+def downgrade() -> None:
+    if not context.is_offline_mode() and not sa.inspect(op.get_bind()).has_table(_TABLE):
+        return
+    op.drop_index("ix_stripe_webhook_events_processed_at", table_name=_TABLE)
+    op.drop_index("ix_stripe_webhook_events_pending", table_name=_TABLE)
+    op.drop_table(_TABLE)
@@ -0,0 +1,56 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: c7e4a9d1f352
+Revises: a41f6c2e8d37
+Create Date: 2026-10-19 13:05:12.402117
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c7e4a9d1f352'
+down_revision = 'a41f6c2e8d37'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) — must match the models' __table_args__.
+_INDEXES = (
+    ("ix_invoices_created_at_id", "invoices", ["created_at", "id"]),
+    ("ix_invoices_status_created_at_id", "invoices", ["status", "created_at", "id"]),
+    ("ix_items_created_at_id", "items", ["created_at", "id"]),
+    ("ix_items_invoice_id_created_at_id", "items", ["invoice_id", "created_at", "id"]),
+    ("ix_payments_initiated_at_id", "payments", ["initiated_at", "id"]),
+    ("ix_payments_status_initiated_at_id", "payments", ["status", "initiated_at", "id"]),
+    ("ix_vendors_created_at_id", "vendors", ["created_at", "id"]),
+    ("ix_overrides_timestamp_id", "overrides", ["timestamp", "id"]),
+    ("ix_cloud_pricing_vendor_service_name_id", "cloud_pricing", ["vendor", "service_name", "id"]),
+)
+
+
+def _existing_indexes(table: str) -> set[str] | None:
+    """Index names on ``table``; None when the table is missing (nothing to do)."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    offline = context.is_offline_mode()
+    for name, table, columns in _INDEXES:
+        if not offline:
+            existing = _existing_indexes(table)
+            if existing is None or name in existing:
+                continue
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    offline = context.is_offline_mode()
+    for name, table, _ in reversed(_INDEXES):
+        if not offline:
+            existing = _existing_indexes(table)
+            if existing is None or name not in existing:
+                continue
+        op.drop_index(name, table_name=table)
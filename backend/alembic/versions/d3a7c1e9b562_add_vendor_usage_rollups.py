@@ -0,0 +1,178 @@
+"""add_vendor_usage_rollups
+
+Revision ID: d3a7c1e9b562
+Revises: b5d2e9f4a6c8
+Create Date: 2026-10-19 18:12:36.208451
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'd3a7c1e9b562'
+down_revision = 'b5d2e9f4a6c8'
+branch_labels = None
+depends_on = None
+
+_TABLE = "vendor_usage_rollups"
+_INDEX = ("ix_invoices_vendor_id_created_at_id", "invoices", ["vendor_id", "created_at", "id"])
+
+# The trigger and backfill as of this revision (fraud = rejected / overcharge).
+# Kept literal so the revision does not change with app.models.vendor_usage_rollup.
+_APPLY_VENDOR_USAGE = """
+CREATE OR REPLACE FUNCTION apply_vendor_usage_rollup(
+    vid uuid, sign integer, amount numeric, inv_status text, negotiated boolean, created timestamptz
+) RETURNS void AS $$
+DECLARE
+    fraud integer := (inv_status IN ('rejected', 'overcharge'))::int;
+BEGIN
+    INSERT INTO vendor_usage_rollups AS r (
+        vendor_id, invoice_count, total_sum, fraud_count, fraud_total, negotiation_count,
+        first_invoice_at, last_invoice_at, updated_at
+    ) VALUES (
+        vid, sign, sign * COALESCE(amount, 0), sign * fraud, sign * fraud * COALESCE(amount, 0),
+        sign * negotiated::int,
+        CASE WHEN sign > 0 THEN created END, CASE WHEN sign > 0 THEN created END, now()
+    )
+    ON CONFLICT (vendor_id) DO UPDATE SET
+        invoice_count = r.invoice_count + EXCLUDED.invoice_count,
+        total_sum = r.total_sum + EXCLUDED.total_sum,
+        fraud_count = r.fraud_count + EXCLUDED.fraud_count,
+        fraud_total = r.fraud_total + EXCLUDED.fraud_total,
+        negotiation_count = r.negotiation_count + EXCLUDED.negotiation_count,
+        first_invoice_at = LEAST(r.first_invoice_at, EXCLUDED.first_invoice_at),
+        last_invoice_at = GREATEST(r.last_invoice_at, EXCLUDED.last_invoice_at),
+        updated_at = now();
+    IF sign < 0 THEN
+        UPDATE vendor_usage_rollups SET
+            first_invoice_at = (SELECT min(created_at) FROM invoices WHERE vendor_id = vid),
+            last_invoice_at = (SELECT max(created_at) FROM invoices WHERE vendor_id = vid)
+        WHERE vendor_id = vid
+          AND (first_invoice_at >= created OR last_invoice_at <= created);
+    END IF;
+END
+$$ LANGUAGE plpgsql
+"""
+
+_TRACK_VENDOR_USAGE = """
+CREATE OR REPLACE FUNCTION track_vendor_usage_rollup() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.vendor_id IS NOT DISTINCT FROM NEW.vendor_id
+       AND OLD.total IS NOT DISTINCT FROM NEW.total
+       AND OLD.status IS NOT DISTINCT FROM NEW.status
+       AND (OLD.negotiation_email IS NULL) = (NEW.negotiation_email IS NULL)
+       AND OLD.created_at IS NOT DISTINCT FROM NEW.created_at THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP <> 'INSERT' AND OLD.vendor_id IS NOT NULL THEN
+        PERFORM apply_vendor_usage_rollup(
+            OLD.vendor_id, -1, OLD.total, OLD.status, OLD.negotiation_email IS NOT NULL, OLD.created_at
+        );
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.vendor_id IS NOT NULL THEN
+        PERFORM apply_vendor_usage_rollup(
+            NEW.vendor_id, 1, NEW.total, NEW.status, NEW.negotiation_email IS NOT NULL, NEW.created_at
+        );
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+_VENDOR_USAGE_TRIGGER = """
+CREATE TRIGGER invoices_vendor_usage
+AFTER INSERT OR DELETE OR UPDATE OF vendor_id, total, status, negotiation_email, created_at ON invoices
+FOR EACH ROW EXECUTE FUNCTION track_vendor_usage_rollup()
+"""
+
+# Seeds the rollups from the invoices present at upgrade time.
+_BACKFILL_VENDOR_USAGE = """
+INSERT INTO vendor_usage_rollups AS r (
+    vendor_id, invoice_count, total_sum, fraud_count, fraud_total, negotiation_count,
+    first_invoice_at, last_invoice_at, updated_at
+)
+SELECT vendor_id,
+       count(*),
+       COALESCE(sum(total), 0),
+       count(*) FILTER (WHERE status IN ('rejected', 'overcharge')),
+       COALESCE(sum(total) FILTER (WHERE status IN ('rejected', 'overcharge')), 0),
+       count(negotiation_email),
+       min(created_at),
+       max(created_at),
+       now()
+FROM invoices
+WHERE vendor_id IS NOT NULL
+GROUP BY vendor_id
+ON CONFLICT (vendor_id) DO UPDATE SET
+    invoice_count = EXCLUDED.invoice_count,
+    total_sum = EXCLUDED.total_sum,
+    fraud_count = EXCLUDED.fraud_count,
+    fraud_total = EXCLUDED.fraud_total,
+    negotiation_count = EXCLUDED.negotiation_count,
+    first_invoice_at = EXCLUDED.first_invoice_at,
+    last_invoice_at = EXCLUDED.last_invoice_at,
+    updated_at = now()
+"""
+
+
+def _create_table() -> None:
+    op.create_table(
+        _TABLE,
+        sa.Column("vendor_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("invoice_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("total_sum", sa.Numeric(), nullable=False, server_default=sa.text("0")),
+        sa.Column("fraud_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("fraud_total", sa.Numeric(), nullable=False, server_default=sa.text("0")),
+        sa.Column("negotiation_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("first_invoice_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_invoice_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.ForeignKeyConstraint(["vendor_id"], ["vendors.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("vendor_id"),
+    )
+
+
+def _install() -> None:
+    op.execute("DROP TRIGGER IF EXISTS invoices_vendor_usage ON invoices")
+    for statement in (_APPLY_VENDOR_USAGE, _TRACK_VENDOR_USAGE, _VENDOR_USAGE_TRIGGER):
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    name, table, columns = _INDEX
+    if context.is_offline_mode():
+        _create_table()
+        op.create_index(name, table, columns, unique=False)
+        _install()
+        op.execute(_BACKFILL_VENDOR_USAGE)
+        return
+
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("vendors") or not inspector.has_table("invoices"):
+        return
+    if not inspector.has_table(_TABLE):
+        _create_table()
+    if name not in {index["name"] for index in inspector.get_indexes(table)}:
+        op.create_index(name, table, columns, unique=False)
+    _install()
+    op.execute(_BACKFILL_VENDOR_USAGE)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS invoices_vendor_usage ON invoices")
+    op.execute("DROP FUNCTION IF EXISTS track_vendor_usage_rollup()")
+    op.execute("DROP FUNCTION IF EXISTS apply_vendor_usage_rollup(uuid, integer, numeric, text, boolean, timestamptz)")
+
+    name, table, _ = _INDEX
+    if context.is_offline_mode():
+        op.drop_index(name, table_name=table)
+        op.drop_table(_TABLE)
+        return
+
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table(table) and name in {index["name"] for index in inspector.get_indexes(table)}:
+        op.drop_index(name, table_name=table)
+    if inspector.has_table(_TABLE):
+        op.drop_table(_TABLE)
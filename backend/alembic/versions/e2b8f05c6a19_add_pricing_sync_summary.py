@@ -0,0 +1,41 @@
+"""add_pricing_sync_summary
+
+Revision ID: e2b8f05c6a19
+Revises: c7e4a9d1f352
+Create Date: 2026-10-19 13:41:27.118504
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'e2b8f05c6a19'
+down_revision = 'c7e4a9d1f352'
+branch_labels = None
+depends_on = None
+
+
+def _existing_columns() -> set[str] | None:
+    """Column names on pricing_sync_state; None when the table is missing."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("pricing_sync_state"):
+        return None
+    return {column["name"] for column in inspector.get_columns("pricing_sync_state")}
+
+
+def upgrade() -> None:
+    if not context.is_offline_mode():
+        existing = _existing_columns()
+        if existing is None or "summary" in existing:
+            return
+    # Left NULL: the status endpoint aggregates once until the next sync stores it.
+    op.add_column("pricing_sync_state", sa.Column("summary", postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    if not context.is_offline_mode():
+        existing = _existing_columns()
+        if existing is None or "summary" not in existing:
+            return
+    op.drop_column("pricing_sync_state", "summary")
@@ -0,0 +1,48 @@
+"""add_paid_signal_failed_at
+
+Revision ID: e5c9a1d7f246
+Revises: c2f6a8e4b073
+Create Date: 2026-10-20 09:12:41.308517
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e5c9a1d7f246'
+down_revision = 'c2f6a8e4b073'
+branch_labels = None
+depends_on = None
+
+_TABLE = "paid_signal_outbox"
+_INDEX = "ix_paid_signal_outbox_next_attempt_at_id"
+
+
+def _has_failed_at() -> bool | None:
+    """None when the outbox table does not exist (nothing to do)."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(_TABLE):
+        return None
+    return "failed_at" in {column["name"] for column in inspector.get_columns(_TABLE)}
+
+
+def upgrade() -> None:
+    if not context.is_offline_mode():
+        present = _has_failed_at()
+        if present is None or present:
+            return
+    op.add_column(_TABLE, sa.Column("failed_at", sa.DateTime(timezone=True), nullable=True))
+    # Dead letters are never claimed, so keep them out of the claim index.
+    op.drop_index(_INDEX, table_name=_TABLE)
+    op.create_index(
+        _INDEX, _TABLE, ["next_attempt_at", "id"],
+        unique=False, postgresql_where=sa.text("failed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    if not context.is_offline_mode() and not _has_failed_at():
+        return
+    op.drop_index(_INDEX, table_name=_TABLE)
+    op.create_index(_INDEX, _TABLE, ["next_attempt_at", "id"], unique=False)
+    op.drop_column(_TABLE, "failed_at")
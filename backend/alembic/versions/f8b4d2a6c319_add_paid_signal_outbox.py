@@ -0,0 +1,44 @@
+"""add_paid_signal_outbox
+
+Revision ID: f8b4d2a6c319
+Revises: d3a7c1e9b562
+Create Date: 2026-10-19 18:47:03.915274
+
+"""
+from alembic import op, context
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'f8b4d2a6c319'
+down_revision = 'd3a7c1e9b562'
+branch_labels = None
+depends_on = None
+
+_TABLE = "paid_signal_outbox"
+_INDEX = "ix_paid_signal_outbox_next_attempt_at_id"
+
+
+def upgrade() -> None:
+    if not context.is_offline_mode() and sa.inspect(op.get_bind()).has_table(_TABLE):
+        return
+    op.create_table(
+        _TABLE,
+        sa.Column("id", sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column("customer_external_id", sa.Text(), nullable=False),
+        sa.Column("event_name", sa.Text(), nullable=False),
+        sa.Column("data", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(_INDEX, _TABLE, ["next_attempt_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    if not context.is_offline_mode() and not sa.inspect(op.get_bind()).has_table(_TABLE):
+        return
+    op.drop_index(_INDEX, table_name=_TABLE)
+    op.drop_table(_TABLE)
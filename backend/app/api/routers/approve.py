@@ -3,16 +3,17 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.cache import invalidate
+from app.core.database import get_primary_db
 
 from app.models.invoice import Invoice
-from app.services.stripe_service import execute_vendor_payment
+from app.services.stripe_service import payment_worker, queue_vendor_payment
 
 router = APIRouter(prefix="/invoices", tags=["invoices"])
 
 
 @router.post("/{invoice_id}/approve")
-async def approve_invoice(invoice_id: UUID, db: AsyncSession = Depends(get_db)):
+async def approve_invoice(invoice_id: UUID, db: AsyncSession = Depends(get_primary_db)):
     invoice = await db.get(Invoice, invoice_id)
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
@@ -21,16 +22,17 @@ async def approve_invoice(invoice_id: UUID, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=400, detail=f"Invoice already {invoice.status}")
 
     invoice.status = "approved"
+    # The payout is queued in the approving transaction and sent by payment_worker.
+    payment = None
+    if invoice.vendor_id and invoice.total:
+        payment = await queue_vendor_payment(db, invoice_id=invoice.id, amount_euros=float(invoice.total))
     await db.commit()
+    invalidate("invoices", "vendors")
     await db.refresh(invoice)
 
     payment_result = None
-    if invoice.vendor_id and invoice.total:
-        payment_result = await execute_vendor_payment(
-            invoice_id=invoice.id,
-            vendor_id=invoice.vendor_id,
-            amount_euros=float(invoice.total),
-            db=db,
-        )
+    if payment is not None:
+        payment_worker.notify()
+        payment_result = {"payment_id": str(payment.id), "status": payment.status}
 
     return {"approved": True, "invoice_id": str(invoice.id), "payment": payment_result}
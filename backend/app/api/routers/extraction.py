@@ -16,11 +16,13 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
-from app.models.cloud_pricing import CloudPricing
+from app.core.cache import invalidate
+from app.core.database import get_primary_db
 from app.models.invoice import Invoice
 from app.models.item import Item
 from app.models.vendor import Vendor
+from app.pricing.catalog import PricingCatalog, get_catalog
+from app.repositories.cloud_price_history import CloudPriceHistoryRepository
 from processing_layer.extraction.invoice import InvoiceExtractor
 from processing_layer.negotiation.agent import NegotiationAgent
 from processing_layer.prompts import build_analysis_prompt
@@ -30,8 +32,8 @@ from processing_layer.schemas.analysis import InvoiceAnalysis
 from processing_layer.llm.factory import get_provider
 from processing_layer.schemas.invoice import InvoiceExtraction
 from processing_layer.schemas.result import InvoiceAction
-from app.services.stripe_service import execute_vendor_payment
-from app.services.paid_service import track_value
+from app.services.stripe_service import payment_worker, queue_vendor_payment
+from app.services.paid_service import notify_signals, track_value
 from processing_layer.signals.compute import compute_signals
 
 load_dotenv()
@@ -61,7 +63,7 @@ def _exception_message(exc: Exception) -> str:
 @router.post("/")
 async def extract_invoice(
     file: UploadFile = File(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_db),
 ):
     """
     1) Gemini call #1: extract invoice fields from PDF/image.
@@ -153,10 +155,9 @@ async def extract_invoice(
         extraction=extraction,
         vendor=vendor,
     )
-    await _refresh_vendor_metrics(db=db, vendor=vendor)
-
     # Persist first Gemini extraction before second call to avoid losing primary data.
     await db.commit()
+    invalidate("invoices", "vendors")
     await db.refresh(invoice)
     await db.refresh(vendor)
     vendor_payload = {
@@ -178,6 +179,8 @@ async def extract_invoice(
         db=db,
         vendor=vendor,
         pricing_limit=pricing_limit,
+        as_of=_pricing_as_of(extraction, invoice),
+        line_descriptions=[item.description for item in extraction.line_items],
     )
 
     # ── Paid.ai: time_saved fires even if second pass fails ─────────
@@ -244,28 +247,22 @@ async def extract_invoice(
             invoice.auto_approved = True
         invoice.claude_summary = analysis.summary
         invoice.updated_at = datetime.now(timezone.utc)
-        await _refresh_vendor_metrics(db=db, vendor=vendor)
+        # Auto-approved: queue the vendor payout in the same transaction
+        payout_queued = bool(invoice.status == "approved" and invoice.vendor_id and invoice.total)
+        if payout_queued:
+            await queue_vendor_payment(db, invoice_id=invoice.id, amount_euros=float(invoice.total))
         await db.commit()
+        invalidate("invoices", "vendors")
+        if payout_queued:
+            payment_worker.notify()
         await db.refresh(invoice)
         await db.refresh(vendor)
 
-        # Trigger Stripe vendor payment when auto-approved
-        if invoice.status == "approved" and invoice.vendor_id and invoice.total:
-            try:
-                await execute_vendor_payment(
-                    invoice_id=invoice.id,
-                    vendor_id=invoice.vendor_id,
-                    amount_euros=float(invoice.total),
-                    db=db,
-                )
-            except Exception as pay_exc:
-                logger.error("Payment trigger failed for invoice %s: %s", invoice.id, pay_exc)
-
         # ── Paid.ai: metrics needing second-pass data ─────────────────
         try:
             # 2. Fraud Blocked (duplicate or very low confidence)
             if analysis.is_duplicate or rubric.total_score < 15:
-                await track_value(vid, "fraud_blocked_euros", invoice_total, {
+                track_value(db, vid, "fraud_blocked_euros", invoice_total, {
                     "is_duplicate": analysis.is_duplicate,
                     "confidence_score": rubric.total_score,
                     "invoice_id": str(invoice.id),
@@ -278,14 +275,14 @@ async def extract_invoice(
                     if sig.invoice_value is not None and sig.reference_value is not None:
                         overcharge_total += max(0.0, sig.invoice_value - sig.reference_value)
             if overcharge_total > 0:
-                await track_value(vid, "overcharge_identified_euros", overcharge_total, {
+                track_value(db, vid, "overcharge_identified_euros", overcharge_total, {
                     "invoice_id": str(invoice.id),
                     "invoice_total": invoice_total,
                 })
 
             # 4. Negotiation Email Sent
             if invoice.negotiation_email:
-                await track_value(vid, "negotiation_email_sent", 1.0, {
+                track_value(db, vid, "negotiation_email_sent", 1.0, {
                     "invoice_id": str(invoice.id),
                     "action": decision.action.value,
                 })
@@ -315,7 +312,7 @@ async def extract_invoice(
     try:
         elapsed_minutes = (time.monotonic() - pipeline_start) / 60.0
         time_saved = max(0.0, 12.0 - elapsed_minutes)
-        await track_value(vid, "time_saved_minutes", time_saved, {
+        track_value(db, vid, "time_saved_minutes", time_saved, {
             "actual_minutes": round(elapsed_minutes, 2),
             "invoice_id": str(invoice.id),
             "second_pass_ok": second_pass is not None,
@@ -332,12 +329,15 @@ async def extract_invoice(
         total_value = time_saved * 50.0 + overcharge
         estimated_api_cost = 0.05
         agent_margin = total_value / estimated_api_cost if estimated_api_cost > 0 else 0.0
-        await track_value(vid, "agent_margin_ratio", agent_margin, {
+        track_value(db, vid, "agent_margin_ratio", agent_margin, {
             "total_value_euros": round(total_value, 2),
             "estimated_api_cost": estimated_api_cost,
             "invoice_id": str(invoice.id),
             "second_pass_ok": second_pass is not None,
         })
+        # One commit for every queued signal; the outbox flusher sends them.
+        await db.commit()
+        notify_signals(db)
     except Exception as paid_exc:
         logger.warning("Paid.ai baseline tracking failed: %s", paid_exc)
     # ── End Paid.ai baseline ──────────────────────────────────────────
@@ -443,33 +443,12 @@ async def _create_invoice_with_items(
     return invoice
 
 
-async def _refresh_vendor_metrics(db: AsyncSession, vendor: Vendor) -> None:
-    result = await db.execute(
-        select(
-            func.count(Invoice.id),
-            func.avg(Invoice.total),
-            func.avg(func.coalesce(Invoice.confidence_score, 0)),
-        ).where(Invoice.vendor_id == vendor.id)
-    )
-    invoice_count, avg_invoice_amount, avg_confidence_score = result.one()
-
-    vendor.invoice_count = int(invoice_count or 0)
-    vendor.avg_invoice_amount = avg_invoice_amount
-
-    if vendor.invoice_count == 0:
-        vendor.trust_score = Decimal("0.5")
-    else:
-        avg_confidence_decimal = _to_decimal(avg_confidence_score) or Decimal("0")
-        bounded_confidence = max(Decimal("0"), min(Decimal("100"), avg_confidence_decimal))
-        vendor.trust_score = bounded_confidence / Decimal("100")
-
-    await db.flush()
-
-
 async def _build_vendor_context_payload(
     db: AsyncSession,
     vendor: Vendor,
     pricing_limit: int,
+    as_of: datetime | None = None,
+    line_descriptions: list[str] | None = None,
 ) -> dict[str, Any]:
     invoices_result = await db.execute(
         select(Invoice)
@@ -480,11 +459,24 @@ async def _build_vendor_context_payload(
     invoices = list(invoices_result.scalars().all())
 
     pricing_vendor = _infer_cloud_vendor(vendor.name)
-    pricing_query = select(CloudPricing).order_by(CloudPricing.updated_at.desc()).limit(pricing_limit)
-    if pricing_vendor:
-        pricing_query = pricing_query.where(CloudPricing.vendor == pricing_vendor)
-    pricing_result = await db.execute(pricing_query)
-    pricing_rows = list(pricing_result.scalars().all())
+    catalog = await get_catalog(db)
+    positions, candidates_by_line = _retrieve_pricing_candidates(catalog, pricing_vendor, line_descriptions or [])
+    if not positions:
+        # Nothing in the catalog relates to these lines; keep a small recent sample.
+        positions = catalog.latest(pricing_vendor, limit=pricing_limit)
+    pricing_rows = [catalog.row(i) for i in positions]
+
+    pricing_payloads = [_pricing_to_context_payload(p) for p in pricing_rows]
+    if as_of is not None and pricing_rows:
+        history = await CloudPriceHistoryRepository(db).get_prices_at(
+            ((p["vendor"], p["sku_id"], p["source_api"]) for p in pricing_rows), as_of,
+        )
+        for row, payload in zip(pricing_rows, pricing_payloads):
+            hit = history.get((row["vendor"], row["sku_id"], row["source_api"]))
+            payload["price_as_of"] = as_of.isoformat()
+            payload["price_per_unit_as_of"] = _decimal_or_none(hit.price_per_unit) if hit else None
+            payload["price_per_hour_as_of"] = _decimal_or_none(hit.price_per_hour) if hit else None
+            payload["canonical_price_as_of"] = _canonical_as_of(row, hit.price_per_unit) if hit else None
 
     return {
         "vendor": {
@@ -494,11 +486,34 @@ async def _build_vendor_context_payload(
             "vendor_address": vendor.vendor_address,
         },
         "invoices": [_invoice_to_context_payload(i) for i in invoices],
-        "cloud_pricing": [_pricing_to_context_payload(p) for p in pricing_rows],
+        "cloud_pricing": pricing_payloads,
+        "pricing_candidates": candidates_by_line,
         "pricing_vendor_filter": pricing_vendor,
     }
 
 
+def _retrieve_pricing_candidates(
+    catalog: PricingCatalog,
+    pricing_vendor: str | None,
+    line_descriptions: list[str],
+) -> tuple[list[int], dict[str, list[int]]]:
+    """Catalog positions relevant to the invoice lines, plus each line's candidates as indexes into them."""
+    positions: list[int] = []
+    index_of: dict[int, int] = {}
+    candidates_by_line: dict[str, list[int]] = {}
+    for description in line_descriptions:
+        if description in candidates_by_line:
+            continue
+        indexes = []
+        for pos in catalog.candidates(pricing_vendor, description):
+            if pos not in index_of:
+                index_of[pos] = len(positions)
+                positions.append(pos)
+            indexes.append(index_of[pos])
+        candidates_by_line[description] = indexes
+    return positions, candidates_by_line
+
+
 def _invoice_to_context_payload(invoice: Invoice) -> dict[str, Any]:
     return {
         "id": str(invoice.id),
@@ -523,22 +538,40 @@ def _invoice_to_context_payload(invoice: Invoice) -> dict[str, Any]:
     }
 
 
-def _pricing_to_context_payload(row: CloudPricing) -> dict[str, Any]:
+def _canonical_as_of(row: dict[str, Any], price_per_unit: Decimal | None) -> str | None:
+    """Scale a historical price_per_unit by the row's current unit factor (same SKU, same unit)."""
+    if price_per_unit is None or row["canonical_price"] is None or not row["price_per_unit"]:
+        return None
+    return _decimal_or_none(price_per_unit * row["canonical_price"] / row["price_per_unit"])
+
+
+def _pricing_to_context_payload(row: dict[str, Any]) -> dict[str, Any]:
     return {
-        "vendor": row.vendor,
-        "service_name": row.service_name,
-        "category": row.category,
-        "sku_id": row.sku_id,
-        "region": row.region,
-        "instance_type": row.instance_type,
-        "price_per_unit": _decimal_or_none(row.price_per_unit),
-        "price_per_hour": _decimal_or_none(row.price_per_hour),
-        "unit": row.unit,
-        "currency": row.currency,
-        "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+        "vendor": row["vendor"],
+        "service_name": row["service_name"],
+        "category": row["category"],
+        "sku_id": row["sku_id"],
+        "region": row["region"],
+        "instance_type": row["instance_type"],
+        "price_per_unit": _decimal_or_none(row["price_per_unit"]),
+        "price_per_hour": _decimal_or_none(row["price_per_hour"]),
+        "unit": row["unit"],
+        "unit_dimension": row["unit_dimension"],
+        "canonical_unit": row["canonical_unit"],
+        "canonical_price": _decimal_or_none(row["canonical_price"]),
+        "currency": row["currency"],
+        "updated_at": row["updated_at"].isoformat() if row["updated_at"] else None,
     }
 
 
+def _pricing_as_of(extraction: InvoiceExtraction, invoice: Invoice) -> datetime:
+    """When the invoiced services were priced: the issue date, else when we received the invoice.
+
+    Not the due date, which is only when payment is owed.
+    """
+    return _parse_datetime(extraction.invoice_date) or invoice.created_at
+
+
 def _parse_datetime(raw_value: str | None) -> datetime | None:
     if not raw_value:
         return None
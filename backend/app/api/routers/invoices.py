@@ -1,25 +1,66 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from app.core.cache import cached_route
+from app.core.etag import json_with_etag
+from app.core.pagination import NEXT_CURSOR_HEADER, set_next_cursor
 from app.services.invoice import InvoiceService
-from app.schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse
+from app.schemas.invoice import INVOICE_SUMMARY_FIELDS, InvoiceCreate, InvoiceUpdate, InvoiceResponse, InvoiceSummary
 from app.core.dependencies import get_invoice_service
 
-router = APIRouter(prefix="/invoices", tags=["invoices"])
+router = APIRouter(prefix="/invoices", tags=["invoices"], route_class=cached_route("invoices"))
 
 
 @router.get("/", response_model=list[InvoiceResponse])
-async def get_all(skip: int = 0, limit: int = 100, service: InvoiceService = Depends(get_invoice_service)):
-    return await service.get_all_invoices(skip, limit)
+async def get_all(
+    response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    service: InvoiceService = Depends(get_invoice_service),
+):
+    invoices, next_cursor = await service.get_all_invoices(skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return invoices
+
+
+@router.get("/summary", response_model=list[InvoiceSummary], response_model_exclude_unset=True)
+async def get_summaries(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated columns, e.g. id,status,total"),
+    service: InvoiceService = Depends(get_invoice_service),
+):
+    """Lightweight list for table views; honours If-None-Match."""
+    selected = INVOICE_SUMMARY_FIELDS
+    if fields:
+        selected = tuple(f.strip() for f in fields.split(",") if f.strip())
+        unknown = sorted(set(selected) - set(INVOICE_SUMMARY_FIELDS))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    rows, next_cursor = await service.get_summaries(selected, skip, limit, cursor, status)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return json_with_etag(request, rows, headers)
 
 
 @router.get("/flagged", response_model=list[InvoiceResponse])
-async def get_flagged(skip: int = 0, limit: int = 100, service: InvoiceService = Depends(get_invoice_service)):
-    return await service.get_flagged(skip, limit)
+async def get_flagged(
+    response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    service: InvoiceService = Depends(get_invoice_service),
+):
+    invoices, next_cursor = await service.get_flagged(skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return invoices
 
 
 @router.get("/status/{status}", response_model=list[InvoiceResponse])
-async def get_by_status(status: str, skip: int = 0, limit: int = 100, service: InvoiceService = Depends(get_invoice_service)):
-    return await service.get_by_status(status, skip, limit)
+async def get_by_status(
+    status: str, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    service: InvoiceService = Depends(get_invoice_service),
+):
+    invoices, next_cursor = await service.get_by_status(status, skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return invoices
 
 
 @router.get("/{id}", response_model=InvoiceResponse)
@@ -1,5 +1,7 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from app.core.pagination import set_next_cursor
 from app.services.item import ItemService
 from app.schemas.item import ItemCreate, ItemUpdate, ItemResponse
 from app.core.dependencies import get_item_service
@@ -8,13 +10,23 @@ router = APIRouter(prefix="/items", tags=["items"])
 
 
 @router.get("/", response_model=list[ItemResponse])
-async def get_all(skip: int = 0, limit: int = 100, service: ItemService = Depends(get_item_service)):
-    return await service.get_all_items(skip, limit)
+async def get_all(
+    response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    service: ItemService = Depends(get_item_service),
+):
+    items, next_cursor = await service.get_all_items(skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return items
 
 
 @router.get("/invoice/{invoice_id}", response_model=list[ItemResponse])
-async def get_by_invoice(invoice_id: UUID, skip: int = 0, limit: int = 100, service: ItemService = Depends(get_item_service)):
-    return await service.get_by_invoice_id(invoice_id, skip, limit)
+async def get_by_invoice(
+    invoice_id: UUID, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    service: ItemService = Depends(get_item_service),
+):
+    items, next_cursor = await service.get_by_invoice_id(invoice_id, skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return items
 
 
 @router.get("/{id}", response_model=ItemResponse)
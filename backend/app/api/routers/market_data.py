@@ -1,10 +1,17 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.core.cache import cached_route
 from app.services.market_data import MarketDataService
-from app.schemas.market_data import MarketDataCreate, MarketDataUpdate, MarketDataResponse
+from app.schemas.market_data import MarketDataCreate, MarketDataUpdate, MarketDataResponse, MarketDataSeries
 from app.core.dependencies import get_market_data_service
 
-router = APIRouter(prefix="/market-data", tags=["market_data"])
+router = APIRouter(prefix="/market-data", tags=["market_data"], route_class=cached_route("market_data"))
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
 
 
 @router.get("/", response_model=list[MarketDataResponse])
@@ -17,6 +24,22 @@ async def get_by_category(category: str, skip: int = 0, limit: int = 100, servic
     return await service.get_by_category(category, skip, limit)
 
 
+@router.get("/series", response_model=MarketDataSeries)
+async def get_series(
+    name: str,
+    category: Optional[str] = None,
+    start: Optional[datetime] = Query(None, description="Defaults to 30 days before end"),
+    end: Optional[datetime] = Query(None, description="Defaults to now"),
+    granularity: Literal["auto", "hour", "day", "week"] = "auto",
+    service: MarketDataService = Depends(get_market_data_service),
+):
+    end = _as_utc(end) if end else datetime.now(timezone.utc)
+    start = _as_utc(start) if start else end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return await service.get_series(name, start, end, granularity=granularity, category=category)
+
+
 @router.get("/{id}", response_model=MarketDataResponse)
 async def get_one(id: UUID, service: MarketDataService = Depends(get_market_data_service)):
     data = await service.get_market_data(id)
@@ -1,5 +1,7 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from app.core.pagination import set_next_cursor
 from app.services.override import OverrideService
 from app.schemas.override import OverrideCreate, OverrideUpdate, OverrideResponse
 from app.core.dependencies import get_override_service
@@ -8,13 +10,23 @@ router = APIRouter(prefix="/overrides", tags=["overrides"])
 
 
 @router.get("/", response_model=list[OverrideResponse])
-async def get_all(skip: int = 0, limit: int = 100, service: OverrideService = Depends(get_override_service)):
-    return await service.get_all_overrides(skip, limit)
+async def get_all(
+    response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    service: OverrideService = Depends(get_override_service),
+):
+    overrides, next_cursor = await service.get_all_overrides(skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return overrides
 
 
 @router.get("/disagreements", response_model=list[OverrideResponse])
-async def get_disagreements(skip: int = 0, limit: int = 100, service: OverrideService = Depends(get_override_service)):
-    return await service.get_disagreements(skip, limit)
+async def get_disagreements(
+    response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    service: OverrideService = Depends(get_override_service),
+):
+    overrides, next_cursor = await service.get_disagreements(skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return overrides
 
 
 @router.get("/invoice/{invoice_id}", response_model=list[OverrideResponse])
@@ -2,7 +2,9 @@
 
 Fetches data from Paid.ai via the paid-python SDK and falls back to
 the local database when the Paid.ai API has no data (e.g. orders /
-billing not yet configured).
+billing not yet configured). Invoices are filtered on the Paid.ai side
+by the vendor UUID (our external customer id), paged through in full and
+cached in-process per vendor (PAID_INVOICE_CACHE_SECONDS).
 
 Route patterns expected by the components (without baseUrl):
   GET /api/usage/{customerExternalId}
@@ -16,16 +18,22 @@ import logging
 import uuid
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-
-from fastapi import APIRouter, Depends
-from sqlalchemy import select, func, case
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.core.database import get_db
-from app.models.invoice import Invoice
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Response
+from paid.errors import NotFoundError
+from sqlalchemy import Integer, column
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.dependencies import get_invoice_repo, get_vendor_usage_repo
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor, set_next_cursor
+from app.repositories.invoice import InvoiceRepository
+from app.repositories.vendor_usage_rollup import VendorUsageRollupRepository
 from app.services.paid_service import get_paid_client
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 router = APIRouter(prefix="/paid-blocks", tags=["paid-blocks"])
 
 MANUAL_REVIEW_MINUTES = 12.0   # assumed manual review time per invoice
@@ -42,16 +50,35 @@ def _to_cents(value: Decimal | float | None) -> int:
 
 # ── Paid.ai helpers ────────────────────────────────────────────
 
-async def _get_paid_customer_id(external_id: str) -> str | None:
-    """Resolve a vendor UUID (our external_customer_id) to a Paid.ai display ID."""
-    client = get_paid_client()
-    if client is None:
-        return None
-    try:
-        customer = await client.customers.get_customer_by_external_id(external_id)
-        return customer.id
-    except Exception:
-        return None
+# Invoice lists are cached per vendor for a few seconds (misses included, so
+# vendors unknown to Paid.ai skip the remote call too).
+_customer_invoices = TTLCache(settings.paid_invoice_cache_seconds, max_entries=1024)
+
+# Upper bound on pages fetched per customer, in case pagination never ends.
+_MAX_INVOICE_PAGES = 50
+
+# Page size when a client sends a cursor without a limit.
+_DEFAULT_PAGE_SIZE = 100
+
+# Paid.ai invoices have no local sort key, so their cursor is a list position.
+_PAID_POSITION = column("position", Integer)
+
+
+async def _list_customer_invoices(client, customer_external_id: str) -> list:
+    """All of a customer's invoices, filtered server-side by our vendor UUID and paged through."""
+    page_size = settings.paid_invoice_page_size
+    invoices: list = []
+    for page in range(_MAX_INVOICE_PAGES):
+        response = await client.invoices.list_invoices(
+            external_customer_id=customer_external_id, limit=page_size, offset=page * page_size,
+        )
+        invoices.extend(response.data)
+        pagination = response.pagination
+        if not response.data or pagination is None or not pagination.has_more:
+            break
+    else:
+        logger.warning("Paid.ai invoices for %s truncated at %d pages", customer_external_id, _MAX_INVOICE_PAGES)
+    return invoices
 
 
 async def _fetch_paid_invoices(customer_external_id: str) -> list[dict] | None:
@@ -64,44 +91,58 @@ async def _fetch_paid_invoices(customer_external_id: str) -> list[dict] | None:
     if client is None:
         return None
 
-    paid_customer_id = await _get_paid_customer_id(customer_external_id)
-    if not paid_customer_id:
-        return None
+    cached = _customer_invoices.get(customer_external_id)
+    if cached is not TTLCache.MISSING:
+        return cached
 
     try:
-        response = await client.invoices.list_invoices(limit=100)
-        customer_invoices = [
-            inv for inv in response.data
-            if inv.customer_id == paid_customer_id
-        ]
-        if not customer_invoices:
-            return None
-
-        result = []
-        for idx, inv in enumerate(customer_invoices, start=1):
-            result.append({
-                "id": inv.id,
-                "number": idx,
-                "paymentStatus": inv.payment_status,
-                "issueDate": inv.issue_date.isoformat() if inv.issue_date else None,
-                "dueDate": inv.due_date.isoformat() if inv.due_date else None,
-                "invoiceTotal": int(round(inv.invoice_total)),
-                "currency": inv.currency or "EUR",
-            })
-        return result
+        customer_invoices = await _list_customer_invoices(client, customer_external_id)
+    except NotFoundError:
+        customer_invoices = []
     except Exception as exc:
+        # Transient failures are not cached; the next request retries.
         logger.warning("Paid.ai invoices fetch failed: %s", exc)
         return None
 
+    result = [
+        {
+            "id": inv.id,
+            "number": idx,
+            "paymentStatus": inv.payment_status,
+            "issueDate": inv.issue_date.isoformat() if inv.issue_date else None,
+            "dueDate": inv.due_date.isoformat() if inv.due_date else None,
+            "invoiceTotal": int(round(inv.invoice_total)),
+            "currency": inv.currency or "EUR",
+        }
+        for idx, inv in enumerate(customer_invoices, start=1)
+    ] or None
+    _customer_invoices.set(customer_external_id, result)
+    return result
+
+
+def _paid_window(
+    invoices: list[dict], skip: int, limit: Optional[int], cursor: Optional[str],
+) -> tuple[list[dict], Optional[str]]:
+    """The same skip / limit / cursor window the local listing applies, over a Paid.ai list."""
+    start = skip
+    if cursor:
+        start = decode_cursor(cursor, (_PAID_POSITION,))[0]
+        if start < 0:
+            raise InvalidCursor("cursor does not match this listing")
+    if limit is None:
+        return invoices[start:], None
+    end = start + limit
+    return invoices[start:end], encode_cursor([end]) if end < len(invoices) else None
+
 
 # ── Endpoints ──────────────────────────────────────────────────
 
 @router.get("/usage/{customer_external_id}")
 async def proxy_usage(
     customer_external_id: str,
-    db: AsyncSession = Depends(get_db),
+    usage_repo: VendorUsageRollupRepository = Depends(get_vendor_usage_repo),
 ):
-    """Build usageSummary from local invoice data for a vendor."""
+    """Build usageSummary for a vendor from its pre-aggregated invoice rollup."""
 
     # Validate UUID
     try:
@@ -109,103 +150,66 @@ async def proxy_usage(
     except ValueError:
         return _empty_response(customer_external_id)
 
-    # ── Aggregate invoice stats for this vendor ──────────────
-    row = (
-        await db.execute(
-            select(
-                func.count(Invoice.id).label("total_count"),
-                func.coalesce(func.sum(Invoice.total), 0).label("total_sum"),
-                func.min(Invoice.created_at).label("first_date"),
-                func.max(Invoice.created_at).label("last_date"),
-                # Rejected / flagged invoices (fraud blocked)
-                func.sum(
-                    case(
-                        (Invoice.status.in_(["rejected", "overcharge"]), Invoice.total),
-                        else_=Decimal(0),
-                    )
-                ).label("fraud_total"),
-                func.sum(
-                    case(
-                        (Invoice.status.in_(["rejected", "overcharge"]), 1),
-                        else_=0,
-                    )
-                ).label("fraud_count"),
-                # Negotiation emails sent
-                func.sum(
-                    case(
-                        (Invoice.negotiation_email.isnot(None), 1),
-                        else_=0,
-                    )
-                ).label("negotiation_count"),
-                # Low-confidence flagged invoices
-                func.sum(
-                    case(
-                        (Invoice.confidence_score < 40, 1),
-                        else_=0,
-                    )
-                ).label("flagged_count"),
-            ).where(Invoice.vendor_id == vendor_uuid)
-        )
-    ).one_or_none()
-
-    if row is None or row.total_count == 0:
+    # ── One rollup row, kept current by the invoices_vendor_usage trigger ──
+    rollup = await usage_repo.get(vendor_uuid)
+    if rollup is None or rollup.invoice_count <= 0:
         return _empty_response(customer_external_id)
 
     now = datetime.now(timezone.utc)
-    start = row.first_date or now
-    end = row.last_date or now
+    start = rollup.first_invoice_at or now
+    end = rollup.last_invoice_at or now
 
     summaries: list[dict] = []
 
     # 1. Time Saved
-    if row.total_count > 0:
+    if rollup.invoice_count > 0:
         summaries.append({
             "id": f"ts-{customer_external_id[:8]}",
             "customerId": customer_external_id,
             "eventName": "time_saved_minutes",
             "startDate": start.isoformat(),
             "endDate": end.isoformat(),
-            "eventsQuantity": row.total_count,
-            "subtotal": row.total_count * PER_INVOICE_SAVINGS_CENTS,
+            "eventsQuantity": rollup.invoice_count,
+            "subtotal": rollup.invoice_count * PER_INVOICE_SAVINGS_CENTS,
             "currency": "EUR",
         })
 
     # 2. Fraud Blocked
-    if row.fraud_count and row.fraud_count > 0:
+    if rollup.fraud_count and rollup.fraud_count > 0:
         summaries.append({
             "id": f"fb-{customer_external_id[:8]}",
             "customerId": customer_external_id,
             "eventName": "fraud_blocked_euros",
             "startDate": start.isoformat(),
             "endDate": end.isoformat(),
-            "eventsQuantity": int(row.fraud_count),
-            "subtotal": _to_cents(row.fraud_total),
+            "eventsQuantity": int(rollup.fraud_count),
+            "subtotal": _to_cents(rollup.fraud_total),
             "currency": "EUR",
         })
 
     # 3. Negotiation Emails
-    if row.negotiation_count and row.negotiation_count > 0:
+    if rollup.negotiation_count and rollup.negotiation_count > 0:
         summaries.append({
             "id": f"ne-{customer_external_id[:8]}",
             "customerId": customer_external_id,
             "eventName": "negotiation_email_sent",
             "startDate": start.isoformat(),
             "endDate": end.isoformat(),
-            "eventsQuantity": int(row.negotiation_count),
-            "subtotal": int(row.negotiation_count) * 500,  # €5 per email
+            "eventsQuantity": int(rollup.negotiation_count),
+            "subtotal": int(rollup.negotiation_count) * 500,  # €5 per email
             "currency": "EUR",
         })
 
     # 4. AI Processing Volume
-    if row.total_count > 0:
+    if rollup.invoice_count > 0:
         summaries.append({
             "id": f"pv-{customer_external_id[:8]}",
             "customerId": customer_external_id,
             "eventName": "invoices_processed",
             "startDate": start.isoformat(),
             "endDate": end.isoformat(),
-            "eventsQuantity": row.total_count,
-            "subtotal": _to_cents(row.total_sum),
+            "eventsQuantity": rollup.invoice_count,
+            "subtotal": _to_cents(rollup.total_sum),
             "currency": "EUR",
         })
 
@@ -218,32 +222,42 @@ async def proxy_usage(
 @router.get("/invoices/{customer_external_id}")
 async def proxy_invoices(
     customer_external_id: str,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    invoice_repo: InvoiceRepository = Depends(get_invoice_repo),
 ):
-    """Return invoices for a vendor — Paid.ai first, local DB fallback."""
+    """Return invoices for a vendor — Paid.ai first, local DB fallback.
+
+    Without ``limit`` or ``cursor`` the whole list is returned; otherwise one
+    page, with the next page's cursor in ``X-Next-Cursor``. Both sources
+    apply the same window.
+    """
+    if cursor and limit is None:
+        limit = _DEFAULT_PAGE_SIZE
 
     # 1) Try Paid.ai SDK
     paid_invoices = await _fetch_paid_invoices(customer_external_id)
     if paid_invoices is not None:
-        logger.info("Serving %d invoices from Paid.ai for %s", len(paid_invoices), customer_external_id)
-        return {"status": "success", "data": paid_invoices}
+        page, next_cursor = _paid_window(paid_invoices, skip, limit, cursor)
+        set_next_cursor(response, next_cursor)
+        logger.info("Serving %d invoices from Paid.ai for %s", len(page), customer_external_id)
+        return {"status": "success", "data": page}
 
-    # 2) Fallback: local database
+    # 2) Fallback: local database, only the columns the table shows
     try:
         vendor_uuid = uuid.UUID(customer_external_id)
     except ValueError:
         return {"status": "success", "data": []}
 
-    rows = (
-        await db.execute(
-            select(Invoice)
-            .where(Invoice.vendor_id == vendor_uuid)
-            .order_by(Invoice.created_at.desc())
-        )
-    ).scalars().all()
+    rows, next_cursor = await invoice_repo.get_vendor_billing_rows(
+        vendor_uuid, skip=skip, limit=limit, cursor=cursor,
+    )
+    set_next_cursor(response, next_cursor)
 
     invoices = []
-    for idx, inv in enumerate(rows, start=1):
+    for idx, inv in enumerate(rows, start=skip + 1):
         if inv.status in ("approved", "paid"):
             payment_status = "paid"
         elif inv.status in ("rejected", "overcharge"):
@@ -254,12 +268,12 @@ async def proxy_invoices(
         issue_date = inv.created_at
         due_date = inv.due_date or (issue_date + timedelta(days=30) if issue_date else None)
 
-        # Total from column; fall back to extracted_data JSONB
+        # Total from column; fall back to the value extracted into JSONB
         total = inv.total
         currency = inv.currency or "EUR"
-        if total is None and inv.extracted_data:
-            total = inv.extracted_data.get("total")
-            currency = inv.extracted_data.get("currency", currency)
+        if total is None:
+            total = inv.extracted_total
+            currency = inv.extracted_currency or currency
 
         invoices.append({
             "id": str(inv.id),
@@ -1,9 +1,11 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
+from app.core.pagination import set_next_cursor
 from app.services.payment import PaymentService
 from app.schemas.payment import (
     PaymentCreate, PaymentUpdate, PaymentResponse,
@@ -17,8 +19,13 @@ router = APIRouter(prefix="/payments", tags=["payments"])
 
 
 @router.get("/", response_model=list[PaymentResponse])
-async def get_all(skip: int = 0, limit: int = 100, service: PaymentService = Depends(get_payment_service)):
-    return await service.get_all_payments(skip, limit)
+async def get_all(
+    response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    service: PaymentService = Depends(get_payment_service),
+):
+    payments, next_cursor = await service.get_all_payments(skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return payments
 
 
 @router.get("/invoice/{invoice_id}", response_model=list[PaymentResponse])
@@ -27,8 +34,13 @@ async def get_by_invoice(invoice_id: UUID, service: PaymentService = Depends(get
 
 
 @router.get("/status/{status}", response_model=list[PaymentResponse])
-async def get_by_status(status: str, skip: int = 0, limit: int = 100, service: PaymentService = Depends(get_payment_service)):
-    return await service.get_by_status(status, skip, limit)
+async def get_by_status(
+    status: str, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    service: PaymentService = Depends(get_payment_service),
+):
+    payments, next_cursor = await service.get_by_status(status, skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return payments
 
 
 @router.get("/{payment_id}/confirmation", response_model=PaymentConfirmationResponse)
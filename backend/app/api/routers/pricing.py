@@ -1,30 +1,39 @@
 from uuid import UUID
 from typing import Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from app.core.cache import cached_route
+from app.core.pagination import set_next_cursor
+from app.pricing.sync import start_sync
+from app.repositories.pricing_sync_run import PricingSyncRunRepository
 
 from app.services.cloud_pricing import CloudPricingService
 from app.schemas.cloud_pricing import (
     CloudPricingResponse,
     InvoiceCheckRequest,
     InvoiceCheckResponse,
+    PricingSearchHit,
+    PricingSyncRunResponse,
     SyncStatus,
 )
-from app.core.dependencies import get_cloud_pricing_service
+from app.core.dependencies import get_cloud_pricing_service, get_pricing_sync_run_repo
 
-router = APIRouter(prefix="/pricing", tags=["pricing"])
+# Sync status and runs change while a sync is in flight, so they bypass the cache.
+router = APIRouter(prefix="/pricing", tags=["pricing"], route_class=cached_route("pricing", uncached=("/sync",)))
 
 
 
 @router.post("/sync", summary="Trigger full pricing data refresh", response_model=SyncStatus)
-async def trigger_sync(
-    background_tasks: BackgroundTasks,
-    service: CloudPricingService = Depends(get_cloud_pricing_service),
-):
-    """Enqueue a full fetch+normalise+upsert cycle in the background."""
-    background_tasks.add_task(service.trigger_sync)
+async def trigger_sync(service: CloudPricingService = Depends(get_cloud_pricing_service)):
+    """Start a full fetch+normalise+upsert run in the background, unless one is already running.
+
+    Follow progress at ``GET /pricing/sync/runs/{run_id}``.
+    """
+    run_id, started = await start_sync()
     status = await service.get_sync_status()
-    status.message = "Sync triggered — running in background"
+    status.run_id = run_id
+    status.message = "Sync triggered — running in background" if started else "Sync already running"
     return status
 
 
@@ -33,9 +42,30 @@ async def sync_status(service: CloudPricingService = Depends(get_cloud_pricing_s
     return await service.get_sync_status()
 
 
+@router.get("/sync/runs", summary="Recent sync runs, newest first", response_model=list[PricingSyncRunResponse])
+async def list_sync_runs(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    repo: PricingSyncRunRepository = Depends(get_pricing_sync_run_repo),
+):
+    runs, next_cursor = await repo.get_page(limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    return runs
+
+
+@router.get("/sync/runs/{run_id}", summary="One sync run", response_model=PricingSyncRunResponse)
+async def get_sync_run(run_id: UUID, repo: PricingSyncRunRepository = Depends(get_pricing_sync_run_repo)):
+    run = await repo.get_by_id(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Sync run not found")
+    return run
+
+
 
 @router.get("/", summary="List and filter pricing SKUs", response_model=list[CloudPricingResponse])
 async def list_pricing(
+    response: Response,
     vendor: Optional[str] = Query(None, description="aws | azure | gcp"),
     category: Optional[str] = Query(None, description="Compute | Storage | Database | CDN"),
     region: Optional[str] = Query(None, description="Partial match, e.g. eu-west"),
@@ -43,13 +73,26 @@ async def list_pricing(
     service_name: Optional[str] = Query(None, description="Partial match on service name"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque X-Next-Cursor value from the previous page"),
     service: CloudPricingService = Depends(get_cloud_pricing_service),
 ):
-    return await service.get_filtered(
+    items, next_cursor = await service.get_filtered(
         vendor=vendor, category=category, region=region,
         instance_type=instance_type, service_name=service_name,
-        skip=skip, limit=limit,
+        skip=skip, limit=limit, cursor=cursor,
     )
+    set_next_cursor(response, next_cursor)
+    return items
+
+
+@router.get("/search", summary="Ranked full-text and fuzzy SKU search", response_model=list[PricingSearchHit])
+async def search_pricing(
+    q: str = Query(..., min_length=2, description="Free text, e.g. 'm6i.4xlarge linux' or 'blob storage'"),
+    vendor: Optional[str] = Query(None, description="aws | azure | gcp"),
+    limit: int = Query(20, ge=1, le=100),
+    service: CloudPricingService = Depends(get_cloud_pricing_service),
+):
+    return await service.search(q, limit=limit, vendor=vendor)
 
 
 @router.get("/{pricing_id}", summary="Get a single pricing SKU", response_model=CloudPricingResponse)
@@ -1,15 +1,23 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from app.core.cache import cached_route
+from app.core.pagination import set_next_cursor
 from app.services.vendor import VendorService
 from app.schemas.vendor import VendorCreate, VendorUpdate, VendorResponse, VendorSummary
 from app.core.dependencies import get_vendor_service
 
-router = APIRouter(prefix="/vendors", tags=["vendors"])
+router = APIRouter(prefix="/vendors", tags=["vendors"], route_class=cached_route("vendors"))
 
 
 @router.get("/", response_model=list[VendorResponse])
-async def get_all(skip: int = 0, limit: int = 100, service: VendorService = Depends(get_vendor_service)):
-    return await service.get_all_vendors(skip, limit)
+async def get_all(
+    response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    service: VendorService = Depends(get_vendor_service),
+):
+    vendors, next_cursor = await service.get_all_vendors(skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return vendors
 
 
 @router.get("/{id}/summary", response_model=VendorSummary)
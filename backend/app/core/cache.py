@@ -0,0 +1,238 @@
+"""
+In-process response cache for read-heavy GET routes.
+
+Routers opt in with ``route_class=cached_route("<namespace>")``. A 200
+response is stored as its encoded body and headers, keyed by method, path,
+query string and tenant (the bearer token's subject), so a hit skips the
+database and Pydantic entirely.
+
+Entries live in one LRU bounded by total body bytes
+(RESPONSE_CACHE_MAX_BYTES) and expire after RESPONSE_CACHE_TTL_SECONDS,
+which bounds staleness across workers since invalidation is per process.
+Writers call ``invalidate(namespace, ...)`` after committing — repositories
+do it from create/update/delete, the pricing sync when it finishes. A
+per-namespace generation stops a request that read before an invalidation
+from storing its now-stale response afterwards.
+
+``TTLCache`` is the small keyed counterpart for values that are not HTTP
+responses (e.g. lookups against third-party APIs): entry-bounded LRU with a
+fixed time-to-live.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Hashable, Iterable, NamedTuple, Optional
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.core.config import get_settings
+from app.core.etag import etag_matches
+from app.core.metrics import Sample, register_collector
+from app.core.security import decode_token
+
+CACHE_HEADER = "X-Cache"
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    status_code: int
+    headers: tuple[tuple[str, str], ...]
+    expires_at: float
+
+    def to_response(self, request: Request) -> Response:
+        headers = dict(self.headers)
+        headers[CACHE_HEADER] = "HIT"
+        etag = headers.get("etag")
+        if etag and etag_matches(request.headers.get("if-none-match"), etag):
+            headers.pop("content-type", None)
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, status_code=self.status_code, headers=headers)
+
+
+class ResponseCache:
+    """Byte-bounded LRU of encoded responses, grouped by namespace for invalidation."""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[str, CachedResponse]] = OrderedDict()
+        self._keys: dict[str, set[tuple]] = {}
+        self._generations: Counter[str] = Counter()
+        self.size = 0
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+        self.evictions: Counter[str] = Counter()
+        self.invalidations: Counter[str] = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def generation(self, namespace: str) -> int:
+        return self._generations[namespace]
+
+    def get(self, key: tuple, namespace: str) -> Optional[CachedResponse]:
+        item = self._entries.get(key)
+        if item is not None and item[1].expires_at <= time.monotonic():
+            self._drop(key)
+            item = None
+        if item is None:
+            self.misses[namespace] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits[namespace] += 1
+        return item[1]
+
+    def put(self, key: tuple, namespace: str, generation: int, response: Response) -> None:
+        body = bytes(response.body)
+        if not self.enabled or len(body) > self.max_bytes or self._generations[namespace] != generation:
+            return
+        headers = tuple((k, v) for k, v in response.headers.items() if k not in ("content-length", CACHE_HEADER.lower()))
+        entry = CachedResponse(body, response.status_code, headers, time.monotonic() + self.ttl_seconds)
+        self._drop(key)
+        self._entries[key] = (namespace, entry)
+        self._keys.setdefault(namespace, set()).add(key)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self.evictions[self._entries[oldest][0]] += 1
+            self._drop(oldest)
+
+    def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self._generations[namespace] += 1
+            self.invalidations[namespace] += 1
+            for key in list(self._keys.pop(namespace, ())):
+                self._drop(key)
+
+    def clear(self) -> None:
+        self.invalidate(*list(self._keys))
+
+    def _drop(self, key: tuple) -> None:
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        namespace, entry = item
+        self.size -= len(entry.body)
+        keys = self._keys.get(namespace)
+        if keys is not None:
+            keys.discard(key)
+
+    def samples(self) -> Iterable[Sample]:
+        for name, counter in (
+            ("response_cache_hits_total", self.hits),
+            ("response_cache_misses_total", self.misses),
+            ("response_cache_evictions_total", self.evictions),
+            ("response_cache_invalidations_total", self.invalidations),
+        ):
+            for namespace, value in sorted(counter.items()):
+                yield name, {"namespace": namespace}, value
+        yield "response_cache_entries", {}, len(self._entries)
+        yield "response_cache_bytes", {}, self.size
+
+
+class TTLCache:
+    """Entry-bounded LRU whose values expire ``ttl_seconds`` after being set."""
+
+    MISSING: Any = object()
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """The cached value, or ``default`` (``TTLCache.MISSING``) when absent or expired.
+
+        ``None`` is a valid cached value, so callers test against ``MISSING``.
+        """
+        item = self._entries.get(key)
+        if item is None:
+            return default
+        if item[0] <= time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return item[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_settings = get_settings()
+response_cache = ResponseCache(_settings.response_cache_max_bytes, _settings.response_cache_ttl_seconds)
+register_collector(response_cache.samples)
+
+
+def invalidate(*namespaces: str) -> None:
+    response_cache.invalidate(*namespaces)
+
+
+def _tenant(request: Request) -> str:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        payload = decode_token(token)
+        if payload and payload.get("sub"):
+            return str(payload["sub"])
+    return ""
+
+
+def cache_key(request: Request) -> tuple:
+    return (request.method, request.url.path, tuple(sorted(request.query_params.multi_items())), _tenant(request))
+
+
+def cached_route(namespace: str, uncached: tuple[str, ...] = ()) -> type[APIRoute]:
+    """Route class caching this router's GET routes under ``namespace``.
+
+    Routes whose path contains one of ``uncached`` (e.g. live status) are left alone.
+    """
+
+    class CachedRoute(APIRoute):
+        def get_route_handler(self):
+            handler = super().get_route_handler()
+            if "GET" not in self.methods or any(part in self.path_format for part in uncached):
+                return handler
+
+            async def cached_handler(request: Request) -> Response:
+                cache = response_cache
+                if not cache.enabled:
+                    return await handler(request)
+                key = cache_key(request)
+                hit = cache.get(key, namespace)
+                if hit is not None:
+                    return hit.to_response(request)
+                generation = cache.generation(namespace)
+                response = await handler(request)
+                if response.status_code == 200 and hasattr(response, "body"):
+                    cache.put(key, namespace, generation, response)
+                response.headers[CACHE_HEADER] = "MISS"
+                return response
+
+            return cached_handler
+
+    CachedRoute.__name__ = f"CachedRoute[{namespace}]"
+    return CachedRoute
@@ -0,0 +1,60 @@
+"""
+Read-your-writes across requests and worker processes.
+
+With a replica configured, a response to a request that committed a write
+sets the ``db_read_after`` cookie to the time until which that client's
+reads must stay on the primary (now + DB_REPLICA_STALENESS_SECONDS). Later
+requests carrying the cookie are routed there by ``RoutingSession``
+whichever worker process serves them, while every other client keeps
+reading from the replica. Clients that drop cookies get no such guarantee,
+and worker hosts' clocks are assumed to agree to well within the window.
+"""
+
+import math
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import database
+from app.core.config import get_settings
+
+READ_AFTER_COOKIE = "db_read_after"
+
+
+def _read_after(scope: Scope, window: float) -> float:
+    try:
+        value = float(HTTPConnection(scope).cookies.get(READ_AFTER_COOKIE, 0))
+    except ValueError:
+        return 0.0
+    # A client can only ask for the window, not pin itself to the primary.
+    return min(value, time.time() + window) if math.isfinite(value) else 0.0
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.window = get_settings().db_replica_staleness_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or database.replica_engine is None:
+            await self.app(scope, receive, send)
+            return
+
+        fence = database.WriteFence(_read_after(scope, self.window))
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and fence.wrote:
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{READ_AFTER_COOKIE}={fence.read_after:.3f}; Max-Age={math.ceil(self.window)}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        token = database.write_fence.set(fence)
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            database.write_fence.reset(token)
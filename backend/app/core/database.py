@@ -1,21 +1,108 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+"""
+Engines and sessions.
+
+The primary engine takes every write. When DATABASE_REPLICA_URL is set, a
+second engine points at a read replica and sessions from ``AsyncSessionLocal``
+route plain SELECTs there until they write anything; from the first flush,
+DML or raw SQL statement on, the session is pinned to the primary so it
+always reads its own writes. Across requests the guard is per client: a
+request that commits a write tells its client (via app.core.consistency) to
+stay on the primary for DB_REPLICA_STALENESS_SECONDS, and that client's next
+requests carry it to whichever worker process serves them.
+
+Pool sizes, timeouts and statement echo come from settings; checkout counts
+and saturation are exported through ``app.core.metrics``.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
 from app.core.config import get_settings
+from app.core.metrics import Sample, register_collector
 
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-    future=True,
-    pool_size=20,
-    max_overflow=0,
-    pool_pre_ping=True,
+
+def _create_engine(url: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.db_echo,
+        future=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=True,
+    )
+
+
+engine = _create_engine(settings.database_url, settings.db_pool_size, settings.db_max_overflow)
+replica_engine: Optional[AsyncEngine] = (
+    _create_engine(settings.database_replica_url, settings.db_replica_pool_size, settings.db_replica_max_overflow)
+    if settings.database_replica_url
+    else None
 )
 
+class WriteFence:
+    """Read-your-writes state of the current client request."""
+
+    __slots__ = ("read_after", "wrote")
+
+    def __init__(self, read_after: float = 0.0):
+        self.read_after = read_after  # epoch seconds; replica reads wait until then
+        self.wrote = False
+
+
+# Set per request by app.core.consistency; None outside requests (background jobs).
+write_fence: ContextVar[Optional[WriteFence]] = ContextVar("write_fence", default=None)
+
+
+def _replica_is_fresh() -> bool:
+    fence = write_fence.get()
+    return fence is None or time.time() >= fence.read_after
+
+
+class RoutingSession(Session):
+    """Sends reads to the replica until the session writes, then pins it to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if replica_engine is None or self.info.get("primary"):
+            return engine.sync_engine
+        if self._flushing or isinstance(clause, (UpdateBase, TextClause)) or (
+            isinstance(clause, Select) and clause._for_update_arg is not None
+        ):
+            # Raw SQL may write too; treat it like DML.
+            self.info["primary"] = self.info["wrote"] = True
+            return engine.sync_engine
+        if not _replica_is_fresh():
+            return engine.sync_engine
+        return replica_engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_written(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_write(session):
+    fence = write_fence.get()
+    if session.info.pop("wrote", False) and fence is not None:
+        fence.read_after = time.time() + settings.db_replica_staleness_seconds
+        fence.wrote = True
+
+
 AsyncSessionLocal = sessionmaker(
-    engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -24,11 +111,22 @@ AsyncSessionLocal = sessionmaker(
 Base = declarative_base()
 
 
+def use_primary(session: AsyncSession) -> AsyncSession:
+    """Pin a session to the primary, e.g. for read-modify-write request flows."""
+    session.info["primary"] = True
+    return session
+
+
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
 
 
+async def get_primary_db():
+    async with AsyncSessionLocal() as session:
+        yield use_primary(session)
+
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -36,3 +134,42 @@ async def init_db():
 
 async def close_db():
     await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+
+
+# ── pool metrics ────────────────────────────────────────────────────────────
+
+_checkouts = {"primary": 0, "replica": 0}
+_capacity = {
+    "primary": settings.db_pool_size + settings.db_max_overflow,
+    "replica": settings.db_replica_pool_size + settings.db_replica_max_overflow,
+}
+
+
+def _count_checkouts(name: str, target: AsyncEngine) -> None:
+    @event.listens_for(target.sync_engine.pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _checkouts[name] += 1
+
+
+def _pool_samples() -> Iterable[Sample]:
+    engines = {"primary": engine, "replica": replica_engine}
+    for name, target in engines.items():
+        if target is None:
+            continue
+        pool = target.sync_engine.pool
+        labels = {"engine": name}
+        capacity = _capacity[name]
+        checked_out = pool.checkedout()
+        yield "db_pool_size", labels, pool.size()
+        yield "db_pool_checked_out", labels, checked_out
+        yield "db_pool_overflow", labels, max(pool.overflow(), 0)
+        yield "db_pool_saturation", labels, checked_out / capacity if capacity else 0
+        yield "db_pool_checkouts_total", labels, _checkouts[name]
+
+
+_count_checkouts("primary", engine)
+if replica_engine is not None:
+    _count_checkouts("replica", replica_engine)
+register_collector(_pool_samples)
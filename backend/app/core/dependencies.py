@@ -14,6 +14,7 @@ from app.repositories.client import ClientRepository
 from app.repositories.market_data import MarketDataRepository
 from app.repositories.item import ItemRepository
 from app.repositories.cloud_pricing import CloudPricingRepository
+from app.repositories.pricing_sync_run import PricingSyncRunRepository
 from app.services.invoice import InvoiceService
 from app.services.vendor import VendorService
 from app.services.payment import PaymentService
@@ -23,6 +24,7 @@ from app.services.market_data import MarketDataService
 from app.services.item import ItemService
 from app.services.cloud_pricing import CloudPricingService
 from app.repositories.user import UserRepository
+from app.repositories.vendor_usage_rollup import VendorUsageRollupRepository
 from app.services.auth import AuthService
 from app.models.user import User
 
@@ -53,6 +55,12 @@ def get_item_repo(db: AsyncSession = Depends(get_db)) -> ItemRepository:
 def get_cloud_pricing_repo(db: AsyncSession = Depends(get_db)) -> CloudPricingRepository:
     return CloudPricingRepository(db)
 
+def get_pricing_sync_run_repo(db: AsyncSession = Depends(get_db)) -> PricingSyncRunRepository:
+    return PricingSyncRunRepository(db)
+
+def get_vendor_usage_repo(db: AsyncSession = Depends(get_db)) -> VendorUsageRollupRepository:
+    return VendorUsageRollupRepository(db)
+
 
 
 def get_invoice_service(repo: InvoiceRepository = Depends(get_invoice_repo)) -> InvoiceService:
@@ -109,11 +117,9 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user_id = PyUUID(payload["sub"])
-    repo = UserRepository(db)
-    user = await repo.get_by_id(user_id)
+    user = await UserRepository(db).get_active(PyUUID(payload["sub"]))
 
-    if not user or not user.is_active:
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or disabled",
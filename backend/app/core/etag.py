@@ -0,0 +1,42 @@
+"""
+Conditional GET for JSON list endpoints.
+
+The ETag is a digest of the exact response body (plus any headers that vary
+with it, such as the next-page cursor), so it changes exactly when the
+client would see different data. A request whose ``If-None-Match`` carries
+the current tag gets an empty 304 instead of the body.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Mapping, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+
+def make_etag(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    # Weak comparison (RFC 9110 §13.1.2): the W/ prefix is ignored.
+    return "*" in tags or etag in tags or etag.removeprefix("W/") in tags
+
+
+def json_with_etag(request: Request, content: Any, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """Serialise ``content`` once, tag it, and answer 304 when the client already has it."""
+    headers = dict(headers or {})
+    body = json.dumps(jsonable_encoder(content), separators=(",", ":")).encode()
+    etag = make_etag(body + json.dumps(headers, sort_keys=True).encode())
+    headers["ETag"] = etag
+    # Revalidate every time; the 304 keeps that cheap.
+    headers["Cache-Control"] = "private, no-cache"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
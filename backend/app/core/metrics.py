@@ -0,0 +1,37 @@
+"""
+Minimal Prometheus text exposition for in-process counters.
+
+Components register a collector that yields ``(name, labels, value)``
+samples; ``GET /metrics`` renders whatever the collectors report at scrape
+time, so nothing is kept here besides the collector list.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterable, Mapping
+
+Sample = tuple[str, Mapping[str, str], float]
+
+_collectors: list[Callable[[], Iterable[Sample]]] = []
+
+
+def register_collector(collector: Callable[[], Iterable[Sample]]) -> None:
+    _collectors.append(collector)
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Mapping[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+def render_metrics() -> str:
+    lines = []
+    for collector in _collectors:
+        for name, labels, value in collector():
+            lines.append(f"{name}{_labels(labels)} {value:g}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,80 @@
+"""
+Background drainers for transactional outbox tables.
+
+Request handlers append rows to an outbox table inside their own transaction
+and return; an ``OutboxWorker`` per table later claims due rows with
+``FOR UPDATE SKIP LOCKED`` (so several workers or processes never take the
+same row), performs the slow external call, and deletes or re-schedules them.
+
+The worker drains whenever ``flush_seconds`` elapse or, sooner, once
+``notify`` has reported ``batch_size`` newly committed rows.
+"""
+
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cap on consecutive drain calls per wake-up, so one backlog cannot starve shutdown.
+_MAX_ROUNDS = 1000
+
+
+def next_attempt_at(attempts: int, base_seconds: float, max_seconds: float) -> datetime:
+    """Exponential backoff after ``attempts`` failures: base, 2·base, 4·base, … capped at ``max_seconds``."""
+    delay = min(max_seconds, base_seconds * 2 ** max(attempts - 1, 0))
+    return datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+
+class OutboxWorker:
+    """Runs ``drain`` in the background; ``drain`` handles one batch and returns how many rows it finished."""
+
+    def __init__(self, name: str, drain: Callable[[], Awaitable[int]], batch_size: int, flush_seconds: float):
+        self.name = name
+        self._drain = drain
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._pending = 0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self, count: int = 1) -> None:
+        """Report ``count`` rows committed to the outbox; flushes early once a batch is waiting."""
+        self._pending += count
+        if self._pending >= self.batch_size:
+            self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"outbox:{self.name}")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def drain_all(self) -> int:
+        """Drain full batches until one comes back short; returns the rows finished."""
+        self._pending = 0
+        self._wake.clear()
+        done = 0
+        for _ in range(_MAX_ROUNDS):
+            finished = await self._drain()
+            done += finished
+            if finished < self.batch_size:
+                break
+        return done
+
+    async def _run(self) -> None:
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_seconds)
+            try:
+                await self.drain_all()
+            except Exception as exc:
+                logger.error("Outbox %s drain failed: %s", self.name, exc)
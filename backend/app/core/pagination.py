@@ -0,0 +1,101 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+A cursor is the sort-key tuple of the last row on a page, JSON-encoded and
+base64url'd so clients treat it as opaque. The next page is
+``WHERE (k1, k2, ...) < (:v1, :v2, ...)`` over a composite index on the same
+columns, so every page costs one index range scan regardless of depth —
+unlike OFFSET, which reads and discards every skipped row.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import Response
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client-supplied cursor cannot be decoded for this listing."""
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _load(key: InstrumentedAttribute, value: Any) -> Any:
+    python_type = key.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_dump(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, keys: Sequence[InstrumentedAttribute]) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise InvalidCursor("cursor does not match this listing")
+        return [_load(key, value) for key, value in zip(keys, values)]
+    except InvalidCursor:
+        raise
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise InvalidCursor("malformed cursor") from exc
+
+
+def keyset(
+    stmt: Select,
+    keys: Sequence[InstrumentedAttribute],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+    skip: int = 0,
+) -> Select:
+    """Order ``stmt`` by ``keys`` and restrict it to the page after ``cursor``.
+
+    Fetches ``limit + 1`` rows so ``page_of`` can tell whether another page
+    exists. ``skip`` is only honoured without a cursor (legacy offset clients).
+    """
+    if cursor:
+        after = tuple_(*keys)
+        bound = tuple_(*(literal(v, k.type) for k, v in zip(keys, decode_cursor(cursor, keys))))
+        stmt = stmt.where(after < bound if descending else after > bound)
+    elif skip:
+        stmt = stmt.offset(skip)
+    order = [k.desc() for k in keys] if descending else list(keys)
+    return stmt.order_by(*order).limit(limit + 1)
+
+
+def page_of(rows: Sequence[Any], keys: Sequence[InstrumentedAttribute], limit: int) -> tuple[list[Any], Optional[str]]:
+    """Trim the look-ahead row and build the cursor for the following page."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, k.key) for k in keys])
+
+
+def set_next_cursor(response: Response, cursor: Optional[str]) -> None:
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
@@ -8,13 +10,22 @@ from app.core.config import get_settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is deliberately slow (~100-300 ms) and releases the GIL, so it runs on
+# its own small pool: the event loop keeps serving while logins hash, and the
+# pool size caps how many cores a login burst can take.
+_bcrypt_executor = ThreadPoolExecutor(
+    max_workers=get_settings().password_hash_workers, thread_name_prefix="bcrypt",
+)
 
-def hash_password(plain_password: str) -> str:
-    return pwd_context.hash(plain_password)
 
+async def hash_password(plain_password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, pwd_context.hash, plain_password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, pwd_context.verify, plain_password, hashed_password)
 
 
 def create_access_token(user_id: UUID) -> str:
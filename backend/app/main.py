@@ -1,22 +1,66 @@
+import asyncio
 import logging
 import os
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(levelname)-8s %(name)s  %(message)s",
 )
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
 from app.api.routers import router
-from app.core.database import init_db, close_db
+from app.core.consistency import ReadYourWritesMiddleware
+from app.core.database import AsyncSessionLocal, init_db, close_db
+from app.core.metrics import render_metrics
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursor
 from app.core.config import get_settings
 from app.core.stripe_client import init_stripe
-from app.services.paid_service import init_paid
+from app.services.paid_service import get_paid_client, init_paid, signal_worker
+from app.services.stripe_service import payment_worker
+from app.services.stripe_webhooks import webhook_worker
+from app.pricing.catalog import get_catalog
+from app.repositories.vendor import VendorRepository
+from app.repositories.vendor_usage_rollup import VendorUsageRollupRepository
 
 logger = logging.getLogger(__name__)
 
 
+# Advisory lock key of the reconcile job: every worker process schedules it,
+# only the one that takes the lock runs it.
+_RECONCILE_LOCK_KEY = 0x76656E646F72  # "vendor"
+
+
+async def _reconcile_once() -> tuple[int, int] | None:
+    """One reconcile pass; None when another process is already running it."""
+    async with AsyncSessionLocal() as guard:
+        # Held by guard's open transaction, released when the session closes.
+        locked = await guard.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _RECONCILE_LOCK_KEY})
+        if not locked:
+            return None
+        async with AsyncSessionLocal() as db:
+            return await VendorRepository(db).reconcile_metrics(), await VendorUsageRollupRepository(db).reconcile()
+
+
+async def _reconcile_vendor_metrics(interval: float) -> None:
+    """Periodically repair trigger-maintained vendor metrics and usage rollups; normally finds nothing."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            result = await _reconcile_once()
+            if result is None:
+                continue
+            drifted, usage_drifted = result
+            if drifted:
+                logger.warning("Reconciled metrics for %d vendors", drifted)
+            if usage_drifted:
+                logger.warning("Reconciled usage rollups for %d vendors", usage_drifted)
+        except Exception as e:
+            logger.error(f"Vendor metrics reconciliation failed: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     try:
@@ -27,9 +71,34 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
+    try:
+        async with AsyncSessionLocal() as db:
+            await get_catalog(db)
+    except Exception as e:
+        # Not fatal: the catalog loads lazily on the first pricing request.
+        logger.error(f"Failed to preload pricing catalog: {e}")
+    reconcile_task = None
+    if settings.vendor_metrics_reconcile_seconds > 0:
+        reconcile_task = asyncio.create_task(_reconcile_vendor_metrics(settings.vendor_metrics_reconcile_seconds))
+    # Outbox and webhook drainers; rows they leave behind are picked up after the next start.
+    outbox_workers = [payment_worker, webhook_worker]
+    if get_paid_client() is not None:
+        outbox_workers.append(signal_worker)
+    for worker in outbox_workers:
+        worker.start()
     try:
         yield
     finally:
+        if reconcile_task is not None:
+            reconcile_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await reconcile_task
+        for worker in outbox_workers:
+            await worker.stop()
+            try:
+                await worker.drain_all()
+            except Exception as e:
+                logger.error(f"Final {worker.name} outbox flush failed: {e}")
         try:
             await close_db()
             logger.info("Database connection closed")
@@ -61,7 +130,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
+app.add_middleware(ReadYourWritesMiddleware)
+
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
 
 app.include_router(router)
 
@@ -74,3 +150,8 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return render_metrics()
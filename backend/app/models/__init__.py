@@ -6,7 +6,13 @@ from app.models.client import Client
 from app.models.market_data import MarketData
 from app.models.item import Item
 from app.models.cloud_pricing import CloudPricing
+from app.models.cloud_price_history import CloudPriceHistory
+from app.models.pricing_sync_state import PricingSyncState
+from app.models.pricing_sync_run import PricingSyncRun
 from app.models.user import User
+from app.models.vendor_usage_rollup import VendorUsageRollup
+from app.models.paid_signal import PaidSignal
+from app.models.stripe_webhook_event import StripeWebhookEvent
 
 __all__ = [
     "Invoice",
@@ -17,5 +23,11 @@ __all__ = [
     "MarketData",
     "Item",
     "CloudPricing",
+    "CloudPriceHistory",
+    "PricingSyncState",
+    "PricingSyncRun",
     "User",
+    "VendorUsageRollup",
+    "PaidSignal",
+    "StripeWebhookEvent",
 ]
@@ -0,0 +1,51 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import DDL, Column, DateTime, Numeric, String, Text, event
+from sqlalchemy.dialects.postgresql import TSTZRANGE, UUID, ExcludeConstraint
+
+from app.core.database import Base
+
+
+class CloudPriceHistory(Base):
+    """
+    Effective-dated price of a cloud_pricing SKU.
+    One row per (vendor, sku_id, source_api) per price change; the open row
+    (unbounded upper end of ``valid_during``) is the current price.
+    """
+
+    __tablename__ = "cloud_price_history"
+    __table_args__ = (
+        # Backed by a GiST index, so "price at time T" is a single index probe.
+        ExcludeConstraint(
+            ("vendor", "="),
+            ("sku_id", "="),
+            ("source_api", "="),
+            ("valid_during", "&&"),
+            name="ex_price_history_no_overlap",
+            using="gist",
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    vendor = Column(String(16), nullable=False)
+    sku_id = Column(Text, nullable=False)
+    source_api = Column(String(64), nullable=False)
+
+    price_per_unit = Column(Numeric(20, 10), nullable=False)
+    price_per_hour = Column(Numeric(20, 10), nullable=True)
+    unit = Column(Text, nullable=False)
+    currency = Column(String(8), nullable=False, default="USD")
+
+    valid_during = Column(TSTZRANGE, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+
+# Scalar equality columns inside a GiST exclusion constraint need btree_gist.
+event.listen(
+    CloudPriceHistory.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"),
+)
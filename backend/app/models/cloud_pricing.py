@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, String, Text, Numeric, DateTime, UniqueConstraint
+from sqlalchemy import DDL, Column, String, Text, Numeric, DateTime, Index, UniqueConstraint, event, func, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 from app.core.database import Base
@@ -16,6 +16,10 @@ class CloudPricing(Base):
     __tablename__ = "cloud_pricing"
     __table_args__ = (
         UniqueConstraint("vendor", "sku_id", "source_api", name="uq_pricing_vendor_sku_source"),
+        # Keyset pagination order for the list endpoint.
+        Index("ix_cloud_pricing_vendor_service_name_id", "vendor", "service_name", "id"),
+        # Comparable-price lookups within one unit dimension.
+        Index("ix_cloud_pricing_vendor_dimension_price", "vendor", "unit_dimension", "canonical_price"),
     )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -33,6 +37,10 @@ class CloudPricing(Base):
     price_per_unit = Column(Numeric(20, 10), nullable=False)
     unit = Column(Text, nullable=False)
     price_per_hour = Column(Numeric(20, 10), nullable=True)
+    # Set by the normalizer from app.pricing.units; NULL when the unit is unrecognised.
+    unit_dimension = Column(String(16), nullable=True)
+    canonical_unit = Column(String(16), nullable=True)
+    canonical_price = Column(Numeric(20, 10), nullable=True)
     currency = Column(String(8), nullable=False, default="USD")
     effective_date = Column(DateTime(timezone=True), nullable=True)
 
@@ -41,3 +49,46 @@ class CloudPricing(Base):
 
     created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+
+# Case-insensitive instance-type lookups from batched invoice matching.
+Index(
+    "ix_cloud_pricing_vendor_lower_instance_type",
+    CloudPricing.vendor,
+    func.lower(CloudPricing.instance_type),
+)
+
+
+def search_document():
+    """tsvector searched by GET /pricing/search. Must match ix_cloud_pricing_search_tsv exactly.
+
+    Constants are inlined SQL rather than bound parameters so the planner can
+    match query expressions against the index expression.
+    """
+    empty, space = text("''"), text("' '")
+    return func.to_tsvector(
+        text("'simple'::regconfig"),
+        func.coalesce(CloudPricing.service_name, empty)
+        .op("||")(space)
+        .op("||")(func.coalesce(CloudPricing.description, empty))
+        .op("||")(space)
+        .op("||")(func.coalesce(CloudPricing.instance_type, empty)),
+    )
+
+
+# Substring filters (ilike '%…%') and similarity ranking on the free-text columns.
+for _column in ("region", "instance_type", "service_name"):
+    Index(
+        f"ix_cloud_pricing_{_column}_trgm",
+        getattr(CloudPricing, _column),
+        postgresql_using="gin",
+        postgresql_ops={_column: "gin_trgm_ops"},
+    )
+
+Index("ix_cloud_pricing_search_tsv", search_document(), postgresql_using="gin")
+
+event.listen(
+    CloudPricing.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+)
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, Numeric, ForeignKey
+from sqlalchemy import DDL, Column, Index, String, Text, Integer, Boolean, DateTime, Numeric, ForeignKey, event
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
@@ -10,6 +10,13 @@ from app.core.database import Base
 
 class Invoice(Base):
     __tablename__ = "invoices"
+    # Keyset pagination order (see app.core.pagination).
+    __table_args__ = (
+        Index("ix_invoices_created_at_id", "created_at", "id"),
+        Index("ix_invoices_status_created_at_id", "status", "created_at", "id"),
+        # Per-vendor listings and the usage rollup's first/last invoice bounds.
+        Index("ix_invoices_vendor_id_created_at_id", "vendor_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     vendor_id = Column(UUID(as_uuid=True), ForeignKey("vendors.id"), nullable=True)
@@ -41,4 +48,65 @@ class Invoice(Base):
     client = relationship("Client", back_populates="invoices")
     payment = relationship("Payment", back_populates="invoice", uselist=False)
     override = relationship("Override", back_populates="invoice", uselist=False)
-    items = relationship("Item", back_populates="invoice", cascade="all, delete-orphan")
\ No newline at end of file
+    items = relationship("Item", back_populates="invoice", cascade="all, delete-orphan")
+
+
+# Vendor metrics (invoice_count, avg_invoice_amount, trust_score) are derived
+# from running sums that this trigger adjusts in the same transaction as every
+# invoice insert, delete, or change of vendor / total / confidence score, so
+# reads never aggregate. VendorRepository.reconcile_metrics repairs any drift.
+_APPLY_VENDOR_METRICS = """
+CREATE OR REPLACE FUNCTION apply_vendor_invoice_metrics(
+    vid uuid, d_count integer, d_sum numeric, d_totals integer, d_conf bigint
+) RETURNS void AS $$
+    UPDATE vendors SET
+        invoice_count = invoice_count + d_count,
+        invoice_total_sum = invoice_total_sum + d_sum,
+        invoice_total_count = invoice_total_count + d_totals,
+        confidence_sum = confidence_sum + d_conf,
+        avg_invoice_amount = (invoice_total_sum + d_sum) / NULLIF(invoice_total_count + d_totals, 0),
+        trust_score = CASE
+            WHEN invoice_count + d_count <= 0 THEN 0.5
+            ELSE LEAST(GREATEST((confidence_sum + d_conf)::numeric / (invoice_count + d_count), 0), 100) / 100
+        END
+    WHERE id = vid
+$$ LANGUAGE sql
+"""
+
+_TRACK_VENDOR_METRICS = """
+CREATE OR REPLACE FUNCTION track_vendor_invoice_metrics() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.vendor_id IS NOT DISTINCT FROM NEW.vendor_id
+       AND OLD.total IS NOT DISTINCT FROM NEW.total
+       AND OLD.confidence_score IS NOT DISTINCT FROM NEW.confidence_score THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP <> 'INSERT' AND OLD.vendor_id IS NOT NULL THEN
+        PERFORM apply_vendor_invoice_metrics(
+            OLD.vendor_id, -1, -COALESCE(OLD.total, 0),
+            -(OLD.total IS NOT NULL)::int, -COALESCE(OLD.confidence_score, 0)
+        );
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.vendor_id IS NOT NULL THEN
+        PERFORM apply_vendor_invoice_metrics(
+            NEW.vendor_id, 1, COALESCE(NEW.total, 0),
+            (NEW.total IS NOT NULL)::int, COALESCE(NEW.confidence_score, 0)
+        );
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+_VENDOR_METRICS_TRIGGER = """
+CREATE TRIGGER invoices_vendor_metrics
+AFTER INSERT OR DELETE OR UPDATE OF vendor_id, total, confidence_score ON invoices
+FOR EACH ROW EXECUTE FUNCTION track_vendor_invoice_metrics()
+"""
+
+# One statement each: asyncpg will not run several in one call.
+VENDOR_METRICS_DDL = (_APPLY_VENDOR_METRICS, _TRACK_VENDOR_METRICS, _VENDOR_METRICS_TRIGGER)
+
+for _statement in VENDOR_METRICS_DDL:
+    event.listen(Invoice.__table__, "after_create", DDL(_statement))
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Text, Numeric, DateTime, ForeignKey
+from sqlalchemy import Column, Index, Text, Numeric, DateTime, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -10,6 +10,11 @@ from app.core.database import Base
 
 class Item(Base):
     __tablename__ = "items"
+    # Keyset pagination order (see app.core.pagination).
+    __table_args__ = (
+        Index("ix_items_created_at_id", "created_at", "id"),
+        Index("ix_items_invoice_id_created_at_id", "invoice_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     invoice_id = Column(UUID(as_uuid=True), ForeignKey("invoices.id"), nullable=False)
@@ -1,17 +1,33 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Text, Numeric, DateTime
+from sqlalchemy import Column, Index, Integer, String, Text, Numeric, DateTime, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.core.database import Base
 
+# Bucket widths, finest first. Pricing syncs write "hour" buckets; the
+# repository rolls completed buckets up into the next width.
+GRANULARITIES = ("hour", "day", "week")
+
 
 class MarketData(Base):
+    """
+    Time-bucketed benchmark price for a (name, category) pair.
+    ``timestamp`` is the bucket start and ``price_per_unit`` the mean of
+    ``sample_count`` observed prices.
+    """
+
     __tablename__ = "market_data"
+    __table_args__ = (
+        UniqueConstraint("name", "category", "granularity", "timestamp", name="uq_market_data_bucket"),
+        Index("ix_market_data_granularity_timestamp", "granularity", "timestamp"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(Text, nullable=False, index=True)
     category = Column(Text, nullable=False, index=True)
     price_per_unit = Column(Numeric, nullable=False)
     timestamp = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    granularity = Column(String(8), nullable=False, default="hour", server_default="hour")
+    sample_count = Column(Integer, nullable=False, default=1, server_default="1")
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Index, Text, Boolean, DateTime, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -10,6 +10,10 @@ from app.core.database import Base
 
 class Override(Base):
     __tablename__ = "overrides"
+    # Keyset pagination order (see app.core.pagination).
+    __table_args__ = (
+        Index("ix_overrides_timestamp_id", "timestamp", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     invoice_id = Column(UUID(as_uuid=True), ForeignKey("invoices.id"), nullable=False, unique=True)
@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, Column, DateTime, Identity, Index, Integer, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.core.database import Base
+
+
+class PaidSignal(Base):
+    """
+    Outbox of Paid.ai value signals. Request handlers insert rows in their own
+    transaction; app.services.paid_service drains them in batches, deleting
+    each row once Paid.ai accepted it and pushing ``next_attempt_at`` back
+    (with ``attempts`` and ``last_error``) when the call failed. A row that
+    still fails after PAID_SIGNAL_MAX_ATTEMPTS is kept with ``failed_at`` set
+    and never claimed again (dead letter).
+    """
+
+    __tablename__ = "paid_signal_outbox"
+    # Claim order for the flusher: due rows, oldest first; dead letters excluded.
+    __table_args__ = (
+        Index(
+            "ix_paid_signal_outbox_next_attempt_at_id",
+            "next_attempt_at",
+            "id",
+            postgresql_where=text("failed_at IS NULL"),
+        ),
+    )
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    customer_external_id = Column(Text, nullable=False)
+    event_name = Column(Text, nullable=False)
+    data = Column(JSONB, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    failed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, String, Text, Numeric, DateTime, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, Text, Numeric, DateTime, ForeignKey, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -10,6 +10,11 @@ from app.core.database import Base
 
 class Payment(Base):
     __tablename__ = "payments"
+    # Keyset pagination order (see app.core.pagination).
+    __table_args__ = (
+        Index("ix_payments_initiated_at_id", "initiated_at", "id"),
+        Index("ix_payments_status_initiated_at_id", "status", "initiated_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     invoice_id = Column(UUID(as_uuid=True), ForeignKey("invoices.id"), nullable=False, unique=True)
@@ -19,5 +24,9 @@ class Payment(Base):
     status = Column(String(20), nullable=False, default="initiated", index=True)
     initiated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
     confirmed_at = Column(DateTime(timezone=True), nullable=True)
+    # Payout outbox bookkeeping for "pending" rows (see app.services.stripe_service).
+    attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), server_default=text("now()"))
+    last_error = Column(Text, nullable=True)
 
     invoice = relationship("Invoice", back_populates="payment")
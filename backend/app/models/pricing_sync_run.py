@@ -0,0 +1,30 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+from app.core.database import Base
+
+
+class PricingSyncRun(Base):
+    """
+    One row per pricing sync attempt, written by app.pricing.sync.
+    ``phase`` tracks progress while ``status`` is "running"; ``sources`` holds
+    the per-source fetch stats (record counts, skips, errors).
+    """
+
+    __tablename__ = "pricing_sync_runs"
+    __table_args__ = (
+        Index("ix_pricing_sync_runs_started_at_id", "started_at", "id"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status = Column(String(16), nullable=False, default="running", index=True)
+    phase = Column(String(16), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    records_seen = Column(Integer, nullable=True)
+    rows_affected = Column(Integer, nullable=True)
+    sources = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
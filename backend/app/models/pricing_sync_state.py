@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.core.database import Base
+
+
+class PricingSyncState(Base):
+    """
+    Single-row table (id = 1) holding the cloud_pricing generation.
+    Bumped in the same transaction as every bulk pricing upsert so each worker's
+    in-memory catalog can tell when it is stale. ``summary`` caches the
+    /pricing/sync/status aggregates for that generation.
+    """
+
+    __tablename__ = "pricing_sync_state"
+
+    id = Column(Integer, primary_key=True, default=1)
+    generation = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    summary = Column(JSONB, nullable=True)
@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Index, Integer, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.core.database import Base
+
+
+class StripeWebhookEvent(Base):
+    """
+    Stripe webhook events as received, keyed by Stripe's event id so a
+    redelivered event is stored (and so processed) only once. The webhook
+    endpoint only inserts; app.services.stripe_webhooks applies unprocessed
+    rows in batches and stamps ``processed_at``. An event that still fails
+    after STRIPE_WEBHOOK_MAX_ATTEMPTS is kept with ``failed_at`` set and never
+    claimed again (dead letter). Processed rows are kept for
+    STRIPE_WEBHOOK_RETENTION_DAYS to keep deduplicating late retries.
+    """
+
+    __tablename__ = "stripe_webhook_events"
+    __table_args__ = (
+        Index(
+            "ix_stripe_webhook_events_pending",
+            "next_attempt_at",
+            "received_at",
+            postgresql_where=text("processed_at IS NULL AND failed_at IS NULL"),
+        ),
+        Index("ix_stripe_webhook_events_processed_at", "processed_at"),
+    )
+
+    id = Column(Text, primary_key=True)
+    type = Column(Text, nullable=False)
+    payload = Column(JSONB, nullable=False)
+    received_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    last_error = Column(Text, nullable=True)
+    failed_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Text, Integer, Numeric, DateTime
+from sqlalchemy import BigInteger, Column, Index, Text, Integer, Numeric, DateTime, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
@@ -9,6 +9,10 @@ from app.core.database import Base
 
 class Vendor(Base):
     __tablename__ = "vendors"
+    # Keyset pagination order (see app.core.pagination).
+    __table_args__ = (
+        Index("ix_vendors_created_at_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(Text, nullable=False)
@@ -19,6 +23,11 @@ class Vendor(Base):
     avg_invoice_amount = Column(Numeric, nullable=True)
     invoice_count = Column(Integer, nullable=False, default=0)
     trust_score = Column(Numeric, nullable=False, default=0.5)
+    # Running sums behind the three metrics above, kept current by the
+    # invoices_vendor_metrics trigger (see app.models.invoice).
+    invoice_total_sum = Column(Numeric, nullable=False, default=0, server_default=text("0"))
+    invoice_total_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    confidence_sum = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
     auto_approve_threshold = Column(Integer, nullable=False, default=85)
     vendor_address = Column(Text, nullable=True)
     stripe_account_id = Column(Text, nullable=True)
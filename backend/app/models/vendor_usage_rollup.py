@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DDL, Column, DateTime, ForeignKey, Integer, Numeric, event, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+from app.models.invoice import Invoice
+
+# Statuses counted as blocked fraud on the paid-blocks usage widget.
+FRAUD_STATUSES = ("rejected", "overcharge")
+
+
+class VendorUsageRollup(Base):
+    """
+    Per-vendor invoice aggregates behind GET /paid-blocks/usage.
+    Kept current by the invoices_vendor_usage trigger below, in the same
+    transaction as every invoice write that moves them, so the widget reads
+    one row instead of aggregating the vendor's invoice history.
+    VendorUsageRollupRepository.reconcile repairs any drift.
+    """
+
+    __tablename__ = "vendor_usage_rollups"
+
+    vendor_id = Column(UUID(as_uuid=True), ForeignKey("vendors.id", ondelete="CASCADE"), primary_key=True)
+    invoice_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    total_sum = Column(Numeric, nullable=False, default=0, server_default=text("0"))
+    fraud_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    fraud_total = Column(Numeric, nullable=False, default=0, server_default=text("0"))
+    negotiation_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    first_invoice_at = Column(DateTime(timezone=True), nullable=True)
+    last_invoice_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), server_default=text("now()"))
+
+
+_STATUSES_SQL = ", ".join(f"'{status}'" for status in FRAUD_STATUSES)
+
+# Adds (sign = 1) or removes (sign = -1) one invoice's contribution. Removing
+# the vendor's first or last invoice re-reads the bounds through
+# ix_invoices_vendor_id_created_at_id; the AFTER trigger runs once the row is
+# already gone (or changed), so that read sees the new state.
+_APPLY_VENDOR_USAGE = f"""
+CREATE OR REPLACE FUNCTION apply_vendor_usage_rollup(
+    vid uuid, sign integer, amount numeric, inv_status text, negotiated boolean, created timestamptz
+) RETURNS void AS $$
+DECLARE
+    fraud integer := (inv_status IN ({_STATUSES_SQL}))::int;
+BEGIN
+    INSERT INTO vendor_usage_rollups AS r (
+        vendor_id, invoice_count, total_sum, fraud_count, fraud_total, negotiation_count,
+        first_invoice_at, last_invoice_at, updated_at
+    ) VALUES (
+        vid, sign, sign * COALESCE(amount, 0), sign * fraud, sign * fraud * COALESCE(amount, 0),
+        sign * negotiated::int,
+        CASE WHEN sign > 0 THEN created END, CASE WHEN sign > 0 THEN created END, now()
+    )
+    ON CONFLICT (vendor_id) DO UPDATE SET
+        invoice_count = r.invoice_count + EXCLUDED.invoice_count,
+        total_sum = r.total_sum + EXCLUDED.total_sum,
+        fraud_count = r.fraud_count + EXCLUDED.fraud_count,
+        fraud_total = r.fraud_total + EXCLUDED.fraud_total,
+        negotiation_count = r.negotiation_count + EXCLUDED.negotiation_count,
+        first_invoice_at = LEAST(r.first_invoice_at, EXCLUDED.first_invoice_at),
+        last_invoice_at = GREATEST(r.last_invoice_at, EXCLUDED.last_invoice_at),
+        updated_at = now();
+    IF sign < 0 THEN
+        UPDATE vendor_usage_rollups SET
+            first_invoice_at = (SELECT min(created_at) FROM invoices WHERE vendor_id = vid),
+            last_invoice_at = (SELECT max(created_at) FROM invoices WHERE vendor_id = vid)
+        WHERE vendor_id = vid
+          AND (first_invoice_at >= created OR last_invoice_at <= created);
+    END IF;
+END
+$$ LANGUAGE plpgsql
+"""
+
+_TRACK_VENDOR_USAGE = """
+CREATE OR REPLACE FUNCTION track_vendor_usage_rollup() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.vendor_id IS NOT DISTINCT FROM NEW.vendor_id
+       AND OLD.total IS NOT DISTINCT FROM NEW.total
+       AND OLD.status IS NOT DISTINCT FROM NEW.status
+       AND (OLD.negotiation_email IS NULL) = (NEW.negotiation_email IS NULL)
+       AND OLD.created_at IS NOT DISTINCT FROM NEW.created_at THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP <> 'INSERT' AND OLD.vendor_id IS NOT NULL THEN
+        PERFORM apply_vendor_usage_rollup(
+            OLD.vendor_id, -1, OLD.total, OLD.status, OLD.negotiation_email IS NOT NULL, OLD.created_at
+        );
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.vendor_id IS NOT NULL THEN
+        PERFORM apply_vendor_usage_rollup(
+            NEW.vendor_id, 1, NEW.total, NEW.status, NEW.negotiation_email IS NOT NULL, NEW.created_at
+        );
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+_VENDOR_USAGE_TRIGGER = """
+CREATE TRIGGER invoices_vendor_usage
+AFTER INSERT OR DELETE OR UPDATE OF vendor_id, total, status, negotiation_email, created_at ON invoices
+FOR EACH ROW EXECUTE FUNCTION track_vendor_usage_rollup()
+"""
+
+# One statement each: asyncpg will not run several in one call. The trigger
+# lives on invoices, so it is installed when that table is created; plpgsql
+# only resolves vendor_usage_rollups when the function first runs.
+VENDOR_USAGE_DDL = (_APPLY_VENDOR_USAGE, _TRACK_VENDOR_USAGE, _VENDOR_USAGE_TRIGGER)
+
+for _statement in VENDOR_USAGE_DDL:
+    event.listen(Invoice.__table__, "after_create", DDL(_statement))
@@ -0,0 +1,274 @@
+"""
+In-process, read-only snapshot of the cloud_pricing table.
+
+The table only changes when a sync runs, so request paths (invoice checks,
+extraction context) read from a column-oriented snapshot instead of querying
+Postgres. Each snapshot is tagged with the generation stored in
+``pricing_sync_state``; ``get_catalog`` re-checks that generation at most every
+PRICING_CATALOG_POLL_SECONDS and swaps in a fresh snapshot when another worker
+(or this one) has synced. ``raw_attributes`` is deliberately left out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import time
+from array import array
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Iterable, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.pricing.recognizer import Attributes, Recognizer
+from app.repositories.cloud_pricing import CloudPricingRepository
+
+logger = logging.getLogger(__name__)
+
+CATALOG_POLL_SECONDS = float(os.getenv("PRICING_CATALOG_POLL_SECONDS", "5"))
+CANDIDATES_PER_LINE = max(1, int(os.getenv("PRICING_CANDIDATES_PER_LINE", "5")))
+
+# Service names are camel-cased ("AmazonEC2", "AWSLambda") or spaced ("Compute Engine").
+_SERVICE_TOKEN_RE = re.compile(r"[A-Z0-9]+(?![a-z])|[A-Z]?[a-z0-9]+")
+_TEXT_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SKU_TOKEN_RE = re.compile(r"[^\s,;:()\[\]{}\"']+")
+_SERVICE_STOPWORDS = frozenset({"amazon", "aws", "azure", "microsoft", "google", "gcp", "cloud", "service", "services"})
+# How far down a service's posting list to look for a row in the wanted region.
+_SERVICE_SCAN_LIMIT = 1000
+
+COLUMNS: tuple[str, ...] = (
+    "id",
+    "vendor",
+    "service_name",
+    "category",
+    "sku_id",
+    "description",
+    "region",
+    "instance_type",
+    "operating_system",
+    "price_per_unit",
+    "unit",
+    "price_per_hour",
+    "unit_dimension",
+    "canonical_unit",
+    "canonical_price",
+    "currency",
+    "effective_date",
+    "source_api",
+    "created_at",
+    "updated_at",
+)
+
+
+def _ts(value: Optional[datetime]) -> float:
+    return value.timestamp() if value is not None else float("-inf")
+
+
+def _postings() -> defaultdict[Any, array]:
+    return defaultdict(lambda: array("I"))
+
+
+def service_tokens(service_name: Optional[str]) -> set[str]:
+    """Distinctive lower-case words of a service name: ``AmazonEC2`` → ``{"ec2"}``."""
+    if not service_name:
+        return set()
+    tokens = {t.lower() for t in _SERVICE_TOKEN_RE.findall(service_name)}
+    return {t for t in tokens if len(t) > 1 and t not in _SERVICE_STOPWORDS}
+
+
+class PricingCatalog:
+    """Immutable columnar snapshot with posting-list indexes.
+
+    Rows are addressed by position; each column is a plain list and each index
+    maps a key to an ``array('I')`` of row positions, newest ``updated_at`` first.
+    """
+
+    def __init__(self, rows: Iterable[Sequence], generation: tuple[int, Optional[datetime]] = (0, None)):
+        self.generation = generation
+        self.columns: dict[str, list] = {c: [] for c in COLUMNS}
+        cols = [self.columns[c] for c in COLUMNS]
+        for row in rows:
+            for col, value in zip(cols, row):
+                col.append(value)
+
+        n = len(self.columns["id"])
+        updated = self.columns["updated_at"]
+        order = sorted(range(n), key=lambda i: _ts(updated[i]), reverse=True)
+
+        self.by_vendor = _postings()
+        self.by_sku = _postings()
+        self.by_instance_type = _postings()
+        self.by_region = _postings()
+        self.by_service_token = _postings()
+        vendor, sku, itype, region, service = (
+            self.columns["vendor"], self.columns["sku_id"],
+            self.columns["instance_type"], self.columns["region"], self.columns["service_name"],
+        )
+        tokens_of: dict[str, set[str]] = {}
+        for i in order:
+            v = vendor[i]
+            self.by_vendor[v].append(i)
+            self.by_sku[(v, sku[i])].append(i)
+            if itype[i]:
+                self.by_instance_type[(v, itype[i].lower())].append(i)
+            if region[i]:
+                self.by_region[(v, region[i].lower())].append(i)
+            name = service[i]
+            if name not in tokens_of:
+                tokens_of[name] = service_tokens(name)
+            for token in tokens_of[name]:
+                self.by_service_token[(v, token)].append(i)
+
+        # Freeze: lookups of unknown keys must not grow the indexes.
+        self.by_vendor = dict(self.by_vendor)
+        self.by_sku = dict(self.by_sku)
+        self.by_instance_type = dict(self.by_instance_type)
+        self.by_region = dict(self.by_region)
+        self.by_service_token = dict(self.by_service_token)
+        self._recognizers: dict[str, Recognizer] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def row(self, i: int) -> dict[str, Any]:
+        return {c: self.columns[c][i] for c in COLUMNS}
+
+    def latest(self, vendor: Optional[str] = None, limit: int = 50) -> list[int]:
+        """Positions of the most recently updated rows, optionally for one vendor."""
+        if vendor is not None:
+            return list(self.by_vendor.get(vendor, ())[:limit])
+        updated = self.columns["updated_at"]
+        return sorted(range(len(self)), key=lambda i: _ts(updated[i]), reverse=True)[:limit]
+
+    def recognizer(self, vendor: str) -> Recognizer:
+        """Automaton over this vendor's instance types and regions, built on first use per snapshot."""
+        vendor = vendor.lower()
+        recognizer = self._recognizers.get(vendor)
+        if recognizer is None:
+            itype, region = self.columns["instance_type"], self.columns["region"]
+            positions = self.by_vendor.get(vendor, ())
+            recognizer = Recognizer(
+                [("instance_type", itype[i]) for i in positions if itype[i]]
+                + [("region", region[i]) for i in positions if region[i]]
+            )
+            self._recognizers[vendor] = recognizer
+        return recognizer
+
+    def recognize(self, vendor: str, text: Optional[str]) -> Attributes:
+        return self.recognizer(vendor).recognize(text)
+
+    def candidates(self, vendor: Optional[str], text: Optional[str], limit: int = CANDIDATES_PER_LINE) -> list[int]:
+        """Positions of up to ``limit`` rows relevant to one invoice line, most specific first.
+
+        Tiers: SKU ids quoted in the text, then the recognised instance type
+        (rows in the recognised region first), then rows of services named in
+        the text. Every tier is a posting-list lookup, so the cost depends on
+        the line, not on the catalog size. ``vendor=None`` searches every vendor.
+        """
+        if not text or limit <= 0:
+            return []
+        vendors = [vendor.lower()] if vendor else list(self.by_vendor)
+        picked: dict[int, None] = {}
+
+        def take(positions: Iterable[int]) -> bool:
+            for i in positions:
+                picked.setdefault(i, None)
+                if len(picked) >= limit:
+                    return True
+            return False
+
+        sku_tokens = _SKU_TOKEN_RE.findall(text)
+        words = set(_TEXT_TOKEN_RE.findall(text.lower()))
+        regions = self.columns["region"]
+        for v in vendors:
+            for token in sku_tokens:
+                if take(self.by_sku.get((v, token), ())):
+                    return list(picked)
+
+            found = self.recognize(v, text)
+            wanted = found.region.lower() if found.region else None
+            if found.instance_type:
+                rows = self.by_instance_type.get((v, found.instance_type.lower()), ())
+                if wanted and take(i for i in rows if (regions[i] or "").lower() == wanted):
+                    return list(picked)
+                if take(rows):
+                    return list(picked)
+
+            for token in sorted(words):
+                rows = self.by_service_token.get((v, token), ())
+                if wanted:
+                    scan = rows[:_SERVICE_SCAN_LIMIT]
+                    if take(i for i in scan if (regions[i] or "").lower() == wanted):
+                        return list(picked)
+                if take(rows[:limit]):
+                    return list(picked)
+        return list(picked)
+
+    def find_best_match(
+        self, vendor: str, sku_id: Optional[str], instance_type: Optional[str], region: Optional[str],
+    ) -> Optional[int]:
+        """Same tiers as CloudPricingRepository.find_best_matches, answered from memory."""
+        vendor = vendor.lower()
+        dimension = self.columns["unit_dimension"]
+
+        if sku_id:
+            for i in self.by_sku.get((vendor, sku_id), ()):
+                if dimension[i] == "time":
+                    return i
+
+        if not instance_type:
+            return None
+        candidates = [i for i in self.by_instance_type.get((vendor, instance_type.lower()), ()) if dimension[i] == "time"]
+        if region:
+            needle = region.lower()
+            regions = self.columns["region"]
+            for i in candidates:
+                if regions[i] and needle in regions[i].lower():
+                    return i
+        return candidates[0] if candidates else None
+
+    def find_best_matches(
+        self, items: Sequence[tuple[str, Optional[str], Optional[str], Optional[str]]],
+    ) -> list[Optional[int]]:
+        return [self.find_best_match(*item) for item in items]
+
+
+_catalog: Optional[PricingCatalog] = None
+_checked_at = 0.0
+_lock = asyncio.Lock()
+
+
+async def load_catalog(db: AsyncSession) -> PricingCatalog:
+    repo = CloudPricingRepository(db)
+    generation = await repo.get_generation()
+    rows = [row async for row in repo.iter_catalog_rows(COLUMNS)]
+    catalog = PricingCatalog(rows, generation=generation)
+    logger.info("Loaded pricing catalog generation %s (%d rows)", generation[0], len(catalog))
+    return catalog
+
+
+async def get_catalog(db: AsyncSession, force: bool = False) -> PricingCatalog:
+    """Read-through accessor: returns the current snapshot, reloading when the generation moved."""
+    global _catalog, _checked_at
+    catalog = _catalog
+    if not force and catalog is not None and time.monotonic() - _checked_at < CATALOG_POLL_SECONDS:
+        return catalog
+
+    async with _lock:
+        if not force and _catalog is not None and time.monotonic() - _checked_at < CATALOG_POLL_SECONDS:
+            return _catalog
+        generation = await CloudPricingRepository(db).get_generation()
+        if force or _catalog is None or _catalog.generation != generation:
+            _catalog = await load_catalog(db)
+        _checked_at = time.monotonic()
+        return _catalog
+
+
+def reset_catalog() -> None:
+    """Drop the cached snapshot; the next ``get_catalog`` call reloads."""
+    global _catalog, _checked_at
+    _catalog = None
+    _checked_at = 0.0
@@ -3,22 +3,37 @@ Fetches raw pricing data from cloud provider APIs.
 Returns a dict keyed by source name, ready for normalize_all().
 
 Runs synchronous HTTP calls — use asyncio.to_thread(fetch_all)
-from async code.
+from async code. All requests go through one pooled requests.Session with
+Retry-After-aware backoff on 429/5xx; GCP services and Azure region/service
+shards are paged concurrently on a small thread pool.
 
 REQUIRED ENV VARS:
   INFRACOST_API_KEY  – from: infracost auth login
   GCP_API_KEY        – Google Cloud Billing API key
+
+OPTIONAL ENV VARS:
+  PRICING_FETCH_WORKERS    – concurrent page streams (default 4)
+  INFRACOST_FILTERS_FILE   – JSON list of Infracost filter specs (see DEFAULT_INFRACOST_SPECS)
+  INFRACOST_BATCH_SIZE     – product filters per aliased GraphQL request (default 10)
+  INFRACOST_CONCURRENCY    – concurrent Infracost requests (default 4)
+  AZURE_PRICING_REGIONS    – comma-separated armRegionName shards (default westeurope)
+  AZURE_SERVICE_FAMILIES   – comma-separated serviceFamily shards
 """
 
 from __future__ import annotations
 
 import csv
 import io
+import json
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
@@ -34,10 +49,65 @@ GCP_KEY = (
 
 MAX_RECORDS = int(os.getenv("PRICING_MAX_RECORDS", "5"))
 
+FETCH_WORKERS = max(1, int(os.getenv("PRICING_FETCH_WORKERS", "4")))
+
+
+def _env_list(name: str, default: str) -> List[str]:
+    return [v.strip() for v in os.getenv(name, default).split(",") if v.strip()]
+
+
+AZURE_REGIONS = _env_list("AZURE_PRICING_REGIONS", "westeurope")
+AZURE_SERVICE_FAMILIES = _env_list("AZURE_SERVICE_FAMILIES", "Compute,Storage,Databases,Networking")
+
+_RETRY = Retry(
+    total=6,
+    backoff_factor=1.0,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# Infracost batches are bisected on payload rejections, so keep the transport
+# retries for the GraphQL POST short — a split must not replay six backoffs per half.
+_POST_RETRY = Retry(
+    total=2,
+    backoff_factor=1.0,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"POST"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Process-wide Session so every page reuses pooled keep-alive connections."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=8,
+                    pool_maxsize=FETCH_WORKERS * 2,
+                    max_retries=_RETRY,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.mount(
+                    _INFRACOST_ENDPOINT,
+                    HTTPAdapter(pool_maxsize=INFRACOST_CONCURRENCY, max_retries=_POST_RETRY),
+                )
+                _session = session
+    return _session
+
 
 
 def _stream_aws_csv(url: str, max_lines: int = 60_000) -> Tuple[List[str], List[Dict]]:
-    resp = requests.get(url, stream=True, timeout=_TIMEOUT_LONG)
+    resp = _get_session().get(url, stream=True, timeout=_TIMEOUT_LONG)
     resp.raise_for_status()
 
     raw_lines: List[str] = []
@@ -76,97 +146,161 @@ def _stream_aws_csv(url: str, max_lines: int = 60_000) -> Tuple[List[str], List[
 
 
 
+# Each spec expands to one product filter per (region, purchase option). The
+# default reproduces the original three hand-written queries; set
+# INFRACOST_FILTERS_FILE to a JSON list of specs in the same shape to widen it.
+DEFAULT_INFRACOST_SPECS: List[Dict] = [
+    {
+        "label": "AWS EC2 Linux",
+        "vendorName": "aws",
+        "service": "AmazonEC2",
+        "productFamily": "Compute Instance",
+        "regions": ["us-east-1", "eu-west-1"],
+        "attributeFilters": [
+            {"key": "operatingSystem", "value": "Linux"},
+            {"key": "tenancy", "value": "Shared"},
+            {"key": "capacitystatus", "value": "Used"},
+            {"key": "preInstalledSw", "value": "NA"},
+        ],
+        "purchaseOptions": ["on_demand"],
+    },
+    {
+        "label": "Azure VMs",
+        "vendorName": "azure",
+        "service": "Virtual Machines",
+        "regions": ["westus"],
+        "purchaseOptions": ["Consumption"],
+    },
+]
+
+INFRACOST_BATCH_SIZE = max(1, int(os.getenv("INFRACOST_BATCH_SIZE", "10")))
+INFRACOST_CONCURRENCY = max(1, int(os.getenv("INFRACOST_CONCURRENCY", "4")))
+
+_INFRACOST_ENDPOINT = "https://pricing.api.infracost.io/graphql"
+_INFRACOST_SPLIT_STATUS = frozenset({400, 413, 422})
+_INFRACOST_PRODUCT_FIELDS = """
+        vendorName service productFamily region
+        attributes {{ key value }}
+        prices(filter: $p{i}) {{ USD unit description effectiveDateStart }}"""
+
+
+def _load_infracost_specs() -> List[Dict]:
+    path = os.getenv("INFRACOST_FILTERS_FILE", "")
+    if not path:
+        return DEFAULT_INFRACOST_SPECS
+    with open(path, encoding="utf-8") as fh:
+        specs = json.load(fh)
+    if not isinstance(specs, list):
+        raise ValueError(f"{path}: expected a JSON list of Infracost filter specs")
+    return specs
+
+
+def _expand_infracost_specs(specs: List[Dict]) -> List[Dict]:
+    """Flatten specs into {label, product_filter, price_filter} entries."""
+    expanded = []
+    for spec in specs:
+        for region in spec.get("regions") or [None]:
+            for option in spec.get("purchaseOptions") or [None]:
+                product_filter = {
+                    k: spec[k] for k in ("vendorName", "service", "productFamily") if spec.get(k)
+                }
+                if region:
+                    product_filter["region"] = region
+                if spec.get("attributeFilters"):
+                    product_filter["attributeFilters"] = spec["attributeFilters"]
+                label = spec.get("label") or f"{spec.get('vendorName')} {spec.get('service')}"
+                expanded.append({
+                    "label": " ".join(filter(None, [label, option, f"({region})" if region else None])),
+                    "product_filter": product_filter,
+                    "price_filter": {"purchaseOption": option} if option else {},
+                })
+    return expanded
+
+
+def _build_infracost_query(batch: List[Dict]) -> Tuple[str, Dict]:
+    """One aliased GraphQL document for a batch of filters, with typed variables."""
+    var_defs, selections, variables = [], [], {}
+    for i, entry in enumerate(batch):
+        var_defs.append(f"$f{i}: ProductFilter!, $p{i}: PriceFilter")
+        selections.append(
+            f"  q{i}: products(filter: $f{i}) {{" + _INFRACOST_PRODUCT_FIELDS.format(i=i) + "\n  }"
+        )
+        variables[f"f{i}"] = entry["product_filter"]
+        variables[f"p{i}"] = entry["price_filter"]
+    query = f"query({', '.join(var_defs)}) {{\n" + "\n".join(selections) + "\n}"
+    return query, variables
+
+
+def _is_payload_rejection(exc: Exception) -> bool:
+    """True when the server refused this request body, so a smaller batch may succeed."""
+    if isinstance(exc, requests.HTTPError):
+        return exc.response is not None and exc.response.status_code in _INFRACOST_SPLIT_STATUS
+    return isinstance(exc, ValueError)
+
+
+def _run_infracost_batch(batch: List[Dict]) -> List[Dict]:
+    """POST one batch. A rejected payload is bisected so one bad or oversized filter
+    only costs its own half of the batch; transport failures the adapter already
+    retried drop the batch without splitting."""
+    query, variables = _build_infracost_query(batch)
+    try:
+        resp = _get_session().post(
+            _INFRACOST_ENDPOINT,
+            headers={"X-Api-Key": INFRACOST_KEY, "Content-Type": "application/json"},
+            json={"query": query, "variables": variables},
+            timeout=_TIMEOUT_LONG,
+        )
+        resp.raise_for_status()
+        body = resp.json()
+    except Exception as exc:
+        if not _is_payload_rejection(exc):
+            logger.exception("Infracost batch of %d failed: %s", len(batch), exc)
+            return []
+        if len(batch) == 1:
+            logger.exception("Infracost query failed for %s: %s", batch[0]["label"], exc)
+            return []
+        mid = len(batch) // 2
+        logger.warning("Infracost batch of %d failed (%s) — splitting", len(batch), exc)
+        return _run_infracost_batch(batch[:mid]) + _run_infracost_batch(batch[mid:])
+
+    if body.get("errors"):
+        # Errors are per alias; data for the aliases that resolved is still usable.
+        logger.error("Infracost GraphQL errors: %s", body["errors"])
+
+    data = body.get("data") or {}
+    products: List[Dict] = []
+    for i, entry in enumerate(batch):
+        aliased = data.get(f"q{i}") or []
+        for p in aliased:
+            p["_query_label"] = entry["label"]
+        products.extend(aliased)
+        logger.info("Infracost [%s] → %d products", entry["label"], len(aliased))
+    return products
+
+
 def fetch_infracost() -> Dict:
     if not INFRACOST_KEY:
         logger.warning("INFRACOST_API_KEY not set — skipping")
         return {"status": "skipped", "reason": "INFRACOST_API_KEY not set"}
 
-    endpoint = "https://pricing.api.infracost.io/graphql"
-    queries = [
-        {
-            "label": "AWS EC2 Linux OnDemand (us-east-1)",
-            "query": """{
-                products(filter: {
-                    vendorName: "aws", service: "AmazonEC2",
-                    productFamily: "Compute Instance", region: "us-east-1",
-                    attributeFilters: [
-                        {key: "operatingSystem", value: "Linux"},
-                        {key: "tenancy", value: "Shared"},
-                        {key: "capacitystatus", value: "Used"},
-                        {key: "preInstalledSw", value: "NA"}
-                    ]
-                }) {
-                    vendorName service productFamily region
-                    attributes { key value }
-                    prices(filter: {purchaseOption: "on_demand"}) {
-                        USD unit description effectiveDateStart
-                    }
-                }
-            }""",
-        },
-        {
-            "label": "AWS EC2 Linux OnDemand (eu-west-1)",
-            "query": """{
-                products(filter: {
-                    vendorName: "aws", service: "AmazonEC2",
-                    productFamily: "Compute Instance", region: "eu-west-1",
-                    attributeFilters: [
-                        {key: "operatingSystem", value: "Linux"},
-                        {key: "tenancy", value: "Shared"},
-                        {key: "capacitystatus", value: "Used"},
-                        {key: "preInstalledSw", value: "NA"}
-                    ]
-                }) {
-                    vendorName service productFamily region
-                    attributes { key value }
-                    prices(filter: {purchaseOption: "on_demand"}) {
-                        USD unit description effectiveDateStart
-                    }
-                }
-            }""",
-        },
-        {
-            "label": "Azure VMs (westus)",
-            "query": """{
-                products(filter: {
-                    vendorName: "azure", service: "Virtual Machines", region: "westus"
-                }) {
-                    vendorName service productFamily region
-                    attributes { key value }
-                    prices(filter: {purchaseOption: "Consumption"}) {
-                        USD unit description effectiveDateStart
-                    }
-                }
-            }""",
-        },
-    ]
+    try:
+        filters = _expand_infracost_specs(_load_infracost_specs())
+    except (OSError, ValueError) as exc:
+        logger.exception("Invalid Infracost filter config: %s", exc)
+        return {"status": "error", "error": str(exc)}
 
-    all_products = []
-    for q in queries:
-        try:
-            resp = requests.post(
-                endpoint,
-                headers={"X-Api-Key": INFRACOST_KEY, "Content-Type": "application/json"},
-                json={"query": q["query"]},
-                timeout=_TIMEOUT_SHORT,
-            )
-            resp.raise_for_status()
-            body = resp.json()
-            if body.get("errors"):
-                logger.error("Infracost GraphQL errors: %s", body["errors"])
-                continue
-            products = (body.get("data") or {}).get("products") or []
-            for p in products:
-                p["_query_label"] = q["label"]
+    batches = [filters[i:i + INFRACOST_BATCH_SIZE] for i in range(0, len(filters), INFRACOST_BATCH_SIZE)]
+    all_products: List[Dict] = []
+    with ThreadPoolExecutor(max_workers=min(INFRACOST_CONCURRENCY, max(1, len(batches)))) as pool:
+        for products in pool.map(_run_infracost_batch, batches):
             all_products.extend(products)
-            logger.info("Infracost [%s] → %d products", q["label"], len(products))
-        except Exception as exc:
-            logger.exception("Infracost query failed for %s: %s", q["label"], exc)
 
     all_products = all_products[:MAX_RECORDS]
     return {
         "api": "Infracost GraphQL",
-        "endpoint": endpoint,
+        "endpoint": _INFRACOST_ENDPOINT,
+        "filters_queried": len(filters),
+        "requests_made": len(batches),
         "total_records": len(all_products),
         "records_saved": len(all_products),
         "raw_records": all_products,
@@ -268,33 +402,133 @@ def fetch_aws_cloudfront() -> Dict:
 
 
 
-def fetch_azure() -> Dict:
-    all_items = []
+def _azure_shard_filters() -> List[str]:
+    filters = []
+    for region in AZURE_REGIONS:
+        base = f"armRegionName eq '{region}' and priceType eq 'Consumption'"
+        if AZURE_SERVICE_FAMILIES:
+            filters.extend(f"{base} and serviceFamily eq '{family}'" for family in AZURE_SERVICE_FAMILIES)
+        else:
+            filters.append(base)
+    return filters
+
+
+def _shard_limit(shard_count: int) -> int:
+    """Each concurrent shard's share of MAX_RECORDS, rounded up."""
+    return max(1, -(-MAX_RECORDS // max(1, shard_count)))
+
+
+def _fetch_azure_shard(odata_filter: str, limit: int) -> List[Dict]:
+    """Follow NextPageLink for one $filter shard until it runs out or hits ``limit``."""
+    items: List[Dict] = []
     url: Optional[str] = "https://prices.azure.com/api/retail/prices"
-    params = {
-        "api-version": "2021-10-01-preview",
-        "$filter": "armRegionName eq 'westeurope' and priceType eq 'Consumption'",
+    params: Optional[Dict] = {"api-version": "2021-10-01-preview", "$filter": odata_filter}
+    session = _get_session()
+    while url and len(items) < limit:
+        resp = session.get(url, params=params, timeout=_TIMEOUT_SHORT)
+        resp.raise_for_status()
+        data = resp.json()
+        items.extend(data.get("Items", []))
+        url = data.get("NextPageLink")
+        params = None
+    logger.info("Azure [%s] → %d records", odata_filter, len(items))
+    return items[:limit]
+
+
+def fetch_azure() -> Dict:
+    shards = _azure_shard_filters()
+    if not shards:
+        logger.warning("No Azure pricing regions configured — skipping")
+        return {"status": "skipped", "reason": "no Azure shards configured"}
+    limit = _shard_limit(len(shards))
+    all_items: List[Dict] = []
+    failed: List[str] = []
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(shards))) as pool:
+        futures = {pool.submit(_fetch_azure_shard, f, limit): f for f in shards}
+        for future, odata_filter in futures.items():
+            try:
+                all_items.extend(future.result())
+            except Exception as exc:
+                logger.exception("Azure fetch failed for shard %s: %s", odata_filter, exc)
+                failed.append(odata_filter)
+
+    if failed and len(failed) == len(shards):
+        return {"status": "error", "error": f"all {len(shards)} Azure shards failed"}
+
+    all_items = all_items[:MAX_RECORDS]
+    return {
+        "api": "Azure Retail Prices API",
+        "endpoint": "https://prices.azure.com/api/retail/prices",
+        "shards": shards,
+        "failed_shards": failed,
+        "records_saved": len(all_items),
+        "raw_records": all_items,
     }
+
+
+
+_GCP_SERVICES = {
+    "6F81-5844-456A": "Compute Engine",
+    "95FF-2EF5-5EA1": "Cloud Storage",
+    "9662-B51E-5089": "Cloud SQL",
+}
+
+
+def _gcp_sku_record(sku: Dict, svc_id: str, svc_name: str) -> Dict:
+    pi = (sku.get("pricingInfo") or [{}])[0]
+    pe = pi.get("pricingExpression", {})
+    tr = pe.get("tieredRates", [{}])
+    up = (tr[0].get("unitPrice", {}) if tr else {})
+
+    nanos = up.get("nanos", 0) or 0
+    raw_units = up.get("units", "0")
     try:
-        while url and len(all_items) < MAX_RECORDS:
-            resp = requests.get(url, params=params, timeout=_TIMEOUT_SHORT)
-            resp.raise_for_status()
-            data = resp.json()
-            all_items.extend(data.get("Items", []))
-            url = data.get("NextPageLink")
-            params = None
-            logger.info("Azure → %d records so far", len(all_items))
-        all_items = all_items[:MAX_RECORDS]
-        return {
-            "api": "Azure Retail Prices API",
-            "endpoint": "https://prices.azure.com/api/retail/prices",
-            "records_saved": len(all_items),
-            "raw_records": all_items,
-        }
-    except Exception as exc:
-        logger.exception("Azure fetch failed: %s", exc)
-        return {"status": "error", "error": str(exc)}
+        units_val = int(raw_units) if raw_units else 0
+    except (ValueError, TypeError):
+        units_val = 0
+    price_usd = units_val + (nanos / 1_000_000_000)
+
+    return {
+        "skuId": sku.get("skuId", ""),
+        "name": sku.get("name", ""),
+        "description": sku.get("description", ""),
+        "service": svc_name,
+        "serviceId": svc_id,
+        "category": sku.get("category", {}),
+        "serviceRegions": sku.get("serviceRegions", []),
+        "usageUnit": pe.get("usageUnit", ""),
+        "usageUnitDescription": pe.get("usageUnitDescription", ""),
+        "priceUSD": price_usd,
+        "currencyCode": up.get("currencyCode", "USD"),
+        "effectiveTime": pi.get("effectiveTime", ""),
+        "summary": pi.get("summary", ""),
+    }
+
+
+def _fetch_gcp_service(svc_id: str, svc_name: str, limit: int) -> List[Dict]:
+    """Page one GCP billing service's SKU catalogue until exhausted or ``limit``."""
+    skus: List[Dict] = []
+    page_token = None
+    session = _get_session()
+    while len(skus) < limit:
+        params = {"key": GCP_KEY, "pageSize": 5000}
+        if page_token:
+            params["pageToken"] = page_token
+        resp = session.get(
+            f"https://cloudbilling.googleapis.com/v1/services/{svc_id}/skus",
+            params=params,
+            timeout=_TIMEOUT_SHORT,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        skus.extend(_gcp_sku_record(sku, svc_id, svc_name) for sku in data.get("skus", []))
 
+        page_token = data.get("nextPageToken")
+        if not page_token:
+            break
+
+    logger.info("GCP %s → %d SKUs", svc_name, len(skus))
+    return skus[:limit]
 
 
 def fetch_gcp() -> Dict:
@@ -302,71 +536,24 @@ def fetch_gcp() -> Dict:
         logger.warning("GCP API key not set — skipping")
         return {"status": "skipped", "reason": "GCP API key not set"}
 
-    gcp_services = {
-        "6F81-5844-456A": "Compute Engine",
-        "95FF-2EF5-5EA1": "Cloud Storage",
-        "9662-B51E-5089": "Cloud SQL",
-    }
-    all_skus = []
-
-    for svc_id, svc_name in gcp_services.items():
-        page_token = None
-        try:
-            while len(all_skus) < MAX_RECORDS:
-                params = {"key": GCP_KEY, "pageSize": 5000}
-                if page_token:
-                    params["pageToken"] = page_token
-                resp = requests.get(
-                    f"https://cloudbilling.googleapis.com/v1/services/{svc_id}/skus",
-                    params=params,
-                    timeout=_TIMEOUT_SHORT,
-                )
-                resp.raise_for_status()
-                data = resp.json()
-
-                for sku in data.get("skus", []):
-                    pi = (sku.get("pricingInfo") or [{}])[0]
-                    pe = pi.get("pricingExpression", {})
-                    tr = pe.get("tieredRates", [{}])
-                    up = (tr[0].get("unitPrice", {}) if tr else {})
-
-                    nanos = up.get("nanos", 0) or 0
-                    raw_units = up.get("units", "0")
-                    try:
-                        units_val = int(raw_units) if raw_units else 0
-                    except (ValueError, TypeError):
-                        units_val = 0
-                    price_usd = units_val + (nanos / 1_000_000_000)
-
-                    all_skus.append({
-                        "skuId": sku.get("skuId", ""),
-                        "name": sku.get("name", ""),
-                        "description": sku.get("description", ""),
-                        "service": svc_name,
-                        "serviceId": svc_id,
-                        "category": sku.get("category", {}),
-                        "serviceRegions": sku.get("serviceRegions", []),
-                        "usageUnit": pe.get("usageUnit", ""),
-                        "usageUnitDescription": pe.get("usageUnitDescription", ""),
-                        "priceUSD": price_usd,
-                        "currencyCode": up.get("currencyCode", "USD"),
-                        "effectiveTime": pi.get("effectiveTime", ""),
-                        "summary": pi.get("summary", ""),
-                    })
-
-                page_token = data.get("nextPageToken")
-                if not page_token:
-                    break
-
-            logger.info("GCP %s → %d SKUs", svc_name, len(all_skus))
-        except Exception as exc:
-            logger.exception("GCP fetch failed for %s: %s", svc_name, exc)
+    all_skus: List[Dict] = []
+    limit = _shard_limit(len(_GCP_SERVICES))
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(_GCP_SERVICES))) as pool:
+        futures = {
+            pool.submit(_fetch_gcp_service, svc_id, svc_name, limit): svc_name
+            for svc_id, svc_name in _GCP_SERVICES.items()
+        }
+        for future, svc_name in futures.items():
+            try:
+                all_skus.extend(future.result())
+            except Exception as exc:
+                logger.exception("GCP fetch failed for %s: %s", svc_name, exc)
 
     all_skus = all_skus[:MAX_RECORDS]
     return {
         "api": "GCP Cloud Billing Catalog API v1",
         "endpoint": "https://cloudbilling.googleapis.com/v1/services/{serviceId}/skus",
-        "services_queried": list(gcp_services.values()),
+        "services_queried": list(_GCP_SERVICES.values()),
         "records_saved": len(all_skus),
         "raw_records": all_skus,
     }
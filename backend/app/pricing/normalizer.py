@@ -1,20 +1,32 @@
 """
-Converts raw API records (from the fetcher) into a list of unified dicts
+Converts raw API records (from the fetcher) into a lazy stream of unified dicts
 ready for upsert into the cloud_pricing table.
 
-Hourly-unit detection: if the raw unit indicates an hourly charge (Hrs/Hour/h)
-we copy price_per_unit into price_per_hour. For non-hourly SKUs we set
-price_per_hour = None.
+Every normalizer is a generator, so a sync never holds more than one batch of
+normalised records at a time once it is fed to the COPY-based upsert. ``raw_fields`` projects
+``raw_attributes`` down to the listed keys; ``None`` keeps the whole raw record.
+
+Units: every record carries ``unit_dimension``, ``canonical_unit`` and
+``canonical_price`` from ``app.pricing.units``, so rows priced per ``Hrs``,
+``100 Hours`` or ``1/Month`` compare directly. ``price_per_hour`` is the
+canonical price of time-dimension SKUs and None for everything else.
 """
 
 from __future__ import annotations
 
+import os
 from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from app.pricing.units import canonical_price, canonicalize_unit
 
 
-_HOURLY_UNITS = {"hrs", "hour", "h", "1 hour"}
+SYNC_BATCH_SIZE = int(os.getenv("PRICING_SYNC_BATCH_SIZE", "5000"))
+# Comma-separated raw keys to keep in raw_attributes; unset keeps everything.
+RAW_FIELDS: Optional[tuple[str, ...]] = tuple(
+    f.strip() for f in os.getenv("PRICING_RAW_FIELDS", "").split(",") if f.strip()
+) or None
 
 
 def _to_decimal(value: Any) -> Optional[Decimal]:
@@ -24,8 +36,15 @@ def _to_decimal(value: Any) -> Optional[Decimal]:
         return None
 
 
-def _is_hourly(unit: str) -> bool:
-    return unit.strip().lower() in _HOURLY_UNITS
+def _unit_fields(ppu: Decimal, unit: str) -> Dict[str, Any]:
+    canonical = canonicalize_unit(unit)
+    price = canonical_price(ppu, canonical)
+    return {
+        "unit_dimension": canonical.dimension if canonical else None,
+        "canonical_unit": canonical.unit if canonical else None,
+        "canonical_price": price,
+        "price_per_hour": price if canonical and canonical.dimension == "time" else None,
+    }
 
 
 def _parse_dt(value: Optional[str]) -> Optional[datetime]:
@@ -42,6 +61,12 @@ def _parse_dt(value: Optional[str]) -> Optional[datetime]:
     return None
 
 
+def _project(raw: Dict, raw_fields: Optional[Sequence[str]]) -> Dict:
+    if raw_fields is None:
+        return raw
+    return {k: raw[k] for k in raw_fields if k in raw}
+
+
 def _category_from_service(service_name: str) -> str:
     s = service_name.lower()
     if any(k in s for k in ("ec2", "compute engine", "virtual machine", "kubernetes")):
@@ -55,8 +80,7 @@ def _category_from_service(service_name: str) -> str:
     return "Other"
 
 
-def normalize_infracost(payload: Dict) -> List[dict]:
-    records = []
+def normalize_infracost(payload: Dict, raw_fields: Optional[Sequence[str]] = None) -> Iterator[dict]:
     for raw in payload.get("raw_records", []):
         attrs: Dict[str, str] = {a["key"]: a["value"] for a in raw.get("attributes", [])}
         vendor = raw.get("vendorName", "unknown").lower()
@@ -67,16 +91,16 @@ def normalize_infracost(payload: Dict) -> List[dict]:
 
         prices = raw.get("prices", [])
         if not prices:
-            records.append({
+            yield {
                 "vendor": vendor, "service_name": service,
                 "category": _category_from_service(service),
                 "sku_id": sku_id, "description": description, "region": region,
                 "instance_type": attrs.get("armSkuName") or None,
                 "operating_system": None, "price_per_unit": Decimal("0"),
-                "unit": "Hrs", "price_per_hour": Decimal("0"), "currency": "USD",
+                "unit": "Hrs", **_unit_fields(Decimal("0"), "Hrs"), "currency": "USD",
                 "effective_date": _parse_dt(attrs.get("effectiveStartDate")),
-                "raw_attributes": raw, "source_api": "infracost",
-            })
+                "raw_attributes": _project(raw, raw_fields), "source_api": "infracost",
+            }
             continue
 
         for price in prices:
@@ -84,7 +108,7 @@ def normalize_infracost(payload: Dict) -> List[dict]:
             if ppu is None:
                 continue
             unit = price.get("unit", "Hrs")
-            records.append({
+            yield {
                 "vendor": vendor, "service_name": service,
                 "category": _category_from_service(service),
                 "sku_id": sku_id,
@@ -92,22 +116,20 @@ def normalize_infracost(payload: Dict) -> List[dict]:
                 "region": region,
                 "instance_type": attrs.get("armSkuName") or None,
                 "operating_system": None, "price_per_unit": ppu, "unit": unit,
-                "price_per_hour": ppu if _is_hourly(unit) else None,
+                **_unit_fields(ppu, unit),
                 "currency": "USD",
                 "effective_date": _parse_dt(price.get("effectiveDateStart") or attrs.get("effectiveStartDate")),
-                "raw_attributes": raw, "source_api": "infracost",
-            })
-    return records
+                "raw_attributes": _project(raw, raw_fields), "source_api": "infracost",
+            }
 
 
-def normalize_aws_ec2(payload: Dict) -> List[dict]:
-    records = []
+def normalize_aws_ec2(payload: Dict, raw_fields: Optional[Sequence[str]] = None) -> Iterator[dict]:
     for raw in payload.get("raw_records", []):
         ppu = _to_decimal(raw.get("PricePerUnit", 0))
         if ppu is None:
             continue
         unit = raw.get("Unit", "Hrs")
-        records.append({
+        yield {
             "vendor": "aws", "service_name": raw.get("serviceName", "Amazon EC2"),
             "category": "Compute", "sku_id": raw.get("SKU", ""),
             "description": raw.get("PriceDescription", ""),
@@ -115,44 +137,40 @@ def normalize_aws_ec2(payload: Dict) -> List[dict]:
             "instance_type": raw.get("Instance Type") or None,
             "operating_system": raw.get("Operating System") or None,
             "price_per_unit": ppu, "unit": unit,
-            "price_per_hour": ppu if _is_hourly(unit) else None,
+            **_unit_fields(ppu, unit),
             "currency": raw.get("Currency", "USD"),
             "effective_date": _parse_dt(raw.get("EffectiveDate")),
-            "raw_attributes": raw, "source_api": "aws_ec2",
-        })
-    return records
+            "raw_attributes": _project(raw, raw_fields), "source_api": "aws_ec2",
+        }
 
 
-def normalize_aws_s3(payload: Dict) -> List[dict]:
-    records = []
+def normalize_aws_s3(payload: Dict, raw_fields: Optional[Sequence[str]] = None) -> Iterator[dict]:
     for raw in payload.get("raw_records", []):
         ppu = _to_decimal(raw.get("PricePerUnit", 0))
         if ppu is None:
             continue
         unit = raw.get("Unit", "GB")
-        records.append({
+        yield {
             "vendor": "aws", "service_name": raw.get("serviceName", "Amazon S3"),
             "category": "Storage", "sku_id": raw.get("SKU", ""),
             "description": raw.get("PriceDescription", ""),
             "region": raw.get("Region Code", ""),
             "instance_type": None, "operating_system": None,
             "price_per_unit": ppu, "unit": unit,
-            "price_per_hour": ppu if _is_hourly(unit) else None,
+            **_unit_fields(ppu, unit),
             "currency": raw.get("Currency", "USD"),
             "effective_date": _parse_dt(raw.get("EffectiveDate")),
-            "raw_attributes": raw, "source_api": "aws_s3",
-        })
-    return records
+            "raw_attributes": _project(raw, raw_fields), "source_api": "aws_s3",
+        }
 
 
-def normalize_aws_rds(payload: Dict) -> List[dict]:
-    records = []
+def normalize_aws_rds(payload: Dict, raw_fields: Optional[Sequence[str]] = None) -> Iterator[dict]:
     for raw in payload.get("raw_records", []):
         ppu = _to_decimal(raw.get("PricePerUnit", 0))
         if ppu is None:
             continue
         unit = raw.get("Unit", "Hrs")
-        records.append({
+        yield {
             "vendor": "aws", "service_name": raw.get("serviceName", "Amazon RDS"),
             "category": "Database", "sku_id": raw.get("SKU", ""),
             "description": raw.get("PriceDescription", ""),
@@ -160,38 +178,34 @@ def normalize_aws_rds(payload: Dict) -> List[dict]:
             "instance_type": raw.get("Instance Type") or None,
             "operating_system": raw.get("Database Engine") or None,
             "price_per_unit": ppu, "unit": unit,
-            "price_per_hour": ppu if _is_hourly(unit) else None,
+            **_unit_fields(ppu, unit),
             "currency": raw.get("Currency", "USD"),
             "effective_date": _parse_dt(raw.get("EffectiveDate")),
-            "raw_attributes": raw, "source_api": "aws_rds",
-        })
-    return records
+            "raw_attributes": _project(raw, raw_fields), "source_api": "aws_rds",
+        }
 
 
-def normalize_aws_cloudfront(payload: Dict) -> List[dict]:
-    records = []
+def normalize_aws_cloudfront(payload: Dict, raw_fields: Optional[Sequence[str]] = None) -> Iterator[dict]:
     for raw in payload.get("raw_records", []):
         ppu = _to_decimal(raw.get("PricePerUnit", 0))
         if ppu is None:
             continue
         unit = raw.get("Unit", "GB")
-        records.append({
+        yield {
             "vendor": "aws", "service_name": raw.get("serviceName", "Amazon CloudFront"),
             "category": "CDN", "sku_id": raw.get("SKU", ""),
             "description": raw.get("PriceDescription", ""),
             "region": raw.get("Region Code") or raw.get("From Region Code", ""),
             "instance_type": None, "operating_system": None,
             "price_per_unit": ppu, "unit": unit,
-            "price_per_hour": ppu if _is_hourly(unit) else None,
+            **_unit_fields(ppu, unit),
             "currency": raw.get("Currency", "USD"),
             "effective_date": _parse_dt(raw.get("EffectiveDate")),
-            "raw_attributes": raw, "source_api": "aws_cloudfront",
-        })
-    return records
+            "raw_attributes": _project(raw, raw_fields), "source_api": "aws_cloudfront",
+        }
 
 
-def normalize_azure(payload: Dict) -> List[dict]:
-    records = []
+def normalize_azure(payload: Dict, raw_fields: Optional[Sequence[str]] = None) -> Iterator[dict]:
     for raw in payload.get("raw_records", []):
         ppu = _to_decimal(raw.get("retailPrice", raw.get("unitPrice", 0)))
         if ppu is None:
@@ -201,7 +215,7 @@ def normalize_azure(payload: Dict) -> List[dict]:
         prod = raw.get("productName", "")
         sku_name = raw.get("skuName", "")
         desc = f"{prod} – {sku_name}".strip(" –")
-        records.append({
+        yield {
             "vendor": "azure", "service_name": service,
             "category": _category_from_service(service),
             "sku_id": raw.get("skuId") or raw.get("meterId", ""),
@@ -209,16 +223,14 @@ def normalize_azure(payload: Dict) -> List[dict]:
             "region": raw.get("armRegionName", ""),
             "instance_type": raw.get("armSkuName") or sku_name or None,
             "operating_system": None, "price_per_unit": ppu, "unit": unit,
-            "price_per_hour": ppu if _is_hourly(unit) else None,
+            **_unit_fields(ppu, unit),
             "currency": raw.get("currencyCode", "USD"),
             "effective_date": _parse_dt(raw.get("effectiveStartDate")),
-            "raw_attributes": raw, "source_api": "azure",
-        })
-    return records
+            "raw_attributes": _project(raw, raw_fields), "source_api": "azure",
+        }
 
 
-def normalize_gcp(payload: Dict) -> List[dict]:
-    records = []
+def normalize_gcp(payload: Dict, raw_fields: Optional[Sequence[str]] = None) -> Iterator[dict]:
     for raw in payload.get("raw_records", []):
         ppu = _to_decimal(raw.get("priceUSD", 0))
         if ppu is None:
@@ -227,7 +239,7 @@ def normalize_gcp(payload: Dict) -> List[dict]:
         service = raw.get("service", "Compute Engine")
         regions = raw.get("serviceRegions", [])
         region = regions[0] if regions else ""
-        records.append({
+        yield {
             "vendor": "gcp", "service_name": service,
             "category": _category_from_service(service),
             "sku_id": raw.get("skuId", ""),
@@ -235,12 +247,11 @@ def normalize_gcp(payload: Dict) -> List[dict]:
             "region": region,
             "instance_type": None, "operating_system": None,
             "price_per_unit": ppu, "unit": unit,
-            "price_per_hour": ppu if _is_hourly(unit) else None,
+            **_unit_fields(ppu, unit),
             "currency": raw.get("currencyCode", "USD"),
             "effective_date": _parse_dt(raw.get("effectiveTime")),
-            "raw_attributes": raw, "source_api": "gcp",
-        })
-    return records
+            "raw_attributes": _project(raw, raw_fields), "source_api": "gcp",
+        }
 
 
 SOURCE_NORMALIZERS = {
@@ -254,14 +265,15 @@ SOURCE_NORMALIZERS = {
 }
 
 
-def normalize_all(payloads: Dict[str, Dict]) -> List[dict]:
-    """Given { source_name: raw_payload }, return a flat list of normalised pricing records."""
-    all_records: List[dict] = []
+def normalize_all(
+    payloads: Dict[str, Dict], raw_fields: Optional[Sequence[str]] = RAW_FIELDS,
+) -> Iterator[dict]:
+    """Given { source_name: raw_payload }, lazily yield normalised pricing records."""
     for source, payload in payloads.items():
         fn = SOURCE_NORMALIZERS.get(source)
         if fn is None:
             continue
         if payload.get("status") in ("skipped", "error"):
             continue
-        all_records.extend(fn(payload))
-    return all_records
+        yield from fn(payload, raw_fields)
+
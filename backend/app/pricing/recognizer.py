@@ -0,0 +1,103 @@
+"""
+Pull instance types and regions out of free-text invoice descriptions.
+
+Line items arrive as prose ("m6i.4xlarge Linux eu-west-1 730 Hrs"), while the
+catalog indexes exact ``instance_type`` / ``region`` values. A
+``Recognizer`` is an Aho–Corasick automaton over the distinct values known
+for one vendor: a single left-to-right pass over the description finds every
+known value it contains, however many terms there are, and the result feeds
+straight into the catalog's exact-key lookup.
+
+Matching is case-insensitive and only counts whole tokens — a term must not
+be glued to a letter, digit or ``_`` on either side, so ``eu-west-1`` does not
+match inside ``eu-west-1a`` and ``standard_d2`` not inside ``standard_d2_v2``.
+When several terms of a kind match, the longest wins, then the leftmost.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable, NamedTuple, Optional
+
+KINDS = ("instance_type", "region")
+
+# Shorter values ("eu", "us", "a1") are too ambiguous in prose to be worth it.
+MIN_TERM_LENGTH = 4
+
+
+class Attributes(NamedTuple):
+    instance_type: Optional[str] = None
+    region: Optional[str] = None
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class Recognizer:
+    """Immutable automaton; build once per catalog snapshot and share."""
+
+    def __init__(self, terms: Iterable[tuple[str, str]]):
+        """``terms`` are ``(kind, value)`` pairs; the first spelling seen of a value is the one returned."""
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Per node: (term length, kind, original value) for every term ending there.
+        self._out: list[list[tuple[int, str, str]]] = [[]]
+        seen: set[tuple[str, str]] = set()
+        for kind, value in terms:
+            key = value.lower() if value else ""
+            if kind not in KINDS or len(key) < MIN_TERM_LENGTH or (kind, key) in seen:
+                continue
+            seen.add((kind, key))
+            self._add(key, kind, value)
+        self.size = len(seen)
+        self._link()
+
+    def _add(self, key: str, kind: str, value: str) -> None:
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(key), kind, value))
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                # Fold the suffix's outputs in so the scan never walks fail chains for output.
+                self._out[child].extend(self._out[self._fail[child]])
+
+    def recognize(self, text: Optional[str]) -> Attributes:
+        if not text or not self.size:
+            return Attributes()
+        text = text.lower()
+        best: dict[str, tuple[int, int, str]] = {}  # kind -> (-length, start, value)
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for end, ch in enumerate(text, start=1):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node] or (end < len(text) and _is_word(text[end])):
+                continue
+            for length, kind, value in out[node]:
+                start = end - length
+                if start and _is_word(text[start - 1]):
+                    continue
+                rank = (-length, start, value)
+                if kind not in best or rank < best[kind]:
+                    best[kind] = rank
+        return Attributes(**{kind: rank[2] for kind, rank in best.items()})
@@ -0,0 +1,90 @@
+"""
+Single-flight coordinator for full pricing syncs.
+
+A sync holds a session-level Postgres advisory lock for its whole duration,
+so at most one runs across all workers; a second request sees the lock taken
+and gets the run already in progress instead. Each attempt is recorded in
+``pricing_sync_runs`` with its phase, per-source stats and any error.
+
+The run owns its sessions: the lock and run-row updates go through one
+connection that is held for the whole run (the lock lives on that
+connection), and the fetch/upsert work uses a separate session so its
+transactions never commit or roll back the bookkeeping.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.database import engine as default_engine
+from app.repositories.cloud_pricing import CloudPricingRepository
+from app.repositories.market_data import MarketDataRepository
+from app.repositories.pricing_sync_run import PricingSyncRunRepository
+from app.services.cloud_pricing import CloudPricingService
+
+logger = logging.getLogger(__name__)
+
+# Strong references to in-flight runs; asyncio only keeps weak ones.
+_tasks: set[asyncio.Task] = set()
+
+
+async def start_sync(engine: AsyncEngine = default_engine) -> tuple[Optional[UUID], bool]:
+    """Start a sync in the background unless one is already running anywhere.
+
+    Returns ``(run_id, started)``: the new run and True, or the run already in
+    progress (None if it cannot be identified) and False.
+    """
+    started: asyncio.Future = asyncio.get_running_loop().create_future()
+    task = asyncio.create_task(_run(engine, started))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return await started
+
+
+async def _run(engine: AsyncEngine, started: asyncio.Future) -> None:
+    try:
+        async with engine.connect() as conn:
+            async with AsyncSession(bind=conn, expire_on_commit=False) as tracker:
+                runs = PricingSyncRunRepository(tracker)
+                if not await runs.try_lock():
+                    running = await runs.get_running()
+                    await tracker.rollback()
+                    started.set_result((running.id if running else None, False))
+                    return
+                try:
+                    await runs.fail_interrupted()
+                    run = await runs.create(status="running", phase="starting")
+                    started.set_result((run.id, True))
+                    await _execute(engine, runs, run.id)
+                finally:
+                    await tracker.rollback()
+                    await runs.unlock()
+                    await tracker.commit()
+    except Exception as exc:
+        if not started.done():
+            started.set_exception(exc)
+        else:
+            logger.exception("Pricing sync bookkeeping failed: %s", exc)
+
+
+async def _execute(engine: AsyncEngine, runs: PricingSyncRunRepository, run_id: UUID) -> None:
+    async def on_phase(phase: str, **fields) -> None:
+        await runs.set_phase(run_id, phase, **fields)
+
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            service = CloudPricingService(CloudPricingRepository(db), market_data_repo=MarketDataRepository(db))
+            stats = await service.run_sync(on_phase=on_phase)
+    except Exception as exc:
+        logger.exception("Pricing sync %s failed: %s", run_id, exc)
+        await runs.db.rollback()
+        await runs.finish(run_id, "failed", error=f"{type(exc).__name__}: {exc}")
+        return
+
+    await runs.finish(run_id, "succeeded", **stats)
+    logger.info("Pricing sync %s finished: %s records, %s rows", run_id, stats["records_seen"], stats["rows_affected"])
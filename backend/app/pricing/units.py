@@ -0,0 +1,104 @@
+"""
+Canonical pricing units.
+
+Providers spell the same unit many ways (``Hrs``, ``1 Hour``, ``h``,
+``GB-Mo``, ``GiBy.mo``, ``1 GB/Month``, ``10K``) and some units carry a
+multiplier (``100 Hours``, ``1M``). ``canonicalize_unit`` maps a raw unit to a
+dimension, that dimension's canonical unit, and how many canonical units one
+raw unit represents, so every row can store a directly comparable
+``canonical_price``:
+
+    time      hour
+    storage   GB-month
+    transfer  GB
+    request   request
+
+Units that fit none of these (licences, vCPU counts, …) have no dimension and
+no canonical price. This runs once per record at sync time; readers only ever
+compare the stored columns.
+"""
+
+from __future__ import annotations
+
+import re
+from decimal import Decimal
+from fractions import Fraction
+from typing import NamedTuple, Optional
+
+HOURS_PER_MONTH = 730
+
+CANONICAL_UNITS = {
+    "time": "hour",
+    "storage": "GB-month",
+    "transfer": "GB",
+    "request": "request",
+}
+
+# Base-unit spellings after lower-casing and dropping spaces, "-", "/", ".",
+# "(s)" and a trailing "s"; value is (dimension, canonical units per raw unit).
+_BASE_UNITS: dict[str, tuple[str, Fraction]] = {}
+
+
+def _register(dimension: str, factor: Fraction, *spellings: str) -> None:
+    for spelling in spellings:
+        _BASE_UNITS[spelling] = (dimension, factor)
+
+
+_register("time", Fraction(1), "h", "hr", "hour")
+_register("time", Fraction(1, 60), "min", "minute")
+_register("time", Fraction(1, 3600), "sec", "second")
+_register("time", Fraction(24), "day")
+_register("time", Fraction(HOURS_PER_MONTH), "mo", "month")
+_register("storage", Fraction(1), "gbmo", "gbmonth", "gibmo", "gibmonth", "gibymo", "gibibytemonth", "gigabytemonth")
+_register("storage", Fraction(1024), "tbmo", "tbmonth", "tibmo", "tibymo")
+_register("storage", Fraction(1, HOURS_PER_MONTH), "gbh", "gbhr", "gbhour", "gibyh", "gibhour")
+_register("transfer", Fraction(1), "gb", "gib", "giby", "gigabyte", "gibibyte")
+_register("transfer", Fraction(1024), "tb", "tib", "tiby", "terabyte")
+_register("transfer", Fraction(1, 1024), "mb", "mib", "miby", "megabyte")
+_register("request", Fraction(1), "", "request", "req", "count", "call", "operation", "op", "query", "queries")
+
+_MULTIPLIERS = {"": 1, "k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+
+# Optional leading quantity ("100", "1,000", "10K", "1M"), then the base unit.
+_UNIT_RE = re.compile(r"^\s*(?:(?P<qty>\d[\d,]*(?:\.\d+)?)\s*(?P<mult>[kmb])?(?![a-z]))?\s*(?P<base>.*)$")
+_STRIP_RE = re.compile(r"\(s\)|[\s\-/.]")
+
+
+class CanonicalUnit(NamedTuple):
+    dimension: str
+    unit: str
+    factor: Fraction  # canonical units per one raw unit
+
+
+def _base_key(base: str) -> str:
+    key = _STRIP_RE.sub("", base)
+    if key.startswith("per"):
+        key = key[3:]
+    if key not in _BASE_UNITS and key.endswith("s"):
+        key = key[:-1]
+    return key
+
+
+def canonicalize_unit(unit: Optional[str]) -> Optional[CanonicalUnit]:
+    """Dimension, canonical unit and scale factor for a raw unit; None if unrecognised."""
+    if not unit or not unit.strip():
+        return None
+    match = _UNIT_RE.match(unit.lower())
+    qty, mult, base = match.group("qty"), match.group("mult") or "", match.group("base")
+    key = _base_key(base)
+    if key not in _BASE_UNITS or (key == "" and qty is None):
+        return None
+
+    dimension, factor = _BASE_UNITS[key]
+    if qty is not None:
+        factor *= Fraction(qty.replace(",", "")) * _MULTIPLIERS[mult]
+    if factor <= 0:
+        return None
+    return CanonicalUnit(dimension, CANONICAL_UNITS[dimension], factor)
+
+
+def canonical_price(price: Optional[Decimal], unit: Optional[CanonicalUnit]) -> Optional[Decimal]:
+    """Price per canonical unit, e.g. 0.02 per ``10K`` requests → 0.000002 per request."""
+    if price is None or unit is None:
+        return None
+    return price * unit.factor.denominator / unit.factor.numerator
@@ -6,7 +6,11 @@ from app.repositories.client import ClientRepository
 from app.repositories.market_data import MarketDataRepository
 from app.repositories.item import ItemRepository
 from app.repositories.cloud_pricing import CloudPricingRepository
+from app.repositories.cloud_price_history import CloudPriceHistoryRepository
+from app.repositories.pricing_sync_run import PricingSyncRunRepository
 from app.repositories.user import UserRepository
+from app.repositories.vendor_usage_rollup import VendorUsageRollupRepository
+from app.repositories.paid_signal import PaidSignalRepository
 
 __all__ = [
     "InvoiceRepository",
@@ -17,5 +21,9 @@ __all__ = [
     "MarketDataRepository",
     "ItemRepository",
     "CloudPricingRepository",
+    "CloudPriceHistoryRepository",
+    "PricingSyncRunRepository",
     "UserRepository",
+    "VendorUsageRollupRepository",
+    "PaidSignalRepository",
 ]
@@ -1,29 +1,59 @@
 from uuid import UUID
-from typing import TypeVar, Generic, Type
-from sqlalchemy import select
+from typing import Any, Optional, Sequence, TypeVar, Generic, Type
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import invalidate
 from app.core.database import Base
+from app.core.pagination import keyset, page_of
 
 ModelType = TypeVar("ModelType", bound=Base)
 
 
 class BaseRepository(Generic[ModelType]):
+    # Keyset sort key for list pages, newest first; the last column must be unique.
+    page_keys: tuple[str, ...] = ("created_at", "id")
+    # Response-cache namespaces (app.core.cache) whose responses read this table.
+    cache_namespaces: tuple[str, ...] = ()
+
     def __init__(self, model: Type[ModelType], db: AsyncSession):
         self.model = model
         self.db = db
 
+    def _select(self) -> Select:
+        """Base statement for every read; subclasses add loader or execution options."""
+        return select(self.model)
+
     async def get_by_id(self, id: UUID) -> ModelType | None:
-        result = await self.db.execute(select(self.model).where(self.model.id == id))
+        result = await self.db.execute(self._select().where(self.model.id == id))
         return result.scalar_one_or_none()
 
     async def get_all(self, skip: int = 0, limit: int = 100) -> list[ModelType]:
-        result = await self.db.execute(select(self.model).offset(skip).limit(limit))
+        result = await self.db.execute(self._select().offset(skip).limit(limit))
         return list(result.scalars().all())
 
+    async def get_page(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        where: Sequence[Any] = (),
+        options: Sequence[Any] = (),
+    ) -> tuple[list[ModelType], Optional[str]]:
+        """One keyset page plus the cursor for the next one (None on the last page)."""
+        keys = [getattr(self.model, k) for k in self.page_keys]
+        stmt = keyset(self._select().where(*where).options(*options), keys, cursor, limit, skip=skip)
+        result = await self.db.execute(stmt)
+        return page_of(result.scalars().all(), keys, limit)
+
+    def _invalidate(self) -> None:
+        """Drop cached responses built from this table; call after every commit that writes it."""
+        invalidate(*self.cache_namespaces)
+
     async def create(self, **kwargs) -> ModelType:
         instance = self.model(**kwargs)
         self.db.add(instance)
         await self.db.commit()
+        self._invalidate()
         await self.db.refresh(instance)
         return instance
 
@@ -35,6 +65,7 @@ class BaseRepository(Generic[ModelType]):
             if value is not None:
                 setattr(instance, key, value)
         await self.db.commit()
+        self._invalidate()
         await self.db.refresh(instance)
         return instance
 
@@ -44,4 +75,5 @@ class BaseRepository(Generic[ModelType]):
             return False
         await self.db.delete(instance)
         await self.db.commit()
+        self._invalidate()
         return True
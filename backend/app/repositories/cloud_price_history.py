@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import DateTime, cast, select, func
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import Text
+
+from app.models.cloud_price_history import CloudPriceHistory
+from app.repositories.base import BaseRepository
+
+
+class CloudPriceHistoryRepository(BaseRepository[CloudPriceHistory]):
+    def __init__(self, db: AsyncSession):
+        super().__init__(CloudPriceHistory, db)
+
+    async def get_price_at(
+        self, vendor: str, sku_id: str, source_api: str, at: datetime,
+    ) -> Optional[CloudPriceHistory]:
+        """Price of one SKU in effect at ``at``, or None if it was not known then."""
+        result = await self.db.execute(
+            select(CloudPriceHistory).where(
+                CloudPriceHistory.vendor == vendor,
+                CloudPriceHistory.sku_id == sku_id,
+                CloudPriceHistory.source_api == source_api,
+                CloudPriceHistory.valid_during.contains(cast(at, DateTime(timezone=True))),
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def get_prices_at(
+        self, keys: Iterable[tuple[str, str, str]], at: datetime,
+    ) -> dict[tuple[str, str, str], CloudPriceHistory]:
+        """Batched ``get_price_at``: one probe per key, issued as a single statement.
+
+        ``keys`` are (vendor, sku_id, source_api) tuples.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        vendors, skus, sources = (list(col) for col in zip(*keys))
+        wanted = (
+            select(
+                func.unnest(cast(vendors, ARRAY(Text))).label("vendor"),
+                func.unnest(cast(skus, ARRAY(Text))).label("sku_id"),
+                func.unnest(cast(sources, ARRAY(Text))).label("source_api"),
+            )
+            .subquery("wanted")
+        )
+        result = await self.db.execute(
+            select(CloudPriceHistory).join(
+                wanted,
+                (CloudPriceHistory.vendor == wanted.c.vendor)
+                & (CloudPriceHistory.sku_id == wanted.c.sku_id)
+                & (CloudPriceHistory.source_api == wanted.c.source_api),
+            ).where(CloudPriceHistory.valid_during.contains(cast(at, DateTime(timezone=True))))
+        )
+        return {
+            (row.vendor, row.sku_id, row.source_api): row
+            for row in result.scalars().all()
+        }
+
+    async def get_history(self, vendor: str, sku_id: str, source_api: str) -> list[CloudPriceHistory]:
+        result = await self.db.execute(
+            select(CloudPriceHistory)
+            .where(
+                CloudPriceHistory.vendor == vendor,
+                CloudPriceHistory.sku_id == sku_id,
+                CloudPriceHistory.source_api == source_api,
+            )
+            .order_by(func.lower(CloudPriceHistory.valid_during))
+        )
+        return list(result.scalars().all())
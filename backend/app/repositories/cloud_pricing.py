@@ -1,15 +1,216 @@
+import json
+from datetime import datetime
 from uuid import UUID
-from typing import Optional
+from typing import AsyncIterator, Iterable, Optional, Sequence
 
-from sqlalchemy import select, func
-from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy import Integer, Text, case, cast, literal_column, select, func, text, union_all
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.cloud_pricing import CloudPricing
+from app.core.pagination import keyset, page_of
+from app.models.cloud_pricing import CloudPricing, search_document
+from app.models.pricing_sync_state import PricingSyncState
 from app.repositories.base import BaseRepository
 
 
+# Columns streamed through COPY, in staging-table order. ``seq`` preserves input
+# order so the merge can keep the last occurrence of a duplicated key.
+_STAGING_COLUMNS = (
+    "seq",
+    "vendor",
+    "service_name",
+    "category",
+    "sku_id",
+    "description",
+    "region",
+    "instance_type",
+    "operating_system",
+    "price_per_unit",
+    "unit",
+    "price_per_hour",
+    "unit_dimension",
+    "canonical_unit",
+    "canonical_price",
+    "currency",
+    "effective_date",
+    "raw_attributes",
+    "source_api",
+)
+
+# Created per transaction and dropped on commit or rollback, so its shape always
+# matches this code and no shared table carries rows or schema between syncs.
+# Concurrent syncs are already serialized by the sync advisory lock.
+_CREATE_STAGING = text("""
+    CREATE TEMP TABLE cloud_pricing_staging (
+        seq              bigint NOT NULL,
+        vendor           text NOT NULL,
+        service_name     text NOT NULL,
+        category         text NOT NULL,
+        sku_id           text NOT NULL,
+        description      text,
+        region           text,
+        instance_type    text,
+        operating_system text,
+        price_per_unit   numeric(20, 10) NOT NULL,
+        unit             text NOT NULL,
+        price_per_hour   numeric(20, 10),
+        currency         text NOT NULL,
+        effective_date   timestamptz,
+        raw_attributes   text,
+        source_api       text NOT NULL,
+        unit_dimension   text,
+        canonical_unit   text,
+        canonical_price  numeric(20, 10)
+    ) ON COMMIT DROP
+""")
+
+_MERGE_STAGING = text("""
+    INSERT INTO cloud_pricing (
+        id, vendor, service_name, category, sku_id, description, region,
+        instance_type, operating_system, price_per_unit, unit, price_per_hour,
+        unit_dimension, canonical_unit, canonical_price,
+        currency, effective_date, raw_attributes, source_api, created_at, updated_at
+    )
+    SELECT
+        gen_random_uuid(), s.vendor, s.service_name, s.category, s.sku_id,
+        s.description, s.region, s.instance_type, s.operating_system,
+        s.price_per_unit, s.unit, s.price_per_hour,
+        s.unit_dimension, s.canonical_unit, s.canonical_price,
+        s.currency, s.effective_date,
+        s.raw_attributes::jsonb, s.source_api, now(), now()
+    FROM (
+        SELECT DISTINCT ON (vendor, sku_id, source_api) *
+        FROM cloud_pricing_staging
+        ORDER BY vendor, sku_id, source_api, seq DESC
+    ) AS s
+    ON CONFLICT ON CONSTRAINT uq_pricing_vendor_sku_source DO UPDATE SET
+        service_name = EXCLUDED.service_name,
+        category = EXCLUDED.category,
+        description = EXCLUDED.description,
+        region = EXCLUDED.region,
+        instance_type = EXCLUDED.instance_type,
+        operating_system = EXCLUDED.operating_system,
+        price_per_unit = EXCLUDED.price_per_unit,
+        unit = EXCLUDED.unit,
+        price_per_hour = EXCLUDED.price_per_hour,
+        unit_dimension = EXCLUDED.unit_dimension,
+        canonical_unit = EXCLUDED.canonical_unit,
+        canonical_price = EXCLUDED.canonical_price,
+        currency = EXCLUDED.currency,
+        effective_date = EXCLUDED.effective_date,
+        raw_attributes = EXCLUDED.raw_attributes,
+        updated_at = now()
+""")
+
+
+# Latest staged row per key — the same rows the merge below writes.
+_STAGED_LATEST = """
+    SELECT DISTINCT ON (vendor, sku_id, source_api)
+        vendor, sku_id, source_api, price_per_unit, price_per_hour, unit, currency, effective_date
+    FROM cloud_pricing_staging
+    ORDER BY vendor, sku_id, source_api, seq DESC
+"""
+
+# Close the open history row of every key whose price changed in this sync.
+_CLOSE_CHANGED_HISTORY = text(f"""
+    UPDATE cloud_price_history AS h
+    SET valid_during = tstzrange(lower(h.valid_during), now())
+    FROM ({_STAGED_LATEST}) AS s
+    WHERE h.vendor = s.vendor AND h.sku_id = s.sku_id AND h.source_api = s.source_api
+      AND upper_inf(h.valid_during)
+      AND (h.price_per_unit, h.price_per_hour, h.unit, h.currency)
+          IS DISTINCT FROM (s.price_per_unit, s.price_per_hour, s.unit, s.currency)
+""")
+
+# Open a row for every key without one: changed keys (closed just above) start
+# now; keys never seen before start at their published effective date.
+_OPEN_HISTORY = text(f"""
+    INSERT INTO cloud_price_history (
+        id, vendor, sku_id, source_api, price_per_unit, price_per_hour, unit,
+        currency, valid_during, created_at
+    )
+    SELECT
+        gen_random_uuid(), s.vendor, s.sku_id, s.source_api, s.price_per_unit,
+        s.price_per_hour, s.unit, s.currency,
+        tstzrange(
+            CASE WHEN EXISTS (
+                SELECT 1 FROM cloud_price_history p
+                WHERE p.vendor = s.vendor AND p.sku_id = s.sku_id AND p.source_api = s.source_api
+            ) THEN now()
+            ELSE LEAST(COALESCE(s.effective_date, now()), now()) END,
+            NULL
+        ),
+        now()
+    FROM ({_STAGED_LATEST}) AS s
+    WHERE NOT EXISTS (
+        SELECT 1 FROM cloud_price_history h
+        WHERE h.vendor = s.vendor AND h.sku_id = s.sku_id AND h.source_api = s.source_api
+          AND upper_inf(h.valid_during)
+    )
+""")
+
+
+_BUMP_GENERATION = text("""
+    INSERT INTO pricing_sync_state (id, generation, updated_at) VALUES (1, 1, now())
+    ON CONFLICT (id) DO UPDATE SET
+        generation = pricing_sync_state.generation + 1,
+        updated_at = now()
+""")
+
+# One pass over cloud_pricing: GROUPING SETS yields per-vendor rows, per-category
+# rows and the grand total (always present, even on an empty table).
+_SUMMARY_GROUPS = """
+    SELECT vendor, category,
+           grouping(vendor) AS gv, grouping(category) AS gc,
+           count(*) AS n, max(updated_at) AS last_sync
+    FROM cloud_pricing
+    GROUP BY GROUPING SETS ((vendor), (category), ())
+"""
+
+_SUMMARY_OBJECT = """
+    jsonb_build_object(
+        'total_skus', (SELECT n FROM g WHERE gv = 1 AND gc = 1),
+        'last_sync', (SELECT last_sync FROM g WHERE gv = 1 AND gc = 1),
+        'by_vendor', coalesce((SELECT jsonb_object_agg(vendor, n) FROM g WHERE gv = 0), '{}'::jsonb),
+        'by_category', coalesce((SELECT jsonb_object_agg(category, n) FROM g WHERE gc = 0), '{}'::jsonb)
+    )
+"""
+
+_COMPUTE_SUMMARY = text(f"WITH g AS ({_SUMMARY_GROUPS}) SELECT {_SUMMARY_OBJECT}")
+
+# Runs after _BUMP_GENERATION, so the pricing_sync_state row always exists.
+_STORE_SUMMARY = text(f"WITH g AS ({_SUMMARY_GROUPS}) UPDATE pricing_sync_state SET summary = {_SUMMARY_OBJECT} WHERE id = 1")
+
+
+def _staging_row(seq: int, r: dict) -> tuple:
+    raw = r.get("raw_attributes")
+    return (
+        seq,
+        r.get("vendor"),
+        r.get("service_name"),
+        r.get("category"),
+        r.get("sku_id"),
+        r.get("description"),
+        r.get("region"),
+        r.get("instance_type"),
+        r.get("operating_system"),
+        r.get("price_per_unit"),
+        r.get("unit"),
+        r.get("price_per_hour"),
+        r.get("unit_dimension"),
+        r.get("canonical_unit"),
+        r.get("canonical_price"),
+        r.get("currency") or "USD",
+        r.get("effective_date"),
+        json.dumps(raw, default=str) if raw is not None else None,
+        r.get("source_api"),
+    )
+
+
 class CloudPricingRepository(BaseRepository[CloudPricing]):
+    page_keys = ("vendor", "service_name", "id")
+    cache_namespaces = ("pricing",)
+
     def __init__(self, db: AsyncSession):
         super().__init__(CloudPricing, db)
 
@@ -22,7 +223,8 @@ class CloudPricingRepository(BaseRepository[CloudPricing]):
         service_name: Optional[str] = None,
         skip: int = 0,
         limit: int = 50,
-    ) -> list[CloudPricing]:
+        cursor: Optional[str] = None,
+    ) -> tuple[list[CloudPricing], Optional[str]]:
         q = select(CloudPricing)
         if vendor:
             q = q.where(CloudPricing.vendor == vendor.lower())
@@ -34,115 +236,189 @@ class CloudPricingRepository(BaseRepository[CloudPricing]):
             q = q.where(CloudPricing.instance_type.ilike(f"%{instance_type}%"))
         if service_name:
             q = q.where(CloudPricing.service_name.ilike(f"%{service_name}%"))
-        q = q.order_by(CloudPricing.vendor, CloudPricing.service_name).offset(skip).limit(limit)
-        result = await self.db.execute(q)
-        return list(result.scalars().all())
-
-    async def upsert_records(self, records: list[dict]) -> int:
-        """Upsert normalised pricing records. Returns total rows affected."""
-        if not records:
-            return 0
-
-        # Deduplicate by (vendor, sku_id, source_api) — keep last occurrence
-        seen: dict[tuple, dict] = {}
-        for r in records:
-            key = (r.get("vendor"), r.get("sku_id"), r.get("source_api"))
-            seen[key] = r
-        records = list(seen.values())
-
-        table = CloudPricing.__table__
-        chunk_size = 500
-        total_affected = 0
-
-        for i in range(0, len(records), chunk_size):
-            chunk = records[i:i + chunk_size]
-            stmt = pg_insert(table).values(chunk)
-            stmt = stmt.on_conflict_do_update(
-                constraint="uq_pricing_vendor_sku_source",
-                set_={
-                    "service_name": stmt.excluded.service_name,
-                    "category": stmt.excluded.category,
-                    "description": stmt.excluded.description,
-                    "region": stmt.excluded.region,
-                    "instance_type": stmt.excluded.instance_type,
-                    "operating_system": stmt.excluded.operating_system,
-                    "price_per_unit": stmt.excluded.price_per_unit,
-                    "unit": stmt.excluded.unit,
-                    "price_per_hour": stmt.excluded.price_per_hour,
-                    "currency": stmt.excluded.currency,
-                    "effective_date": stmt.excluded.effective_date,
-                    "raw_attributes": stmt.excluded.raw_attributes,
-                    "updated_at": func.now(),
-                },
+        keys = [getattr(CloudPricing, k) for k in self.page_keys]
+        result = await self.db.execute(keyset(q, keys, cursor, limit, descending=False, skip=skip))
+        return page_of(result.scalars().all(), keys, limit)
+
+    async def search(self, q: str, limit: int = 20, vendor: Optional[str] = None) -> list[tuple[CloudPricing, float]]:
+        """Top-k SKUs for free text, ranked by full-text rank plus trigram similarity.
+
+        Candidates come from the GIN indexes only: full-text hits on the search
+        document, or trigram matches (pg_trgm ``%``) on service_name / instance_type.
+        """
+        document = search_document()
+        tsquery = func.websearch_to_tsquery(text("'simple'::regconfig"), q)
+        score = (
+            func.ts_rank_cd(document, tsquery)
+            + func.greatest(
+                func.similarity(CloudPricing.service_name, q),
+                func.similarity(CloudPricing.instance_type, q),
+            )
+        ).label("score")
+        stmt = (
+            select(CloudPricing, score)
+            .where(
+                document.op("@@")(tsquery)
+                | CloudPricing.service_name.op("%")(q)
+                | CloudPricing.instance_type.op("%")(q)
             )
-            result = await self.db.execute(stmt)
-            total_affected += result.rowcount
+            .order_by(score.desc())
+            .limit(limit)
+        )
+        if vendor:
+            stmt = stmt.where(CloudPricing.vendor == vendor.lower())
+        result = await self.db.execute(stmt)
+        return [(row, float(s or 0)) for row, s in result.all()]
+
+    async def bulk_upsert_records(self, records: Iterable[dict], copy_batch_size: int = 5000) -> int:
+        """Stream records over COPY into a temporary staging table, then merge them in one statement.
+
+        Everything happens in a single transaction: either the whole sync lands
+        in ``cloud_pricing`` or none of it does. Price changes are recorded in
+        ``cloud_price_history`` in the same transaction; unchanged SKUs add no
+        history rows. The pricing generation is bumped on commit so every
+        worker's in-memory catalog reloads, and the status summary is recomputed
+        alongside it. Returns rows affected by the merge.
+        """
+        await self.db.execute(_CREATE_STAGING)
+
+        # The statement above opened the transaction on this connection, so the
+        # COPY below runs inside it rather than in autocommit mode.
+        conn = await self.db.connection()
+        raw_conn = await conn.get_raw_connection()
+        driver_conn = raw_conn.driver_connection
+
+        batch: list[tuple] = []
+        staged = 0
+        try:
+            for seq, r in enumerate(records):
+                batch.append(_staging_row(seq, r))
+                if len(batch) >= copy_batch_size:
+                    await driver_conn.copy_records_to_table(
+                        "cloud_pricing_staging", records=batch, columns=_STAGING_COLUMNS,
+                    )
+                    staged += len(batch)
+                    batch = []
+            if batch:
+                await driver_conn.copy_records_to_table(
+                    "cloud_pricing_staging", records=batch, columns=_STAGING_COLUMNS,
+                )
+                staged += len(batch)
+
+            if not staged:
+                await self.db.rollback()
+                return 0
+
+            await self.db.execute(_CLOSE_CHANGED_HISTORY)
+            await self.db.execute(_OPEN_HISTORY)
+            result = await self.db.execute(_MERGE_STAGING)
+            await self.db.execute(_BUMP_GENERATION)
+            await self.db.execute(_STORE_SUMMARY)
             await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        self._invalidate()
 
-        return total_affected
+        return result.rowcount
 
     async def get_sync_status(self) -> dict:
-        """Return aggregate stats about current pricing data."""
-        total_q = await self.db.execute(select(func.count(CloudPricing.id)))
-        total = total_q.scalar() or 0
+        """Return aggregate stats about current pricing data.
 
-        vendor_q = await self.db.execute(
-            select(CloudPricing.vendor, func.count(CloudPricing.id).label("cnt"))
-            .group_by(CloudPricing.vendor)
+        Reads the summary stored by the last bulk upsert (a primary-key lookup);
+        only falls back to aggregating the table when no sync has stored one.
+        """
+        result = await self.db.execute(
+            select(PricingSyncState.summary).where(PricingSyncState.id == 1)
         )
-        by_vendor = {row.vendor: row.cnt for row in vendor_q.all()}
-
-        cat_q = await self.db.execute(
-            select(CloudPricing.category, func.count(CloudPricing.id).label("cnt"))
-            .group_by(CloudPricing.category)
-        )
-        by_category = {row.category: row.cnt for row in cat_q.all()}
-
-        last_q = await self.db.execute(select(func.max(CloudPricing.updated_at)))
-        last_sync = last_q.scalar()
+        summary = result.scalar_one_or_none()
+        if summary is None:
+            summary = (await self.db.execute(_COMPUTE_SUMMARY)).scalar_one()
 
+        total = summary["total_skus"] or 0
         return {
-            "last_sync": last_sync,
+            "last_sync": summary["last_sync"],
             "total_skus": total,
-            "by_vendor": by_vendor,
-            "by_category": by_category,
+            "by_vendor": summary["by_vendor"],
+            "by_category": summary["by_category"],
             "message": "OK" if total > 0 else "No data yet — trigger a sync via POST /pricing/sync",
         }
 
+    async def get_generation(self) -> tuple[int, Optional[datetime]]:
+        """Current (generation, bumped_at) of the pricing table; (0, None) before the first sync."""
+        result = await self.db.execute(
+            select(PricingSyncState.generation, PricingSyncState.updated_at).where(PricingSyncState.id == 1)
+        )
+        row = result.one_or_none()
+        return (row.generation, row.updated_at) if row else (0, None)
+
+    async def iter_catalog_rows(self, columns: Sequence[str], batch_size: int = 10_000) -> AsyncIterator[Sequence]:
+        """Stream the given cloud_pricing columns with a server-side cursor."""
+        stmt = select(*(getattr(CloudPricing, c) for c in columns)).execution_options(yield_per=batch_size)
+        result = await self.db.stream(stmt)
+        async for partition in result.partitions():
+            for row in partition:
+                yield row
+
     async def find_best_match(self, vendor: str, sku_id: Optional[str], instance_type: Optional[str], region: Optional[str]) -> Optional[CloudPricing]:
         """Find the best matching hourly SKU for invoice checking."""
-        vendor = vendor.lower()
-        base = select(CloudPricing).where(
-            CloudPricing.vendor == vendor,
-            CloudPricing.price_per_hour.isnot(None),
-        )
+        return (await self.find_best_matches([(vendor, sku_id, instance_type, region)]))[0]
 
-        # 1 – exact SKU
-        if sku_id:
-            result = await self.db.execute(base.where(CloudPricing.sku_id == sku_id))
-            match = result.scalar_one_or_none()
-            if match:
-                return match
-
-        # 2 – instance_type + region
-        if instance_type and region:
-            result = await self.db.execute(
-                base.where(
-                    CloudPricing.instance_type.ilike(instance_type),
-                    CloudPricing.region.ilike(f"%{region}%"),
-                )
-            )
-            match = result.scalar_one_or_none()
-            if match:
-                return match
+    async def find_best_matches(
+        self, items: Sequence[tuple[str, Optional[str], Optional[str], Optional[str]]],
+    ) -> list[Optional[CloudPricing]]:
+        """Match many (vendor, sku_id, instance_type, region) lines in one query.
 
-        # 3 – instance_type only
-        if instance_type:
-            result = await self.db.execute(
-                base.where(CloudPricing.instance_type.ilike(instance_type))
+        Tiers, best first: 1 – exact SKU, 2 – instance_type + region,
+        3 – instance_type only. Results are returned in input order.
+        """
+        if not items:
+            return []
+
+        wanted = select(
+            func.unnest(cast(list(range(len(items))), ARRAY(Integer))).label("idx"),
+            func.unnest(cast([v.lower() for v, _, _, _ in items], ARRAY(Text))).label("vendor"),
+            func.unnest(cast([s or None for _, s, _, _ in items], ARRAY(Text))).label("sku_id"),
+            func.unnest(cast([i or None for _, _, i, _ in items], ARRAY(Text))).label("instance_type"),
+            func.unnest(cast([r or None for _, _, _, r in items], ARRAY(Text))).label("region"),
+        ).cte("wanted")
+
+        cp = CloudPricing.__table__
+        hourly = cp.c.unit_dimension == "time"
+        by_sku = (
+            select(wanted.c.idx, literal_column("1").label("tier"), cp.c.id, cp.c.updated_at)
+            .join(cp, (cp.c.vendor == wanted.c.vendor) & (cp.c.sku_id == wanted.c.sku_id))
+            .where(hourly)
+        )
+        by_instance = (
+            select(
+                wanted.c.idx,
+                case(
+                    (cp.c.region.ilike("%" + wanted.c.region + "%"), literal_column("2")),
+                    else_=literal_column("3"),
+                ).label("tier"),
+                cp.c.id,
+                cp.c.updated_at,
+            )
+            .join(
+                cp,
+                (cp.c.vendor == wanted.c.vendor)
+                & (func.lower(cp.c.instance_type) == func.lower(wanted.c.instance_type)),
             )
-            match = result.scalars().first()
-            if match:
-                return match
+            .where(hourly)
+        )
+        candidates = union_all(by_sku, by_instance).subquery("candidates")
+        ranked = (
+            select(candidates.c.idx, candidates.c.id)
+            .distinct(candidates.c.idx)
+            .order_by(candidates.c.idx, candidates.c.tier, candidates.c.updated_at.desc())
+            .subquery("ranked")
+        )
+        result = await self.db.execute(
+            select(ranked.c.idx, CloudPricing).join(CloudPricing, CloudPricing.id == ranked.c.id)
+        )
 
-        return None
+        matches: list[Optional[CloudPricing]] = [None] * len(items)
+        for idx, row in result.all():
+            matches[idx] = row
+        return matches
@@ -1,12 +1,17 @@
 from uuid import UUID
-from sqlalchemy import select
+from typing import Any, Optional, Sequence
+from sqlalchemy import Row, case, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from app.core.pagination import keyset, page_of
 from app.models.invoice import Invoice
 from app.repositories.base import BaseRepository
 
 
 class InvoiceRepository(BaseRepository[Invoice]):
+    # Invoice writes also move vendor metrics (see the invoices_vendor_metrics trigger).
+    cache_namespaces = ("invoices", "vendors")
+
     def __init__(self, db: AsyncSession):
         super().__init__(Invoice, db)
 
@@ -26,6 +31,7 @@ class InvoiceRepository(BaseRepository[Invoice]):
         instance = Invoice(**kwargs)
         self.db.add(instance)
         await self.db.commit()
+        self._invalidate()
         await self.db.refresh(instance)
         # Re-fetch with eager loading
         return await self.get_by_id(instance.id)
@@ -38,23 +44,80 @@ class InvoiceRepository(BaseRepository[Invoice]):
             if value is not None:
                 setattr(instance, key, value)
         await self.db.commit()
+        self._invalidate()
         await self.db.refresh(instance)
         return await self.get_by_id(id)
 
-    async def get_by_status(self, status: str, skip: int = 0, limit: int = 100) -> list[Invoice]:
-        result = await self.db.execute(
-            select(Invoice)
-            .options(selectinload(Invoice.items))
-            .where(Invoice.status == status)
-            .offset(skip).limit(limit)
+    async def get_page(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        where: Sequence[Any] = (),
+        options: Sequence[Any] = (),
+    ) -> tuple[list[Invoice], Optional[str]]:
+        return await super().get_page(
+            skip, limit, cursor, where=where, options=(selectinload(Invoice.items), *options),
         )
-        return list(result.scalars().all())
 
-    async def get_flagged(self, skip: int = 0, limit: int = 100) -> list[Invoice]:
-        result = await self.db.execute(
-            select(Invoice)
-            .options(selectinload(Invoice.items))
-            .where(Invoice.status.in_(["flagged", "overcharge"]))
-            .offset(skip).limit(limit)
+    async def get_by_status(
+        self, status: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[Invoice], Optional[str]]:
+        return await self.get_page(skip, limit, cursor, where=(Invoice.status == status,))
+
+    async def get_flagged(
+        self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[Invoice], Optional[str]]:
+        return await self.get_page(skip, limit, cursor, where=(Invoice.status.in_(["flagged", "overcharge"]),))
+
+    async def get_summary_page(
+        self,
+        fields: Sequence[str],
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> tuple[list[Row], Optional[str]]:
+        """Keyset page of plain column tuples: no ORM objects, JSONB or items are loaded."""
+        keys = [getattr(Invoice, k) for k in self.page_keys]
+        columns = [getattr(Invoice, f) for f in dict.fromkeys((*fields, *self.page_keys))]
+        stmt = select(*columns)
+        if status is not None:
+            stmt = stmt.where(Invoice.status == status)
+        result = await self.db.execute(keyset(stmt, keys, cursor, limit, skip=skip))
+        return page_of(result.all(), keys, limit)
+
+    async def get_vendor_billing_rows(
+        self,
+        vendor_id: UUID,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[Row], Optional[str]]:
+        """Newest-first billing columns for one vendor, via ix_invoices_vendor_id_created_at_id.
+
+        Keyset-paged on (created_at DESC, id DESC) when ``limit`` is given; without
+        it every row is returned and there is no next cursor. ``extracted_total`` /
+        ``extracted_currency`` are only read out of the JSONB when the ``total``
+        column is empty, so the document is never shipped whole.
+        """
+        keys = [getattr(Invoice, k) for k in self.page_keys]
+        missing = Invoice.total.is_(None)
+        stmt = (
+            select(
+                Invoice.id,
+                Invoice.status,
+                Invoice.created_at,
+                Invoice.due_date,
+                Invoice.total,
+                Invoice.currency,
+                case((missing, Invoice.extracted_data["total"])).label("extracted_total"),
+                case((missing, Invoice.extracted_data["currency"])).label("extracted_currency"),
+            )
+            .where(Invoice.vendor_id == vendor_id)
         )
-        return list(result.scalars().all())
+        if limit is None:
+            stmt = stmt.order_by(*(k.desc() for k in keys)).offset(skip)
+            return list((await self.db.execute(stmt)).all()), None
+        result = await self.db.execute(keyset(stmt, keys, cursor, limit, skip=skip))
+        return page_of(result.all(), keys, limit)
@@ -1,16 +1,17 @@
 from uuid import UUID
-from sqlalchemy import select
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.item import Item
 from app.repositories.base import BaseRepository
 
 
 class ItemRepository(BaseRepository[Item]):
+    cache_namespaces = ("invoices",)
+
     def __init__(self, db: AsyncSession):
         super().__init__(Item, db)
 
-    async def get_by_invoice_id(self, invoice_id: UUID, skip: int = 0, limit: int = 100) -> list[Item]:
-        result = await self.db.execute(
-            select(Item).where(Item.invoice_id == invoice_id).offset(skip).limit(limit)
-        )
-        return list(result.scalars().all())
+    async def get_by_invoice_id(
+        self, invoice_id: UUID, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[Item], Optional[str]]:
+        return await self.get_page(skip, limit, cursor, where=(Item.invoice_id == invoice_id,))
@@ -1,10 +1,41 @@
-from sqlalchemy import select
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
 from app.models.market_data import MarketData
 from app.repositories.base import BaseRepository
 
+# Recompute every completed target bucket whose source rows are still retained.
+# Retention deletes source rows on target-bucket boundaries, so each bucket in
+# this window is rebuilt from a complete set of source rows and the upsert is
+# idempotent across runs.
+_ROLL_UP = text("""
+    INSERT INTO market_data (id, name, category, granularity, "timestamp", price_per_unit, sample_count)
+    SELECT gen_random_uuid(), name, category, :target, date_trunc(:unit, "timestamp") AS bucket,
+           sum(price_per_unit * sample_count) / sum(sample_count), sum(sample_count)
+    FROM market_data
+    WHERE granularity = :source
+      AND "timestamp" >= date_trunc(:unit, now() - make_interval(days => :retention_days))
+      AND "timestamp" < date_trunc(:unit, now())
+    GROUP BY name, category, bucket
+    ON CONFLICT ON CONSTRAINT uq_market_data_bucket DO UPDATE SET
+        price_per_unit = EXCLUDED.price_per_unit,
+        sample_count = EXCLUDED.sample_count
+""")
+
+_EXPIRE = text("""
+    DELETE FROM market_data
+    WHERE granularity = :source
+      AND "timestamp" < date_trunc(:unit, now() - make_interval(days => :retention_days))
+""")
+
 
 class MarketDataRepository(BaseRepository[MarketData]):
+    cache_namespaces = ("market_data",)
+
     def __init__(self, db: AsyncSession):
         super().__init__(MarketData, db)
 
@@ -19,3 +50,79 @@ class MarketDataRepository(BaseRepository[MarketData]):
             select(MarketData).where(MarketData.name == name)
         )
         return list(result.scalars().all())
+
+    async def record_samples(self, samples: list[dict]) -> int:
+        """Fold one sync's benchmarks into the current hour bucket, then roll up and expire.
+
+        ``samples`` are ``{"name", "category", "price_per_unit", "sample_count"}``
+        dicts. A bucket written twice in the same hour keeps the sample-weighted
+        mean. Everything is written in one statement per step and one commit.
+        """
+        if not samples:
+            return 0
+
+        bucket = func.date_trunc("hour", func.now())
+        stmt = pg_insert(MarketData.__table__).values([
+            {**s, "granularity": "hour", "timestamp": bucket} for s in samples
+        ])
+        current = MarketData.__table__.c
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_market_data_bucket",
+            set_={
+                "price_per_unit": (
+                    current.price_per_unit * current.sample_count
+                    + stmt.excluded.price_per_unit * stmt.excluded.sample_count
+                ) / (current.sample_count + stmt.excluded.sample_count),
+                "sample_count": current.sample_count + stmt.excluded.sample_count,
+            },
+        )
+        try:
+            result = await self.db.execute(stmt)
+            await self._roll_up_and_expire()
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        self._invalidate()
+        return result.rowcount
+
+    async def _roll_up_and_expire(self) -> None:
+        settings = get_settings()
+        tiers = (
+            ("hour", "day", settings.market_data_hourly_retention_days),
+            ("day", "week", settings.market_data_daily_retention_days),
+        )
+        for source, target, retention_days in tiers:
+            params = {"source": source, "target": target, "unit": target, "retention_days": retention_days}
+            await self.db.execute(_ROLL_UP, params)
+            await self.db.execute(_EXPIRE, params)
+
+    async def get_series(
+        self,
+        name: str,
+        granularity: str,
+        start: datetime,
+        end: datetime,
+        category: Optional[str] = None,
+    ) -> list:
+        """Pre-aggregated points for one benchmark, merged across categories unless one is given."""
+        weight = func.sum(MarketData.sample_count)
+        stmt = (
+            select(
+                MarketData.timestamp,
+                (func.sum(MarketData.price_per_unit * MarketData.sample_count) / weight).label("price_per_unit"),
+                weight.label("sample_count"),
+            )
+            .where(
+                MarketData.name == name,
+                MarketData.granularity == granularity,
+                MarketData.timestamp >= start,
+                MarketData.timestamp < end,
+            )
+            .group_by(MarketData.timestamp)
+            .order_by(MarketData.timestamp)
+        )
+        if category:
+            stmt = stmt.where(MarketData.category == category)
+        result = await self.db.execute(stmt)
+        return list(result.all())
@@ -1,4 +1,5 @@
 from uuid import UUID
+from typing import Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.override import Override
@@ -6,6 +7,8 @@ from app.repositories.base import BaseRepository
 
 
 class OverrideRepository(BaseRepository[Override]):
+    page_keys = ("timestamp", "id")
+
     def __init__(self, db: AsyncSession):
         super().__init__(Override, db)
 
@@ -21,8 +24,7 @@ class OverrideRepository(BaseRepository[Override]):
         )
         return list(result.scalars().all())
 
-    async def get_disagreements(self, skip: int = 0, limit: int = 100) -> list[Override]:
-        result = await self.db.execute(
-            select(Override).where(Override.agreed == False).offset(skip).limit(limit)
-        )
-        return list(result.scalars().all())
+    async def get_disagreements(
+        self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[Override], Optional[str]]:
+        return await self.get_page(skip, limit, cursor, where=(Override.agreed == False,))
@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+from typing import Iterable, Sequence
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.outbox import next_attempt_at
+from app.models.paid_signal import PaidSignal
+
+
+class PaidSignalRepository:
+    """Outbox rows only; the caller owns the transaction (nothing here commits)."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def enqueue(self, customer_external_id: str, event_name: str, data: dict) -> PaidSignal:
+        signal = PaidSignal(customer_external_id=customer_external_id, event_name=event_name, data=data)
+        self.db.add(signal)
+        return signal
+
+    async def claim_due(self, limit: int) -> list[PaidSignal]:
+        """Lock up to ``limit`` due rows, skipping any another flusher holds."""
+        stmt = (
+            select(PaidSignal)
+            .where(PaidSignal.failed_at.is_(None), PaidSignal.next_attempt_at <= datetime.now(timezone.utc))
+            .order_by(PaidSignal.next_attempt_at, PaidSignal.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list((await self.db.execute(stmt)).scalars().all())
+
+    async def delete(self, signals: Sequence[PaidSignal]) -> None:
+        await self.db.execute(
+            delete(PaidSignal)
+            .where(PaidSignal.id.in_([s.id for s in signals]))
+            .execution_options(synchronize_session=False)
+        )
+
+    async def defer(
+        self,
+        failures: Iterable[tuple[PaidSignal, str]],
+        base_seconds: float,
+        max_seconds: float,
+        max_attempts: int,
+    ) -> list[PaidSignal]:
+        """Re-schedule failed rows with backoff; returns those now dead-lettered after ``max_attempts``."""
+        dead: list[PaidSignal] = []
+        now = datetime.now(timezone.utc)
+        for signal, error in failures:
+            signal.attempts += 1
+            signal.last_error = error[:1000]
+            if signal.attempts >= max_attempts:
+                signal.failed_at = now
+                dead.append(signal)
+            else:
+                signal.next_attempt_at = next_attempt_at(signal.attempts, base_seconds, max_seconds)
+        await self.db.flush()
+        return dead
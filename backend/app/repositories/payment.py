@@ -1,4 +1,5 @@
 from uuid import UUID
+from typing import Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.payment import Payment
@@ -6,6 +7,10 @@ from app.repositories.base import BaseRepository
 
 
 class PaymentRepository(BaseRepository[Payment]):
+    page_keys = ("initiated_at", "id")
+    # Vendor summaries total accepted payments.
+    cache_namespaces = ("vendors",)
+
     def __init__(self, db: AsyncSession):
         super().__init__(Payment, db)
 
@@ -15,8 +20,7 @@ class PaymentRepository(BaseRepository[Payment]):
         )
         return list(result.scalars().all())
 
-    async def get_by_status(self, status: str, skip: int = 0, limit: int = 100) -> list[Payment]:
-        result = await self.db.execute(
-            select(Payment).where(Payment.status == status).offset(skip).limit(limit)
-        )
-        return list(result.scalars().all())
+    async def get_by_status(
+        self, status: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[Payment], Optional[str]]:
+        return await self.get_page(skip, limit, cursor, where=(Payment.status == status,))
@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.pricing_sync_run import PricingSyncRun
+from app.repositories.base import BaseRepository
+
+# pg advisory lock key shared by every worker; arbitrary but fixed ("pricesyn").
+SYNC_LOCK_KEY = 0x707269636573796E
+
+
+class PricingSyncRunRepository(BaseRepository[PricingSyncRun]):
+    page_keys = ("started_at", "id")
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(PricingSyncRun, db)
+
+    async def try_lock(self) -> bool:
+        """Take the session-level sync lock without waiting. The session must stay on one connection."""
+        result = await self.db.execute(select(func.pg_try_advisory_lock(SYNC_LOCK_KEY)))
+        return bool(result.scalar())
+
+    async def unlock(self) -> None:
+        await self.db.execute(select(func.pg_advisory_unlock(SYNC_LOCK_KEY)))
+
+    async def get_running(self) -> PricingSyncRun | None:
+        result = await self.db.execute(
+            select(PricingSyncRun)
+            .where(PricingSyncRun.status == "running")
+            .order_by(PricingSyncRun.started_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def fail_interrupted(self) -> int:
+        """Close out runs left "running" by a worker that died. Only call while holding the lock."""
+        result = await self.db.execute(
+            update(PricingSyncRun)
+            .where(PricingSyncRun.status == "running")
+            .values(status="failed", phase=None, finished_at=func.now(), error="interrupted")
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def set_phase(self, id: UUID, phase: str, **fields) -> None:
+        await self.db.execute(update(PricingSyncRun).where(PricingSyncRun.id == id).values(phase=phase, **fields))
+        await self.db.commit()
+
+    async def finish(self, id: UUID, status: str, **fields) -> None:
+        await self.db.execute(
+            update(PricingSyncRun)
+            .where(PricingSyncRun.id == id)
+            .values(status=status, phase=None, finished_at=datetime.now(timezone.utc), **fields)
+        )
+        await self.db.commit()
@@ -1,9 +1,24 @@
+from uuid import UUID
+
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLCache
+from app.core.config import get_settings
 from app.models.user import User
 from app.repositories.base import BaseRepository
 
+# Column values of active users by id (None for unknown or disabled ones), so
+# get_current_user skips the users query on most requests. Writes through
+# UserRepository drop the entry at once; the TTL bounds staleness for writes
+# made by other processes.
+_active_users = TTLCache(get_settings().auth_user_cache_seconds, max_entries=10_000)
+_SNAPSHOT_COLUMNS = tuple(c.key for c in User.__table__.columns if c.key != "hashed_password")
+
+
+def invalidate_user(user_id: UUID) -> None:
+    _active_users.pop(user_id)
+
 
 class UserRepository(BaseRepository[User]):
     def __init__(self, db: AsyncSession):
@@ -14,3 +29,33 @@ class UserRepository(BaseRepository[User]):
             select(User).where(User.email == email)
         )
         return result.scalar_one_or_none()
+
+    async def get_active(self, id: UUID) -> User | None:
+        """Active user by id, served from a short-lived snapshot when cached.
+
+        The returned User is detached from any session (and has no password
+        hash); use ``get_by_id`` to modify a user.
+        """
+        snapshot = _active_users.get(id)
+        if snapshot is TTLCache.MISSING:
+            user = await self.get_by_id(id)
+            snapshot = (
+                {key: getattr(user, key) for key in _SNAPSHOT_COLUMNS}
+                if user is not None and user.is_active else None
+            )
+            _active_users.set(id, snapshot)
+        return User(**snapshot) if snapshot is not None else None
+
+    async def set_active(self, id: UUID, is_active: bool) -> User | None:
+        """Enable or disable a user; takes effect on the next authenticated request."""
+        return await self.update(id, is_active=is_active)
+
+    async def update(self, id: UUID, **kwargs) -> User | None:
+        user = await super().update(id, **kwargs)
+        invalidate_user(id)
+        return user
+
+    async def delete(self, id: UUID) -> bool:
+        deleted = await super().delete(id)
+        invalidate_user(id)
+        return deleted
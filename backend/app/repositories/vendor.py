@@ -1,104 +1,102 @@
-from decimal import Decimal, InvalidOperation
 from uuid import UUID
-from sqlalchemy import select, func, case
+from sqlalchemy import Select, select, func, case, text
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm.attributes import set_committed_value
 from app.models.vendor import Vendor
 from app.models.invoice import Invoice
 from app.models.payment import Payment
 from app.repositories.base import BaseRepository
 
+# Vendors whose stored sums differ from their invoices. Read without locks, so
+# a vendor with writes in flight can show up; the per-vendor pass rechecks.
+DRIFTED_VENDOR_METRICS = text(
+    """
+    SELECT v.id
+    FROM vendors v
+    LEFT JOIN (
+        SELECT vendor_id,
+               count(*) AS invoice_count,
+               COALESCE(sum(total), 0) AS invoice_total_sum,
+               count(total) AS invoice_total_count,
+               COALESCE(sum(confidence_score), 0) AS confidence_sum
+        FROM invoices
+        WHERE vendor_id IS NOT NULL
+        GROUP BY vendor_id
+    ) a ON a.vendor_id = v.id
+    WHERE (v.invoice_count, v.invoice_total_sum, v.invoice_total_count, v.confidence_sum)
+          IS DISTINCT FROM
+          (COALESCE(a.invoice_count, 0), COALESCE(a.invoice_total_sum, 0),
+           COALESCE(a.invoice_total_count, 0), COALESCE(a.confidence_sum, 0))
+    """
+)
+
+# Recompute one vendor; run with that vendor's row locked.
+RECONCILE_VENDOR_METRICS = text(
+    """
+    WITH actual AS (
+        SELECT count(*) AS invoice_count,
+               COALESCE(sum(total), 0) AS invoice_total_sum,
+               count(total) AS invoice_total_count,
+               COALESCE(sum(confidence_score), 0) AS confidence_sum
+        FROM invoices
+        WHERE vendor_id = :vendor_id
+    )
+    UPDATE vendors v SET
+        invoice_count = a.invoice_count,
+        invoice_total_sum = a.invoice_total_sum,
+        invoice_total_count = a.invoice_total_count,
+        confidence_sum = a.confidence_sum,
+        avg_invoice_amount = a.invoice_total_sum / NULLIF(a.invoice_total_count, 0),
+        trust_score = CASE
+            WHEN a.invoice_count = 0 THEN 0.5
+            ELSE LEAST(GREATEST(a.confidence_sum::numeric / a.invoice_count, 0), 100) / 100
+        END
+    FROM actual a
+    WHERE v.id = :vendor_id
+      AND (v.invoice_count, v.invoice_total_sum, v.invoice_total_count, v.confidence_sum)
+          IS DISTINCT FROM (a.invoice_count, a.invoice_total_sum, a.invoice_total_count, a.confidence_sum)
+    RETURNING v.id
+    """
+)
+
 
 class VendorRepository(BaseRepository[Vendor]):
+    cache_namespaces = ("vendors",)
+
     def __init__(self, db: AsyncSession):
         super().__init__(Vendor, db)
 
-    @staticmethod
-    def _to_decimal(value: object) -> Decimal | None:
-        if value is None:
-            return None
-        try:
-            return Decimal(str(value))
-        except (InvalidOperation, TypeError, ValueError):
-            return None
-
-    @staticmethod
-    def _score_to_trust(score: Decimal) -> Decimal:
-        bounded_score = min(Decimal("100"), max(Decimal("0"), score))
-        return bounded_score / Decimal("100")
-
-    async def _metric_map(self, vendor_ids: list[UUID]) -> dict[UUID, tuple[int, Decimal | None, Decimal | None]]:
-        if not vendor_ids:
-            return {}
-
-        rows = await self.db.execute(
-            select(
-                Invoice.vendor_id.label("vendor_id"),
-                func.count(Invoice.id).label("invoice_count"),
-                func.avg(Invoice.total).label("avg_invoice_amount"),
-                func.avg(func.coalesce(Invoice.confidence_score, 0)).label("avg_invoice_score"),
-            )
-            .where(Invoice.vendor_id.in_(vendor_ids))
-            .group_by(Invoice.vendor_id)
-        )
-
-        metric_map: dict[UUID, tuple[int, Decimal | None, Decimal | None]] = {}
-        for vendor_id, invoice_count, avg_invoice_amount, avg_invoice_score in rows.all():
-            if vendor_id is None:
-                continue
-            metric_map[vendor_id] = (
-                int(invoice_count or 0),
-                self._to_decimal(avg_invoice_amount),
-                self._to_decimal(avg_invoice_score),
-            )
-        return metric_map
-
-    async def _hydrate_metrics(self, vendors: list[Vendor]) -> list[Vendor]:
-        metric_map = await self._metric_map([vendor.id for vendor in vendors])
-
-        for vendor in vendors:
-            invoice_count, avg_invoice_amount, avg_invoice_score = metric_map.get(
-                vendor.id,
-                (0, None, None),
-            )
-
-            set_committed_value(vendor, "invoice_count", invoice_count)
-            set_committed_value(vendor, "avg_invoice_amount", avg_invoice_amount)
-
-            # Baseline trust score for vendors with no invoices.
-            trust_score = Decimal("0.5") if invoice_count == 0 else self._score_to_trust(
-                avg_invoice_score or Decimal("0")
-            )
-            set_committed_value(vendor, "trust_score", trust_score)
-
-        return vendors
-
-    async def get_by_id(self, id: UUID) -> Vendor | None:
-        vendor = await super().get_by_id(id)
-        if vendor is None:
-            return None
-        await self._hydrate_metrics([vendor])
-        return vendor
-
-    async def get_all(self, skip: int = 0, limit: int = 100) -> list[Vendor]:
-        vendors = await super().get_all(skip, limit)
-        return await self._hydrate_metrics(vendors)
+    def _select(self) -> Select:
+        # The metric columns are written by a trigger, so a copy already in the
+        # identity map can be stale; always take the row as read.
+        return super()._select().execution_options(populate_existing=True)
 
     async def get_by_name(self, name: str) -> Vendor | None:
-        result = await self.db.execute(select(Vendor).where(Vendor.name == name))
-        vendor = result.scalar_one_or_none()
-        if vendor is None:
-            return None
-        await self._hydrate_metrics([vendor])
-        return vendor
+        result = await self.db.execute(self._select().where(Vendor.name == name))
+        return result.scalar_one_or_none()
 
     async def get_by_email(self, email: str) -> Vendor | None:
-        result = await self.db.execute(select(Vendor).where(Vendor.email == email))
-        vendor = result.scalar_one_or_none()
-        if vendor is None:
-            return None
-        await self._hydrate_metrics([vendor])
-        return vendor
+        result = await self.db.execute(self._select().where(Vendor.email == email))
+        return result.scalar_one_or_none()
+
+    async def reconcile_metrics(self) -> int:
+        """Recompute the running sums of vendors that drifted from their invoices; returns how many were fixed.
+
+        No table lock: a lock-free snapshot finds candidates, then each one is
+        recounted in its own short transaction holding that vendor's row. The
+        trigger updates the same row, so an invoice write for the vendor either
+        committed before the recount (and is counted) or waits and applies its
+        increment on top of it.
+        """
+        candidates = (await self.db.execute(DRIFTED_VENDOR_METRICS)).scalars().all()
+        await self.db.commit()
+        fixed = 0
+        for vendor_id in candidates:
+            await self.db.execute(select(Vendor.id).where(Vendor.id == vendor_id).with_for_update())
+            fixed += len((await self.db.execute(RECONCILE_VENDOR_METRICS, {"vendor_id": vendor_id})).all())
+            await self.db.commit()
+        if fixed:
+            self._invalidate()
+        return fixed
 
     async def get_vendor_summary(self, vendor_id: UUID) -> dict | None:
         vendor = await self.get_by_id(vendor_id)
@@ -0,0 +1,100 @@
+from uuid import UUID
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.vendor_usage_rollup import VendorUsageRollup, FRAUD_STATUSES
+
+_FRAUD = "status IN (" + ", ".join(f"'{status}'" for status in FRAUD_STATUSES) + ")"
+
+_ACTUAL = f"""
+    count(*) AS invoice_count,
+    COALESCE(sum(total), 0) AS total_sum,
+    count(*) FILTER (WHERE {_FRAUD}) AS fraud_count,
+    COALESCE(sum(total) FILTER (WHERE {_FRAUD}), 0) AS fraud_total,
+    count(negotiation_email) AS negotiation_count,
+    min(created_at) AS first_invoice_at,
+    max(created_at) AS last_invoice_at
+"""
+
+# Vendors whose rollup (or missing rollup) differs from their invoices. Read
+# without locks, so a vendor with writes in flight can show up; the
+# per-vendor pass rechecks.
+DRIFTED_VENDOR_USAGE = text(
+    f"""
+    WITH actual AS (
+        SELECT vendor_id, {_ACTUAL}
+        FROM invoices
+        WHERE vendor_id IS NOT NULL
+        GROUP BY vendor_id
+    )
+    SELECT COALESCE(a.vendor_id, r.vendor_id)
+    FROM actual a
+    FULL JOIN vendor_usage_rollups r ON r.vendor_id = a.vendor_id
+    WHERE (r.invoice_count, r.total_sum, r.fraud_count, r.fraud_total, r.negotiation_count,
+           r.first_invoice_at, r.last_invoice_at)
+          IS DISTINCT FROM
+          (COALESCE(a.invoice_count, 0), COALESCE(a.total_sum, 0), COALESCE(a.fraud_count, 0),
+           COALESCE(a.fraud_total, 0), COALESCE(a.negotiation_count, 0),
+           a.first_invoice_at, a.last_invoice_at)
+    """
+)
+
+# Recompute one vendor's rollup (zeros when it has no invoices left); run with
+# its rollup row locked. Only writes when the row has drifted.
+RECONCILE_VENDOR_USAGE = text(
+    f"""
+    INSERT INTO vendor_usage_rollups AS r (
+        vendor_id, invoice_count, total_sum, fraud_count, fraud_total, negotiation_count,
+        first_invoice_at, last_invoice_at, updated_at
+    )
+    SELECT CAST(:vendor_id AS uuid), a.*, now()
+    FROM (
+        SELECT {_ACTUAL}
+        FROM invoices
+        WHERE vendor_id = :vendor_id
+        HAVING EXISTS (SELECT 1 FROM vendors WHERE id = :vendor_id)
+    ) a
+    ON CONFLICT (vendor_id) DO UPDATE SET
+        invoice_count = EXCLUDED.invoice_count,
+        total_sum = EXCLUDED.total_sum,
+        fraud_count = EXCLUDED.fraud_count,
+        fraud_total = EXCLUDED.fraud_total,
+        negotiation_count = EXCLUDED.negotiation_count,
+        first_invoice_at = EXCLUDED.first_invoice_at,
+        last_invoice_at = EXCLUDED.last_invoice_at,
+        updated_at = now()
+    WHERE (r.invoice_count, r.total_sum, r.fraud_count, r.fraud_total, r.negotiation_count,
+           r.first_invoice_at, r.last_invoice_at)
+          IS DISTINCT FROM
+          (EXCLUDED.invoice_count, EXCLUDED.total_sum, EXCLUDED.fraud_count, EXCLUDED.fraud_total,
+           EXCLUDED.negotiation_count, EXCLUDED.first_invoice_at, EXCLUDED.last_invoice_at)
+    RETURNING r.vendor_id
+    """
+)
+
+
+class VendorUsageRollupRepository:
+    """Read side of the trigger-maintained vendor_usage_rollups table; it is never written from Python."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, vendor_id: UUID) -> VendorUsageRollup | None:
+        return await self.db.get(VendorUsageRollup, vendor_id, populate_existing=True)
+
+    async def reconcile(self) -> int:
+        """Recompute the rollups that drifted from the invoices; returns how many were fixed.
+
+        Same scheme as VendorRepository.reconcile_metrics, holding the rollup
+        row the trigger upserts. A missing row is not lockable, but a trigger
+        insert racing the recount conflicts on the key and waits for it.
+        """
+        candidates = (await self.db.execute(DRIFTED_VENDOR_USAGE)).scalars().all()
+        await self.db.commit()
+        fixed = 0
+        for vendor_id in candidates:
+            await self.db.execute(
+                select(VendorUsageRollup.vendor_id).where(VendorUsageRollup.vendor_id == vendor_id).with_for_update()
+            )
+            fixed += len((await self.db.execute(RECONCILE_VENDOR_USAGE, {"vendor_id": vendor_id})).all())
+            await self.db.commit()
+        return fixed
@@ -1,21 +1,21 @@
-from app.schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse
+from app.schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse, InvoiceSummary
 from app.schemas.vendor import VendorCreate, VendorUpdate, VendorResponse
 from app.schemas.payment import PaymentCreate, PaymentUpdate, PaymentResponse
 from app.schemas.override import OverrideCreate, OverrideUpdate, OverrideResponse
 from app.schemas.client import ClientCreate, ClientUpdate, ClientResponse
-from app.schemas.market_data import MarketDataCreate, MarketDataUpdate, MarketDataResponse
+from app.schemas.market_data import MarketDataCreate, MarketDataUpdate, MarketDataResponse, MarketDataPoint, MarketDataSeries
 from app.schemas.item import ItemCreate, ItemUpdate, ItemResponse
-from app.schemas.cloud_pricing import CloudPricingResponse, InvoiceCheckRequest, InvoiceCheckResponse, SyncStatus
+from app.schemas.cloud_pricing import CloudPricingResponse, InvoiceCheckRequest, InvoiceCheckResponse, PricingSearchHit, PricingSyncRunResponse, SyncStatus
 from app.schemas.auth import UserRegister, UserLogin, UserResponse, TokenResponse, TokenRefreshRequest
 
 __all__ = [
-    "InvoiceCreate", "InvoiceUpdate", "InvoiceResponse",
+    "InvoiceCreate", "InvoiceUpdate", "InvoiceResponse", "InvoiceSummary",
     "VendorCreate", "VendorUpdate", "VendorResponse",
     "PaymentCreate", "PaymentUpdate", "PaymentResponse",
     "OverrideCreate", "OverrideUpdate", "OverrideResponse",
     "ClientCreate", "ClientUpdate", "ClientResponse",
-    "MarketDataCreate", "MarketDataUpdate", "MarketDataResponse",
+    "MarketDataCreate", "MarketDataUpdate", "MarketDataResponse", "MarketDataPoint", "MarketDataSeries",
     "ItemCreate", "ItemUpdate", "ItemResponse",
-    "CloudPricingResponse", "InvoiceCheckRequest", "InvoiceCheckResponse", "SyncStatus",
+    "CloudPricingResponse", "InvoiceCheckRequest", "InvoiceCheckResponse", "PricingSearchHit", "PricingSyncRunResponse", "SyncStatus",
     "UserRegister", "UserLogin", "UserResponse", "TokenResponse", "TokenRefreshRequest",
 ]
@@ -20,6 +20,9 @@ class CloudPricingResponse(BaseModel):
     price_per_unit: Decimal
     unit: str
     price_per_hour: Optional[Decimal]
+    unit_dimension: Optional[str] = None
+    canonical_unit: Optional[str] = None
+    canonical_price: Optional[Decimal] = None
     currency: str
     effective_date: Optional[datetime]
     source_api: str
@@ -27,12 +30,17 @@ class CloudPricingResponse(BaseModel):
     updated_at: datetime
 
 
+class PricingSearchHit(CloudPricingResponse):
+    score: float
+
+
 class InvoiceLineItem(BaseModel):
     """A single line from the customer invoice to validate."""
     vendor: str
     sku_id: Optional[str] = None
     instance_type: Optional[str] = None
     region: Optional[str] = None
+    description: Optional[str] = None  # instance_type / region are read from it when not given
     hours: Decimal
     billed_amount: Decimal
 
@@ -64,3 +72,18 @@ class SyncStatus(BaseModel):
     by_vendor: Dict[str, int]
     by_category: Dict[str, int]
     message: str
+    run_id: Optional[UUID] = None
+
+
+class PricingSyncRunResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    status: str
+    phase: Optional[str]
+    started_at: datetime
+    finished_at: Optional[datetime]
+    records_seen: Optional[int]
+    rows_affected: Optional[int]
+    sources: Optional[Dict[str, Any]]
+    error: Optional[str]
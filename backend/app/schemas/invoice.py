@@ -52,3 +52,29 @@ class InvoiceResponse(BaseModel):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class InvoiceSummary(BaseModel):
+    """Row of the invoice table view: scalar columns only, no JSONB and no items.
+
+    Responses carry only the columns requested with ``fields=`` (all of these by default).
+    """
+    id: UUID
+    vendor_id: UUID | None = None
+    client_id: UUID | None = None
+    invoice_number: str | None = None
+    due_date: datetime | None = None
+    vendor_name: str | None = None
+    client_name: str | None = None
+    subtotal: Decimal | None = None
+    tax: Decimal | None = None
+    total: Decimal | None = None
+    currency: str | None = None
+    confidence_score: int | None = None
+    status: str | None = None
+    auto_approved: bool | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+INVOICE_SUMMARY_FIELDS: tuple[str, ...] = tuple(InvoiceSummary.model_fields)
@@ -1,6 +1,7 @@
 from uuid import UUID
 from datetime import datetime
 from decimal import Decimal
+from typing import Literal
 from pydantic import BaseModel
 
 
@@ -22,5 +23,22 @@ class MarketDataResponse(BaseModel):
     category: str
     price_per_unit: Decimal
     timestamp: datetime
+    granularity: str
+    sample_count: int
 
     model_config = {"from_attributes": True}
+
+
+class MarketDataPoint(BaseModel):
+    timestamp: datetime
+    price_per_unit: Decimal
+    sample_count: int
+
+    model_config = {"from_attributes": True}
+
+
+class MarketDataSeries(BaseModel):
+    name: str
+    category: str | None
+    granularity: Literal["hour", "day", "week"]
+    points: list[MarketDataPoint]
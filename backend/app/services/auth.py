@@ -16,7 +16,7 @@ class AuthService:
 
         user = await self.repo.create(
             email=data.email,
-            hashed_password=hash_password(data.password),
+            hashed_password=await hash_password(data.password),
             full_name=data.full_name,
             company_name=data.company_name,
         )
@@ -24,7 +24,7 @@ class AuthService:
 
     async def login(self, data) -> TokenResponse:
         user = await self.repo.get_by_email(data.email)
-        if not user or not verify_password(data.password, user.hashed_password):
+        if not user or not await verify_password(data.password, user.hashed_password):
             raise ValueError("Invalid email or password")
 
         if not user.is_active:
@@ -40,9 +40,8 @@ class AuthService:
         if payload is None or payload.get("type") != "refresh":
             raise ValueError("Invalid or expired refresh token")
 
-        user_id = UUID(payload["sub"])
-        user = await self.repo.get_by_id(user_id)
-        if not user or not user.is_active:
+        user = await self.repo.get_active(UUID(payload["sub"]))
+        if not user:
             raise ValueError("User not found or disabled")
 
         return TokenResponse(
@@ -2,9 +2,10 @@ import asyncio
 import logging
 from collections import defaultdict
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Awaitable, Callable, Iterable, Iterator, Optional
 from uuid import UUID
 
+from app.core.cache import invalidate
 from app.repositories.cloud_pricing import CloudPricingRepository
 from app.repositories.market_data import MarketDataRepository
 from app.schemas.cloud_pricing import (
@@ -13,10 +14,12 @@ from app.schemas.cloud_pricing import (
     InvoiceCheckResponse,
     InvoiceLineItem,
     LineItemResult,
+    PricingSearchHit,
     SyncStatus,
 )
+from app.pricing.catalog import PricingCatalog, get_catalog
 from app.pricing.fetcher import fetch_all
-from app.pricing.normalizer import normalize_all
+from app.pricing.normalizer import SYNC_BATCH_SIZE, normalize_all
 
 logger = logging.getLogger(__name__)
 
@@ -39,74 +42,118 @@ class CloudPricingService:
         service_name: Optional[str] = None,
         skip: int = 0,
         limit: int = 50,
-    ) -> list[CloudPricingResponse]:
-        items = await self.repo.get_filtered(
+        cursor: Optional[str] = None,
+    ) -> tuple[list[CloudPricingResponse], Optional[str]]:
+        items, next_cursor = await self.repo.get_filtered(
             vendor=vendor, category=category, region=region,
             instance_type=instance_type, service_name=service_name,
-            skip=skip, limit=limit,
+            skip=skip, limit=limit, cursor=cursor,
         )
-        return [CloudPricingResponse.model_validate(i) for i in items]
+        return [CloudPricingResponse.model_validate(i) for i in items], next_cursor
+
+    async def search(self, q: str, limit: int = 20, vendor: Optional[str] = None) -> list[PricingSearchHit]:
+        hits = await self.repo.search(q, limit=limit, vendor=vendor)
+        return [
+            PricingSearchHit(**CloudPricingResponse.model_validate(item).model_dump(), score=score)
+            for item, score in hits
+        ]
+
+    async def run_sync(self, on_phase: Optional[Callable[..., Awaitable[None]]] = None) -> dict[str, Any]:
+        """Fetch → normalise → upsert. Runs fetcher in a thread (sync HTTP).
+
+        Normalised records are streamed straight into the COPY-based upsert in
+        ``SYNC_BATCH_SIZE`` chunks; market-data benchmarks are aggregated on the
+        way through so the record stream is never materialised. ``on_phase`` is
+        awaited as each phase starts. Callers should go through
+        ``app.pricing.sync.start_sync`` so only one sync runs at a time.
+        """
+        async def phase(name: str, **fields) -> None:
+            if on_phase is not None:
+                await on_phase(name, **fields)
 
-    async def trigger_sync(self) -> SyncStatus:
-        """Fetch → normalise → upsert. Runs fetcher in a thread (sync HTTP)."""
         logger.info("Starting full pricing sync …")
+        await phase("fetching")
         payloads = await asyncio.to_thread(fetch_all)
-        records = normalize_all(payloads)
-        logger.info("Normalised %d records across all sources", len(records))
+        sources = {
+            name: {k: v for k, v in payload.items() if k not in ("raw_records", "csv_columns")}
+            for name, payload in payloads.items()
+        }
+        await phase("ingesting", sources=sources)
+
+        buckets: dict[tuple[str, str], list] = defaultdict(lambda: [Decimal("0"), 0])
+        seen = 0
+
+        def _tap(records: Iterable[dict]) -> Iterator[dict]:
+            nonlocal seen
+            for r in records:
+                seen += 1
+                ppu = r.get("price_per_unit")
+                if ppu is not None and ppu != 0:
+                    bucket = buckets[(r.get("service_name", "Unknown"), r.get("category", "Other"))]
+                    bucket[0] += Decimal(str(ppu))
+                    bucket[1] += 1
+                yield r
+
+        affected = await self.repo.bulk_upsert_records(
+            _tap(normalize_all(payloads)), copy_batch_size=SYNC_BATCH_SIZE,
+        )
+        del payloads
+        logger.info("Normalised %d records across all sources", seen)
 
-        if records:
-            affected = await self.repo.upsert_records(records)
+        if seen:
             logger.info("Sync complete — %d rows upserted", affected)
+            await get_catalog(self.repo.db, force=True)
 
             # Populate market_data with aggregated benchmarks
-            await self._populate_market_data(records)
+            await phase("market_data", records_seen=seen, rows_affected=affected)
+            await self._populate_market_data(buckets)
+            invalidate("pricing", "market_data")
 
-        return await self.get_sync_status()
+        return {"sources": sources, "records_seen": seen, "rows_affected": affected}
 
-    async def _populate_market_data(self, records: list[dict]) -> None:
-        """Create market_data entries from synced cloud pricing records."""
+    async def _populate_market_data(self, buckets: dict[tuple[str, str], list]) -> None:
+        """Write (sum, count) buckets keyed by (service_name, category) into this hour's market_data."""
         if not self.market_data_repo:
             return
 
-        # Aggregate: average price_per_unit grouped by (service_name, category)
-        buckets: dict[tuple[str, str], list[Decimal]] = defaultdict(list)
-        for r in records:
-            ppu = r.get("price_per_unit")
-            if ppu is None or ppu == 0:
-                continue
-            key = (r.get("service_name", "Unknown"), r.get("category", "Other"))
-            buckets[key].append(Decimal(str(ppu)))
-
-        count = 0
-        for (service_name, category), prices in buckets.items():
-            avg_price = sum(prices) / len(prices)
-            await self.market_data_repo.create(
-                name=service_name,
-                category=category,
-                price_per_unit=avg_price,
-            )
-            count += 1
-
+        samples = [
+            {"name": service_name, "category": category, "price_per_unit": total / n, "sample_count": n}
+            for (service_name, category), (total, n) in buckets.items()
+            if n
+        ]
+        count = await self.market_data_repo.record_samples(samples)
         logger.info("Populated %d market_data benchmark entries", count)
 
     async def get_sync_status(self) -> SyncStatus:
         data = await self.repo.get_sync_status()
         return SyncStatus(**data)
 
+    @staticmethod
+    def _with_recognized_attributes(catalog: PricingCatalog, item: InvoiceLineItem) -> InvoiceLineItem:
+        """Fill a missing instance_type / region from the line's description."""
+        if not item.description or (item.instance_type and item.region):
+            return item
+        found = catalog.recognize(item.vendor, item.description)
+        return item.model_copy(update={
+            "instance_type": item.instance_type or found.instance_type,
+            "region": item.region or found.region,
+        })
+
     async def check_invoice(self, req: InvoiceCheckRequest) -> InvoiceCheckResponse:
-        """Compare invoice line items against stored pricing catalogue."""
+        """Compare invoice line items against the in-memory pricing catalogue."""
         line_results: list[LineItemResult] = []
         total_billed = Decimal("0")
         total_expected = Decimal("0")
 
-        for item in req.items:
+        catalog = await get_catalog(self.repo.db)
+        items = [self._with_recognized_attributes(catalog, item) for item in req.items]
+        positions = catalog.find_best_matches(
+            [(item.vendor, item.sku_id, item.instance_type, item.region) for item in items]
+        )
+
+        for item, pos in zip(items, positions):
             total_billed += item.billed_amount
-            match = await self.repo.find_best_match(
-                vendor=item.vendor,
-                sku_id=item.sku_id,
-                instance_type=item.instance_type,
-                region=item.region,
-            )
+            match = catalog.row(pos) if pos is not None else None
 
             if match is None:
                 line_results.append(LineItemResult(
@@ -116,7 +163,7 @@ class CloudPricingService:
                 ))
                 continue
 
-            expected = match.price_per_hour * item.hours
+            expected = match["canonical_price"] * item.hours
             total_expected += expected
             discrepancy = item.billed_amount - expected
             pct = (discrepancy / expected * 100).quantize(Decimal("0.01")) if expected else None
@@ -1,6 +1,7 @@
 from uuid import UUID
+from typing import Any, Optional, Sequence
 from app.repositories.invoice import InvoiceRepository
-from app.schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse
+from app.schemas.invoice import INVOICE_SUMMARY_FIELDS, InvoiceCreate, InvoiceUpdate, InvoiceResponse
 
 
 class InvoiceService:
@@ -11,17 +12,36 @@ class InvoiceService:
         invoice = await self.repo.get_by_id(id)
         return InvoiceResponse.model_validate(invoice) if invoice else None
 
-    async def get_all_invoices(self, skip: int = 0, limit: int = 100) -> list[InvoiceResponse]:
-        invoices = await self.repo.get_all(skip, limit)
-        return [InvoiceResponse.model_validate(i) for i in invoices]
-
-    async def get_by_status(self, status: str, skip: int = 0, limit: int = 100) -> list[InvoiceResponse]:
-        invoices = await self.repo.get_by_status(status, skip, limit)
-        return [InvoiceResponse.model_validate(i) for i in invoices]
-
-    async def get_flagged(self, skip: int = 0, limit: int = 100) -> list[InvoiceResponse]:
-        invoices = await self.repo.get_flagged(skip, limit)
-        return [InvoiceResponse.model_validate(i) for i in invoices]
+    async def get_all_invoices(
+        self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[InvoiceResponse], Optional[str]]:
+        invoices, next_cursor = await self.repo.get_page(skip, limit, cursor)
+        return [InvoiceResponse.model_validate(i) for i in invoices], next_cursor
+
+    async def get_by_status(
+        self, status: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[InvoiceResponse], Optional[str]]:
+        invoices, next_cursor = await self.repo.get_by_status(status, skip, limit, cursor)
+        return [InvoiceResponse.model_validate(i) for i in invoices], next_cursor
+
+    async def get_flagged(
+        self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[InvoiceResponse], Optional[str]]:
+        invoices, next_cursor = await self.repo.get_flagged(skip, limit, cursor)
+        return [InvoiceResponse.model_validate(i) for i in invoices], next_cursor
+
+    async def get_summaries(
+        self,
+        fields: Sequence[str] = INVOICE_SUMMARY_FIELDS,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+        """Summary rows restricted to ``fields`` (``id`` is always included)."""
+        fields = list(dict.fromkeys(("id", *fields)))
+        rows, next_cursor = await self.repo.get_summary_page(fields, skip, limit, cursor, status)
+        return [{f: getattr(row, f) for f in fields} for row in rows], next_cursor
 
     async def create_invoice(self, data: InvoiceCreate) -> InvoiceResponse:
         invoice = await self.repo.create(**data.model_dump(exclude_unset=True))
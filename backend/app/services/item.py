@@ -1,4 +1,5 @@
 from uuid import UUID
+from typing import Optional
 from app.repositories.item import ItemRepository
 from app.schemas.item import ItemCreate, ItemUpdate, ItemResponse
 
@@ -11,13 +12,17 @@ class ItemService:
         item = await self.repo.get_by_id(id)
         return ItemResponse.model_validate(item) if item else None
 
-    async def get_all_items(self, skip: int = 0, limit: int = 100) -> list[ItemResponse]:
-        items = await self.repo.get_all(skip, limit)
-        return [ItemResponse.model_validate(i) for i in items]
-
-    async def get_by_invoice_id(self, invoice_id: UUID, skip: int = 0, limit: int = 100) -> list[ItemResponse]:
-        items = await self.repo.get_by_invoice_id(invoice_id, skip, limit)
-        return [ItemResponse.model_validate(i) for i in items]
+    async def get_all_items(
+        self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[ItemResponse], Optional[str]]:
+        items, next_cursor = await self.repo.get_page(skip, limit, cursor)
+        return [ItemResponse.model_validate(i) for i in items], next_cursor
+
+    async def get_by_invoice_id(
+        self, invoice_id: UUID, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[ItemResponse], Optional[str]]:
+        items, next_cursor = await self.repo.get_by_invoice_id(invoice_id, skip, limit, cursor)
+        return [ItemResponse.model_validate(i) for i in items], next_cursor
 
     async def create_item(self, data: ItemCreate) -> ItemResponse:
         item = await self.repo.create(**data.model_dump(exclude_unset=True))
@@ -1,6 +1,21 @@
 from uuid import UUID
+from datetime import datetime, timedelta
+from typing import Optional
 from app.repositories.market_data import MarketDataRepository
-from app.schemas.market_data import MarketDataCreate, MarketDataUpdate, MarketDataResponse
+from app.schemas.market_data import (
+    MarketDataCreate, MarketDataUpdate, MarketDataResponse, MarketDataPoint, MarketDataSeries,
+)
+
+# Widest range each granularity serves before "auto" steps up to the next one.
+_AUTO_RANGES = ((timedelta(days=3), "hour"), (timedelta(days=180), "day"))
+
+
+def pick_granularity(start: datetime, end: datetime) -> str:
+    span = end - start
+    for limit, granularity in _AUTO_RANGES:
+        if span <= limit:
+            return granularity
+    return "week"
 
 
 class MarketDataService:
@@ -23,6 +38,24 @@ class MarketDataService:
         data = await self.repo.get_by_name(name)
         return [MarketDataResponse.model_validate(d) for d in data]
 
+    async def get_series(
+        self,
+        name: str,
+        start: datetime,
+        end: datetime,
+        granularity: str = "auto",
+        category: Optional[str] = None,
+    ) -> MarketDataSeries:
+        if granularity == "auto":
+            granularity = pick_granularity(start, end)
+        rows = await self.repo.get_series(name, granularity, start, end, category=category)
+        return MarketDataSeries(
+            name=name,
+            category=category,
+            granularity=granularity,
+            points=[MarketDataPoint.model_validate(r) for r in rows],
+        )
+
     async def create_market_data(self, data: MarketDataCreate) -> MarketDataResponse:
         entry = await self.repo.create(**data.model_dump(exclude_unset=True))
         return MarketDataResponse.model_validate(entry)
@@ -1,4 +1,5 @@
 from uuid import UUID
+from typing import Optional
 from app.repositories.override import OverrideRepository
 from app.schemas.override import OverrideCreate, OverrideUpdate, OverrideResponse
 
@@ -11,9 +12,11 @@ class OverrideService:
         override = await self.repo.get_by_id(id)
         return OverrideResponse.model_validate(override) if override else None
 
-    async def get_all_overrides(self, skip: int = 0, limit: int = 100) -> list[OverrideResponse]:
-        overrides = await self.repo.get_all(skip, limit)
-        return [OverrideResponse.model_validate(o) for o in overrides]
+    async def get_all_overrides(
+        self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[OverrideResponse], Optional[str]]:
+        overrides, next_cursor = await self.repo.get_page(skip, limit, cursor)
+        return [OverrideResponse.model_validate(o) for o in overrides], next_cursor
 
     async def get_by_invoice_id(self, invoice_id: UUID) -> list[OverrideResponse]:
         overrides = await self.repo.get_by_invoice_id(invoice_id)
@@ -23,9 +26,11 @@ class OverrideService:
         overrides = await self.repo.get_by_vendor_id(vendor_id)
         return [OverrideResponse.model_validate(o) for o in overrides]
 
-    async def get_disagreements(self, skip: int = 0, limit: int = 100) -> list[OverrideResponse]:
-        overrides = await self.repo.get_disagreements(skip, limit)
-        return [OverrideResponse.model_validate(o) for o in overrides]
+    async def get_disagreements(
+        self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[OverrideResponse], Optional[str]]:
+        overrides, next_cursor = await self.repo.get_disagreements(skip, limit, cursor)
+        return [OverrideResponse.model_validate(o) for o in overrides], next_cursor
 
     async def create_override(self, data: OverrideCreate) -> OverrideResponse:
         override = await self.repo.create(**data.model_dump(exclude_unset=True))
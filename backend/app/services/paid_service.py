@@ -1,11 +1,22 @@
-"""Paid.ai value attribution – tracks financial impact of the AI agent."""
+"""Paid.ai value attribution – tracks financial impact of the AI agent.
+
+Signals go through the paid_signal_outbox table: ``track_value`` only adds a
+row to the caller's transaction and ``signal_worker`` sends due rows in
+batches in the background (see app.core.outbox).
+"""
 
 import logging
 from typing import Any
 
 from paid import AsyncPaid, Signal, CustomerByExternalId, ProductByExternalId
+from paid.core.api_error import ApiError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.outbox import OutboxWorker
+from app.models.paid_signal import PaidSignal
+from app.repositories.paid_signal import PaidSignalRepository
 
 logger = logging.getLogger(__name__)
 
@@ -30,27 +41,132 @@ def init_paid() -> None:
     logger.info("Paid.ai client initialised")
 
 
-async def track_value(
+def track_value(
+    db: AsyncSession,
     vendor_id: str,
     event_name: str,
     value: float,
     metadata: dict[str, Any] | None = None,
 ) -> None:
-    """Fire a single value-metric signal to Paid.ai.
+    """Queue a single value-metric signal for Paid.ai in ``db``'s transaction.
 
+    Nothing goes over the network here: the row is sent by the background
+    flusher once the caller commits (call ``notify_signals`` afterwards).
     Silently no-ops when the client is not configured so the pipeline
     never breaks because of attribution tracking.
     """
     if _client is None:
         return
+    PaidSignalRepository(db).enqueue(vendor_id, event_name, {"value_generated": value, **(metadata or {})})
+    db.info["paid_signals"] = db.info.get("paid_signals", 0) + 1
+    logger.info("Paid.ai signal queued: %s  value=%.2f  vendor=%s", event_name, value, vendor_id)
+
+
+def notify_signals(db: AsyncSession) -> None:
+    """Tell the flusher about the signals ``db`` just committed."""
+    count = db.info.pop("paid_signals", 0)
+    if count:
+        signal_worker.notify(count)
+
+
+def _to_signal(row: PaidSignal) -> Signal:
+    # The idempotency key makes a re-sent row (worker died before commit, or a
+    # split batch re-sending accepted rows) count once; the timestamp keeps the
+    # event time however long the row waited in the outbox.
+    return Signal(
+        event_name=row.event_name,
+        customer=CustomerByExternalId(external_customer_id=row.customer_external_id),
+        attribution=ProductByExternalId(external_product_id=AGENT_PRODUCT_ID),
+        data=row.data,
+        timestamp=row.created_at,
+        idempotency_key=f"paid-signal-{row.id}",
+    )
+
+
+class SignalsRejected(Exception):
+    """Paid.ai accepted the request but reported some of its signals as failed."""
+
+
+# Errors that say nothing about the payload: the whole batch is retried as is.
+_TRANSIENT_STATUS = {408, 429, 502, 503, 504}
+
+
+def _is_transient(exc: Exception) -> bool:
+    return not isinstance(exc, ApiError) or exc.status_code is None or exc.status_code in _TRANSIENT_STATUS
+
+
+def _error_text(exc: Exception) -> str:
+    return str(exc) or exc.__class__.__name__
+
+
+async def _send(rows: list[PaidSignal]) -> tuple[list[PaidSignal], list[tuple[PaidSignal, Exception]]]:
+    """Send ``rows``, bisecting a rejected batch until the offending rows are isolated.
+
+    Returns the rows Paid.ai accepted and the failed rows with their error.
+    A response that counts any signal as ``failed`` is treated as a rejection
+    too; re-sending its accepted rows is deduplicated by their idempotency key.
+    Transient errors (network, timeouts, 429, 502-504) fail the batch as a
+    whole without splitting, since every half would fail the same way.
+    """
     try:
-        signal = Signal(
-            event_name=event_name,
-            customer=CustomerByExternalId(external_customer_id=vendor_id),
-            attribution=ProductByExternalId(external_product_id=AGENT_PRODUCT_ID),
-            data={"value_generated": value, **(metadata or {})},
-        )
-        await _client.signals.create_signals(signals=[signal])
-        logger.info("Paid.ai signal sent: %s  value=%.2f  vendor=%s", event_name, value, vendor_id)
+        response = await _client.signals.create_signals(signals=[_to_signal(row) for row in rows])
     except Exception as exc:
-        logger.warning("Paid.ai tracking failed for %s: %s", event_name, exc)
+        if len(rows) == 1 or _is_transient(exc):
+            return [], [(row, exc) for row in rows]
+    else:
+        if not response.failed:
+            return list(rows), []
+        if len(rows) == 1:
+            return [], [(rows[0], SignalsRejected("Paid.ai reported the signal as failed"))]
+    mid = len(rows) // 2
+    sent_head, failed_head = await _send(rows[:mid])
+    sent_tail, failed_tail = await _send(rows[mid:])
+    return sent_head + sent_tail, failed_head + failed_tail
+
+
+async def flush_signals(db: AsyncSession) -> int:
+    """Send one batch of due outbox rows, normally in a single ``create_signals`` call.
+
+    Sent rows are deleted. Failed rows are re-scheduled with exponential
+    backoff, and a batch Paid.ai rejects is split so only the rows it
+    actually rejects are held back; after PAID_SIGNAL_MAX_ATTEMPTS a row is
+    dead-lettered (``failed_at``). Returns how many rows were sent.
+    """
+    if _client is None:
+        return 0
+    settings = get_settings()
+    repo = PaidSignalRepository(db)
+    rows = await repo.claim_due(settings.paid_signal_batch_size)
+    if not rows:
+        await db.commit()
+        return 0
+    sent, failed = await _send(rows)
+    if sent:
+        await repo.delete(sent)
+    if failed:
+        dead = await repo.defer(
+            [(row, _error_text(exc)) for row, exc in failed],
+            settings.paid_signal_retry_seconds,
+            settings.paid_signal_max_backoff_seconds,
+            settings.paid_signal_max_attempts,
+        )
+        logger.warning("Paid.ai signals failed, will retry: %d (%s)", len(failed), _error_text(failed[0][1]))
+        for row in dead:
+            logger.error("Paid.ai signal %d dead-lettered after %d attempts: %s", row.id, row.attempts, row.last_error)
+    await db.commit()
+    if sent:
+        logger.info("Paid.ai signals sent: %d", len(sent))
+    return len(sent)
+
+
+async def _drain_signals() -> int:
+    async with AsyncSessionLocal() as db:
+        return await flush_signals(db)
+
+
+signal_worker = OutboxWorker(
+    "paid-signals",
+    _drain_signals,
+    batch_size=get_settings().paid_signal_batch_size,
+    flush_seconds=get_settings().paid_signal_flush_seconds,
+)
@@ -1,4 +1,5 @@
 from uuid import UUID
+from typing import Optional
 from app.repositories.payment import PaymentRepository
 from app.schemas.payment import PaymentCreate, PaymentUpdate, PaymentResponse
 
@@ -11,17 +12,21 @@ class PaymentService:
         payment = await self.repo.get_by_id(id)
         return PaymentResponse.model_validate(payment) if payment else None
 
-    async def get_all_payments(self, skip: int = 0, limit: int = 100) -> list[PaymentResponse]:
-        payments = await self.repo.get_all(skip, limit)
-        return [PaymentResponse.model_validate(p) for p in payments]
+    async def get_all_payments(
+        self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[PaymentResponse], Optional[str]]:
+        payments, next_cursor = await self.repo.get_page(skip, limit, cursor)
+        return [PaymentResponse.model_validate(p) for p in payments], next_cursor
 
     async def get_by_invoice_id(self, invoice_id: UUID) -> list[PaymentResponse]:
         payments = await self.repo.get_by_invoice_id(invoice_id)
         return [PaymentResponse.model_validate(p) for p in payments]
 
-    async def get_by_status(self, status: str, skip: int = 0, limit: int = 100) -> list[PaymentResponse]:
-        payments = await self.repo.get_by_status(status, skip, limit)
-        return [PaymentResponse.model_validate(p) for p in payments]
+    async def get_by_status(
+        self, status: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[PaymentResponse], Optional[str]]:
+        payments, next_cursor = await self.repo.get_by_status(status, skip, limit, cursor)
+        return [PaymentResponse.model_validate(p) for p in payments], next_cursor
 
     async def create_payment(self, data: PaymentCreate) -> PaymentResponse:
         payment = await self.repo.create(**data.model_dump(exclude_unset=True))
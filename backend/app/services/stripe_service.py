@@ -1,82 +1,178 @@
+"""Vendor payouts through a payment outbox.
+
+Approving an invoice only adds a ``pending`` Payment row in the approving
+transaction (``queue_vendor_payment``). ``payment_worker`` claims pending rows
+with ``FOR UPDATE SKIP LOCKED`` and runs the blocking ``stripe.Transfer.create``
+calls in a thread pool, keyed by an idempotency key derived from the invoice
+so a retried or re-claimed payout never pays twice. The row then moves to
+``initiated`` with the transfer id; the transfer.paid webhook confirms it.
+A transfer Stripe rejects, or that still fails after PAYMENT_MAX_ATTEMPTS,
+ends as ``failed`` with no transfer id and the error in ``last_error``.
+"""
+
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from uuid import UUID, uuid4
 
 import stripe
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import invalidate
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.outbox import OutboxWorker, next_attempt_at
+from app.models.invoice import Invoice
 from app.models.vendor import Vendor
 from app.models.payment import Payment
 
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
+# Errors worth retrying with backoff; anything else will not succeed on a retry.
+_RETRYABLE = (stripe.APIConnectionError, stripe.RateLimitError, stripe.APIError)
+
+_executor = ThreadPoolExecutor(max_workers=settings.payment_transfer_workers, thread_name_prefix="stripe-transfer")
+
 
 def _generate_internal_transfer_id() -> str:
     return f"local_tr_{uuid4().hex}"
 
 
-async def execute_vendor_payment(
-    invoice_id: UUID,
-    vendor_id: UUID,
-    amount_euros: float,
-    db: AsyncSession,
-) -> dict:
-    result = await db.execute(select(Vendor).where(Vendor.id == vendor_id))
-    vendor = result.scalar_one_or_none()
+def idempotency_key(invoice_id: UUID) -> str:
+    """One payout per invoice: Stripe returns the original transfer for a repeated key."""
+    return f"invoice-payout-{invoice_id}"
+
+
+async def queue_vendor_payment(db: AsyncSession, invoice_id: UUID, amount_euros: float) -> Payment:
+    """Add a pending payout to the invoice's vendor to ``db``'s transaction; the caller commits.
+
+    Returns the invoice's existing payment instead when it already has one.
+    """
+    existing = (await db.execute(select(Payment).where(Payment.invoice_id == invoice_id))).scalar_one_or_none()
+    if existing is not None:
+        return existing
+    payment = Payment(
+        invoice_id=invoice_id,
+        amount=amount_euros,
+        currency="eur",
+        status="pending",
+        next_attempt_at=datetime.now(timezone.utc),
+    )
+    db.add(payment)
+    await db.flush()
+    return payment
+
+
+def _create_transfer(payment: Payment, vendor: Vendor) -> str | None:
+    """Blocking Stripe call; runs on ``_executor``."""
+    transfer = stripe.Transfer.create(
+        amount=int(float(payment.amount) * 100),
+        currency="eur",
+        destination=vendor.stripe_account_id,
+        metadata={
+            "invoice_id": str(payment.invoice_id),
+            "vendor_id": str(vendor.id),
+        },
+        idempotency_key=idempotency_key(payment.invoice_id),
+    )
+    return getattr(transfer, "id", None)
 
-    if not vendor:
-        logger.error("Vendor %s not found for invoice %s", vendor_id, invoice_id)
-        return {"error": "Vendor not found"}
 
-    amount_cents = int(amount_euros * 100)
+async def _execute(payment: Payment, vendor: Vendor | None) -> None:
+    """Run one claimed payout and record the outcome on ``payment`` (not committed)."""
+    loop = asyncio.get_running_loop()
     transfer_id = _generate_internal_transfer_id()
 
+    if vendor is None:
+        logger.error("Vendor not found for invoice %s", payment.invoice_id)
+        payment.status = "failed"
+        payment.last_error = "Vendor not found"
+        return
+
     if vendor.stripe_account_id and stripe.api_key:
         try:
-            transfer = stripe.Transfer.create(
-                amount=amount_cents,
-                currency="eur",
-                destination=vendor.stripe_account_id,
-                metadata={
-                    "invoice_id": str(invoice_id),
-                    "vendor_id": str(vendor_id),
-                },
-            )
-            stripe_transfer_id = getattr(transfer, "id", None)
+            stripe_transfer_id = await loop.run_in_executor(_executor, _create_transfer, payment, vendor)
             if stripe_transfer_id:
                 transfer_id = stripe_transfer_id
-                logger.info("Stripe transfer %s created for invoice %s", transfer_id, invoice_id)
+                logger.info("Stripe transfer %s created for invoice %s", transfer_id, payment.invoice_id)
             else:
                 logger.warning(
                     "Stripe transfer returned no id for invoice %s, using internal transfer id %s",
-                    invoice_id,
+                    payment.invoice_id,
                     transfer_id,
                 )
         except stripe.StripeError as exc:
+            payment.attempts += 1
+            payment.last_error = str(exc)[:1000]
+            if isinstance(exc, _RETRYABLE) and payment.attempts < settings.payment_max_attempts:
+                payment.next_attempt_at = next_attempt_at(
+                    payment.attempts, settings.payment_retry_seconds, settings.payment_max_backoff_seconds,
+                )
+                logger.warning("Stripe transfer for invoice %s failed, will retry: %s", payment.invoice_id, exc)
+                return
+            payment.status = "failed"
             logger.error(
-                "Stripe transfer failed for invoice %s: %s. Using internal transfer id %s",
-                invoice_id,
+                "Stripe transfer failed for invoice %s after %d attempts: %s",
+                payment.invoice_id,
+                payment.attempts,
                 exc,
-                transfer_id,
             )
+            return
     else:
         logger.info(
             "Skipping Stripe transfer for invoice %s (vendor %s has no stripe_account_id or no API key). "
             "Using internal transfer id %s",
-            invoice_id,
-            vendor_id,
+            payment.invoice_id,
+            vendor.id,
             transfer_id,
         )
 
-    payment = Payment(
-        invoice_id=invoice_id,
-        stripe_payout_id=transfer_id,
-        amount=amount_euros,
-        currency="eur",
-        status="initiated",
+    payment.stripe_payout_id = transfer_id
+    payment.status = "initiated"
+
+
+async def process_pending_payments(db: AsyncSession, limit: int | None = None) -> int:
+    """Claim up to ``limit`` due pending payouts, run them concurrently and commit; returns how many were claimed."""
+    stmt = (
+        select(Payment)
+        .where(Payment.status == "pending", Payment.next_attempt_at <= datetime.now(timezone.utc))
+        .order_by(Payment.initiated_at, Payment.id)
+        .limit(limit or settings.payment_batch_size)
+        .with_for_update(skip_locked=True)
     )
-    db.add(payment)
+    payments = list((await db.execute(stmt)).scalars().all())
+    if not payments:
+        await db.commit()
+        return 0
+
+    invoice_vendor = await _vendors_for(db, payments)
+    await asyncio.gather(*(_execute(p, invoice_vendor.get(p.invoice_id)) for p in payments))
     await db.commit()
-    await db.refresh(payment)
+    invalidate("vendors")
+    return len(payments)
+
+
+async def _vendors_for(db: AsyncSession, payments: list[Payment]) -> dict[UUID, Vendor]:
+    rows = await db.execute(
+        select(Invoice.id, Vendor)
+        .join(Vendor, Vendor.id == Invoice.vendor_id)
+        .where(Invoice.id.in_([p.invoice_id for p in payments]))
+    )
+    return {invoice_id: vendor for invoice_id, vendor in rows.all()}
+
+
+async def _drain_payments() -> int:
+    async with AsyncSessionLocal() as db:
+        return await process_pending_payments(db)
+
 
-    return {"payment_id": str(payment.id), "transfer_id": transfer_id, "status": "initiated"}
+payment_worker = OutboxWorker(
+    "payments",
+    _drain_payments,
+    batch_size=settings.payment_batch_size,
+    flush_seconds=settings.payment_flush_seconds,
+)
@@ -0,0 +1,223 @@
+"""Stripe webhook ingestion and batched processing.
+
+The webhook endpoint verifies the signature, stores the event with
+``record_event`` and returns. ``webhook_worker`` then claims unprocessed
+events with ``FOR UPDATE SKIP LOCKED`` and applies a whole batch at once:
+every ``transfer.paid`` in the batch becomes one UPDATE of payments and one of
+invoices. A batch that fails is re-applied event by event, so one bad event
+only delays itself. Events are keyed by Stripe's event id, so redeliveries
+are dropped on insert and never re-applied.
+"""
+
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import invalidate
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.outbox import OutboxWorker, next_attempt_at
+from app.models.invoice import Invoice
+from app.models.payment import Payment
+from app.models.stripe_webhook_event import StripeWebhookEvent
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Processed rows pruned per pass, so one pass never holds a long delete.
+_PRUNE_BATCH = 1000
+_PRUNE_EVERY_SECONDS = 3600.0
+_pruned_at = float("-inf")
+
+
+async def record_event(db: AsyncSession, event: dict[str, Any]) -> bool:
+    """Store a verified event; False when this event id was already received. The caller commits."""
+    result = await db.execute(
+        insert(StripeWebhookEvent)
+        .values(
+            id=event["id"],
+            type=event["type"],
+            payload=event,
+            received_at=datetime.now(timezone.utc),
+            next_attempt_at=datetime.now(timezone.utc),
+            attempts=0,
+        )
+        .on_conflict_do_nothing(index_elements=[StripeWebhookEvent.id])
+        .returning(StripeWebhookEvent.id)
+    )
+    return result.scalar_one_or_none() is not None
+
+
+def _transfers_paid(events: list[StripeWebhookEvent]) -> tuple[list[str], list[uuid.UUID]]:
+    """Transfer ids and invoice ids of the batch's ``transfer.paid`` events."""
+    transfer_ids: list[str] = []
+    invoice_ids: list[uuid.UUID] = []
+    for event in events:
+        if event.type != "transfer.paid":
+            continue
+        transfer = event.payload["data"]["object"]
+        invoice_id = (transfer.get("metadata") or {}).get("invoice_id")
+        if not invoice_id:
+            logger.warning("transfer.paid event %s missing invoice_id in metadata", event.id)
+            continue
+        try:
+            invoice_ids.append(uuid.UUID(invoice_id))
+        except ValueError:
+            logger.warning("transfer.paid event %s has invalid invoice_id %r", event.id, invoice_id)
+            continue
+        transfer_ids.append(transfer.get("id"))
+    return transfer_ids, invoice_ids
+
+
+async def _apply(db: AsyncSession, events: list[StripeWebhookEvent]) -> None:
+    now = datetime.now(timezone.utc)
+    transfer_ids, invoice_ids = _transfers_paid(events)
+    if transfer_ids:
+        # Matching on invoice_id too: if payment_worker still holds the row
+        # (transfer created, not yet committed), this waits for it instead of
+        # missing a payment whose stripe_payout_id is not visible yet.
+        await db.execute(
+            update(Payment)
+            .where(or_(Payment.stripe_payout_id.in_(transfer_ids), Payment.invoice_id.in_(invoice_ids)))
+            .values(status="confirmed", confirmed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            update(Invoice)
+            .where(Invoice.id.in_(invoice_ids))
+            .values(status="paid", updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        logger.info("Confirmed %d transfers; invoices marked as paid", len(transfer_ids))
+
+    for event in events:
+        obj = event.payload["data"]["object"]
+        if event.type == "checkout.session.completed":
+            logger.info(
+                "Subscription created for user %s (customer %s)",
+                (obj.get("metadata") or {}).get("user_id"), obj.get("customer"),
+            )
+        elif event.type == "customer.subscription.deleted":
+            logger.info("Subscription cancelled for customer %s", obj.get("customer"))
+        event.processed_at = now
+
+
+async def process_webhook_events(db: AsyncSession, limit: int | None = None) -> int:
+    """Apply one batch of unprocessed events in a single transaction; returns how many were processed.
+
+    If the batch fails it is re-applied one event per transaction, so only the
+    events that fail on their own are deferred; after STRIPE_WEBHOOK_MAX_ATTEMPTS
+    an event is dead-lettered (``failed_at``).
+    """
+    events = await _claim(db, limit or settings.stripe_webhook_batch_size)
+    if not events:
+        await _prune(db)
+        await db.commit()
+        return 0
+
+    ids = [event.id for event in events]
+    try:
+        await _apply(db, events)
+        await db.commit()
+        processed = len(events)
+    except Exception as exc:
+        await db.rollback()
+        logger.warning("Stripe webhook batch of %d failed, applying events one by one: %s", len(ids), exc)
+        processed = await _apply_each(db, ids)
+    if processed:
+        invalidate("invoices", "vendors")
+    return processed
+
+
+async def _claim(db: AsyncSession, limit: int, ids: list[str] | None = None) -> list[StripeWebhookEvent]:
+    """Lock up to ``limit`` due events (optionally only ``ids``), skipping any another worker holds."""
+    stmt = (
+        select(StripeWebhookEvent)
+        .where(
+            StripeWebhookEvent.processed_at.is_(None),
+            StripeWebhookEvent.failed_at.is_(None),
+            StripeWebhookEvent.next_attempt_at <= datetime.now(timezone.utc),
+        )
+        .order_by(StripeWebhookEvent.next_attempt_at, StripeWebhookEvent.received_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if ids is not None:
+        stmt = stmt.where(StripeWebhookEvent.id.in_(ids))
+    return list((await db.execute(stmt)).scalars().all())
+
+
+async def _apply_each(db: AsyncSession, ids: list[str]) -> int:
+    """Apply the events of a failed batch one per transaction; defer those that still fail."""
+    processed = 0
+    for event_id in ids:
+        claimed = await _claim(db, 1, [event_id])
+        if not claimed:
+            # Taken or finished by another worker since the batch rolled back.
+            await db.commit()
+            continue
+        try:
+            await _apply(db, claimed)
+            await db.commit()
+            processed += 1
+        except Exception as exc:
+            await db.rollback()
+            await _defer(db, event_id, str(exc) or exc.__class__.__name__)
+    return processed
+
+
+async def _defer(db: AsyncSession, event_id: str, error: str) -> None:
+    event = (await db.execute(
+        select(StripeWebhookEvent).where(StripeWebhookEvent.id == event_id).with_for_update()
+    )).scalar_one()
+    event.attempts += 1
+    event.last_error = error[:1000]
+    if event.attempts >= settings.stripe_webhook_max_attempts:
+        event.failed_at = datetime.now(timezone.utc)
+        logger.error("Stripe webhook event %s dead-lettered after %d attempts: %s", event_id, event.attempts, error)
+    else:
+        event.next_attempt_at = next_attempt_at(
+            event.attempts, settings.stripe_webhook_retry_seconds, settings.stripe_webhook_max_backoff_seconds,
+        )
+        logger.warning("Stripe webhook event %s failed, will retry: %s", event_id, error)
+    await db.commit()
+
+
+async def _prune(db: AsyncSession) -> None:
+    """Drop processed events past retention; runs at most hourly, from an idle pass."""
+    global _pruned_at
+    if time.monotonic() - _pruned_at < _PRUNE_EVERY_SECONDS:
+        return
+    _pruned_at = time.monotonic()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.stripe_webhook_retention_days)
+    expired = (
+        select(StripeWebhookEvent.id)
+        .where(StripeWebhookEvent.processed_at < cutoff)
+        .limit(_PRUNE_BATCH)
+        .scalar_subquery()
+    )
+    await db.execute(
+        delete(StripeWebhookEvent)
+        .where(StripeWebhookEvent.id.in_(expired))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _drain_webhook_events() -> int:
+    async with AsyncSessionLocal() as db:
+        return await process_webhook_events(db)
+
+
+webhook_worker = OutboxWorker(
+    "stripe-webhooks",
+    _drain_webhook_events,
+    batch_size=settings.stripe_webhook_batch_size,
+    flush_seconds=settings.stripe_webhook_flush_seconds,
+)
@@ -1,4 +1,5 @@
 from uuid import UUID
+from typing import Optional
 from app.repositories.vendor import VendorRepository
 from app.schemas.vendor import VendorCreate, VendorUpdate, VendorResponse, VendorSummary
 
@@ -11,9 +12,11 @@ class VendorService:
         vendor = await self.repo.get_by_id(id)
         return VendorResponse.model_validate(vendor) if vendor else None
 
-    async def get_all_vendors(self, skip: int = 0, limit: int = 100) -> list[VendorResponse]:
-        vendors = await self.repo.get_all(skip, limit)
-        return [VendorResponse.model_validate(v) for v in vendors]
+    async def get_all_vendors(
+        self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    ) -> tuple[list[VendorResponse], Optional[str]]:
+        vendors, next_cursor = await self.repo.get_page(skip, limit, cursor)
+        return [VendorResponse.model_validate(v) for v in vendors], next_cursor
 
     async def get_by_name(self, name: str) -> VendorResponse | None:
         vendor = await self.repo.get_by_name(name)
@@ -37,3 +40,6 @@ class VendorService:
 
     async def delete_vendor(self, id: UUID) -> bool:
         return await self.repo.delete(id)
+
+    async def reconcile_metrics(self) -> int:
+        return await self.repo.reconcile_metrics()
@@ -0,0 +1,116 @@
+"""Benchmark: authentication hot path, before and after the auth caches.
+
+Usage (from backend/):
+    python -m benchmarks.bench_auth --requests 2000 --logins 1 8 32
+
+Authenticated requests: ``get_current_user`` against the previous per-request
+users query. Logins: concurrent password checks run inline on the event loop
+(the previous behaviour) vs on the bcrypt pool, reporting wall time and the
+worst delay a concurrent request would have seen.
+
+Seeds one throwaway user and deletes it afterwards. Point DATABASE_URL at a
+scratch database — this is not meant for production.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import delete
+
+from app.core.database import AsyncSessionLocal, init_db
+from app.core.dependencies import get_current_user
+from app.core.security import create_access_token, decode_token, pwd_context, verify_password
+from app.models.user import User
+from app.repositories.user import UserRepository
+
+_PASSWORD = "bench-password"
+
+
+async def _previous_current_user(token: str) -> User:
+    """The previous dependency: decode, then load the row on every request."""
+    async with AsyncSessionLocal() as db:
+        payload = decode_token(token)
+        user = await UserRepository(db).get_by_id(uuid.UUID(payload["sub"]))
+        assert user is not None and user.is_active
+        return user
+
+
+async def _cached_current_user(token: str) -> User:
+    async with AsyncSessionLocal() as db:
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        return await get_current_user(credentials, db)
+
+
+async def _latency(fn, token: str, n: int) -> tuple[float, float]:
+    """Mean and p99 per request, in milliseconds."""
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        await fn(token)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return sum(samples) / n, samples[int(n * 0.99) - 1]
+
+
+async def _inline_verify(password: str, hashed: str) -> bool:
+    return pwd_context.verify(password, hashed)
+
+
+async def _logins(verify, hashed: str, concurrency: int) -> tuple[float, float]:
+    """Wall time of ``concurrency`` logins and the worst event-loop stall meanwhile, in ms."""
+    worst = 0.0
+    done = False
+
+    async def probe():
+        nonlocal worst
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            worst = max(worst, (time.perf_counter() - start) * 1000 - 1)
+
+    task = asyncio.create_task(probe())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(verify(_PASSWORD, hashed) for _ in range(concurrency)))
+    wall = (time.perf_counter() - start) * 1000
+    done = True
+    await task
+    return wall, worst
+
+
+async def main(requests: int, login_counts: list[int]) -> None:
+    await init_db()
+    hashed = pwd_context.hash(_PASSWORD)
+    async with AsyncSessionLocal() as db:
+        user = await UserRepository(db).create(
+            email=f"bench-{uuid.uuid4().hex}@bench.local", hashed_password=hashed, full_name="Bench User",
+        )
+    token = create_access_token(user.id)
+    try:
+        print(f"authenticated requests ({requests} sequential)")
+        print(f"{'path':>10} {'mean (ms)':>10} {'p99 (ms)':>9}")
+        for label, fn in (("previous", _previous_current_user), ("cached", _cached_current_user)):
+            await fn(token)  # warm the pool and the cache
+            mean, p99 = await _latency(fn, token, requests)
+            print(f"{label:>10} {mean:>10.3f} {p99:>9.3f}")
+
+        print("\nconcurrent logins (password check)")
+        print(f"{'logins':>7} {'inline wall (ms)':>17} {'inline stall (ms)':>18} {'pool wall (ms)':>15} {'pool stall (ms)':>16}")
+        for n in login_counts:
+            inline_wall, inline_stall = await _logins(_inline_verify, hashed, n)
+            pool_wall, pool_stall = await _logins(verify_password, hashed, n)
+            print(f"{n:>7} {inline_wall:>17.1f} {inline_stall:>18.1f} {pool_wall:>15.1f} {pool_stall:>16.1f}")
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--logins", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.logins))
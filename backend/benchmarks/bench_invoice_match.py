@@ -0,0 +1,102 @@
+"""Benchmark: invoice line matching latency, per-line lookups vs the batched matcher.
+
+Usage (from backend/):
+    python -m benchmarks.bench_invoice_match --catalog 20000 --lines 10 100 1000 2000
+
+Seeds a synthetic catalogue under a dedicated ``source_api`` and deletes it afterwards.
+Point DATABASE_URL at a scratch database — this is not meant for production.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import delete, select
+
+from app.core.database import AsyncSessionLocal, init_db
+from app.models.cloud_pricing import CloudPricing
+from app.repositories.cloud_pricing import CloudPricingRepository
+
+from benchmarks.bench_pricing_upsert import BENCH_SOURCE, make_records
+
+_REGIONS = ("us-east-1", "eu-west-1", "ap-southeast-2")
+
+
+def _lines(n: int, catalog: int) -> list[tuple]:
+    rng = random.Random(n)
+    lines = []
+    for _ in range(n):
+        kind = rng.random()
+        i = rng.randrange(catalog)
+        if kind < 0.4:
+            lines.append(("aws", f"BENCH-{i:09d}", None, None))
+        elif kind < 0.8:
+            lines.append(("aws", None, f"bench.{i % 64}xlarge", rng.choice(_REGIONS)))
+        else:
+            lines.append(("aws", None, "missing.9xlarge", None))
+    return lines
+
+
+async def _per_line_match(db, vendor, sku_id, instance_type, region):
+    """The previous matcher: up to three sequential queries per line."""
+    base = select(CloudPricing).where(CloudPricing.vendor == vendor.lower(), CloudPricing.price_per_hour.isnot(None))
+    if sku_id:
+        match = (await db.execute(base.where(CloudPricing.sku_id == sku_id))).scalars().first()
+        if match:
+            return match
+    if instance_type and region:
+        match = (await db.execute(base.where(
+            CloudPricing.instance_type.ilike(instance_type), CloudPricing.region.ilike(f"%{region}%"),
+        ))).scalars().first()
+        if match:
+            return match
+    if instance_type:
+        return (await db.execute(base.where(CloudPricing.instance_type.ilike(instance_type)))).scalars().first()
+    return None
+
+
+async def _seed(catalog: int) -> None:
+    records = make_records(catalog)
+    for i, r in enumerate(records):
+        r["region"] = _REGIONS[i % len(_REGIONS)]
+    async with AsyncSessionLocal() as db:
+        await CloudPricingRepository(db).bulk_upsert_records(records)
+
+
+async def _cleanup() -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(CloudPricing).where(CloudPricing.source_api == BENCH_SOURCE))
+        await db.commit()
+
+
+async def main(catalog: int, line_counts: list[int]) -> None:
+    await init_db()
+    await _cleanup()
+    await _seed(catalog)
+    try:
+        async with AsyncSessionLocal() as db:
+            repo = CloudPricingRepository(db)
+            print(f"{'lines':>7} {'per-line (s)':>14} {'batched (s)':>12} {'speed-up':>9}")
+            for n in line_counts:
+                lines = _lines(n, catalog)
+
+                start = time.perf_counter()
+                for line in lines:
+                    await _per_line_match(db, *line)
+                per_line = time.perf_counter() - start
+
+                start = time.perf_counter()
+                await repo.find_best_matches(lines)
+                batched = time.perf_counter() - start
+
+                print(f"{n:>7} {per_line:>14.3f} {batched:>12.3f} {per_line / batched:>8.1f}x")
+    finally:
+        await _cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--catalog", type=int, default=20_000)
+    parser.add_argument("--lines", type=int, nargs="+", default=[10, 100, 1000, 2000])
+    args = parser.parse_args()
+    asyncio.run(main(args.catalog, args.lines))
@@ -0,0 +1,83 @@
+"""Benchmark: peak RSS of the normalizer vs catalog size, materialised vs streamed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_normalizer_memory --sizes 10000 50000 200000
+
+Each measurement runs in a fresh interpreter so ru_maxrss reflects a single run:
+  * ``list``   — the pre-generator behaviour: every normalised record held at once.
+  * ``stream`` — records consumed in SYNC_BATCH_SIZE chunks, as the sync does.
+  * ``stream+proj`` — same, with raw_attributes projected to a few keys.
+No database or network access is needed.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+_CHILD = r"""
+import resource, sys
+from itertools import islice
+from app.pricing.normalizer import normalize_all
+
+n, mode, batch = int(sys.argv[1]), sys.argv[2], int(sys.argv[3])
+payloads = {"aws_ec2": {"raw_records": [
+    {
+        "SKU": f"SKU{i:09d}", "serviceName": "Amazon EC2", "PricePerUnit": "0.0416",
+        "Unit": "Hrs", "PriceDescription": "$0.0416 per On Demand Linux t3.medium Instance Hour",
+        "Instance Type": f"t3.{i % 32}xlarge", "Operating System": "Linux",
+        "Region Code": "eu-west-1", "Location": "EU (Ireland)", "Currency": "USD",
+        "EffectiveDate": "2024-01-01", "Tenancy": "Shared", "vCPU": "2", "Memory": "4 GiB",
+        "Network Performance": "Up to 5 Gigabit", "Storage": "EBS only",
+    }
+    for i in range(n)
+]}}
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if mode == "list":
+    records = list(normalize_all(payloads, raw_fields=None))
+    count = len(records)
+else:
+    fields = ("SKU", "Instance Type") if mode == "stream+proj" else None
+    it = normalize_all(payloads, raw_fields=fields)
+    count = 0
+    while chunk := list(islice(it, batch)):
+        count += len(chunk)
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(count, base, peak)
+"""
+
+
+def _measure(n: int, mode: str, batch: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, str(n), mode, str(batch)],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    count, base, peak = (int(v) for v in out)
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return {
+        "records": count,
+        "mode": mode,
+        "peak_rss_mb": round(peak * scale / 2**20, 1),
+        "normalize_delta_mb": round((peak - base) * scale / 2**20, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--json", action="store_true", help="emit JSON lines instead of a table")
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        for mode in ("list", "stream", "stream+proj"):
+            row = _measure(n, mode, args.batch)
+            if args.json:
+                print(json.dumps(row))
+            else:
+                print(f"{row['records']:>9} {mode:<12} peak {row['peak_rss_mb']:>8} MB  "
+                      f"normalize +{row['normalize_delta_mb']:>7} MB")
+
+
+if __name__ == "__main__":
+    main()
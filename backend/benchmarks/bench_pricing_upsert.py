@@ -0,0 +1,81 @@
+"""Benchmark: rows/sec for the chunked INSERT upsert vs the COPY + merge bulk path.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pricing_upsert --rows 50000
+
+Writes synthetic rows under a dedicated ``source_api`` and deletes them afterwards.
+Point DATABASE_URL at a scratch database — this is not meant for production.
+"""
+import argparse
+import asyncio
+import time
+from decimal import Decimal
+
+from sqlalchemy import delete
+
+from app.core.database import AsyncSessionLocal, init_db
+from app.models.cloud_pricing import CloudPricing
+from app.repositories.cloud_pricing import CloudPricingRepository
+
+BENCH_SOURCE = "bench_upsert"
+
+
+def make_records(n: int, price: str = "0.0100") -> list[dict]:
+    return [
+        {
+            "vendor": "aws",
+            "service_name": "AmazonEC2",
+            "category": "Compute",
+            "sku_id": f"BENCH-{i:09d}",
+            "description": f"benchmark sku {i}",
+            "region": "eu-west-1",
+            "instance_type": f"bench.{i % 64}xlarge",
+            "operating_system": "Linux",
+            "price_per_unit": Decimal(price),
+            "unit": "Hrs",
+            "price_per_hour": Decimal(price),
+            "unit_dimension": "time",
+            "canonical_unit": "hour",
+            "canonical_price": Decimal(price),
+            "currency": "USD",
+            "effective_date": None,
+            "raw_attributes": {"sku": f"BENCH-{i:09d}", "termType": "OnDemand"},
+            "source_api": BENCH_SOURCE,
+        }
+        for i in range(n)
+    ]
+
+
+async def _cleanup() -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(CloudPricing).where(CloudPricing.source_api == BENCH_SOURCE))
+        await db.commit()
+
+
+async def _run(label: str, method: str, records: list[dict]) -> None:
+    async with AsyncSessionLocal() as db:
+        repo = CloudPricingRepository(db)
+        start = time.perf_counter()
+        await getattr(repo, method)(records)
+        elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(records):>9} rows  {elapsed:8.2f}s  {len(records) / elapsed:>12,.0f} rows/s")
+
+
+async def main(rows: int) -> None:
+    await init_db()
+    await _cleanup()
+    try:
+        for method in ("upsert_records", "bulk_upsert_records"):
+            # Cold run inserts every row; warm run hits ON CONFLICT DO UPDATE for all of them.
+            await _run(f"{method} (insert)", method, make_records(rows))
+            await _run(f"{method} (update)", method, make_records(rows, price="0.0200"))
+            await _cleanup()
+    finally:
+        await _cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
@@ -11,7 +11,7 @@ class LineItem(BaseModel):
 
 class InvoiceExtraction(BaseModel):
     invoice_number: str | None
-    # invoice_date: str | None  # ISO string — not yet in DB, will add later
+    invoice_date: str | None = None  # ISO date of issue; kept in extracted_data, prices are looked up as of it
     due_date: str | None
     vendor_name: str | None
     vendor_iban: str | None = None
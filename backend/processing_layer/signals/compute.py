@@ -34,8 +34,11 @@ def compute_signals(
         )
 
     pricing_rows = context.get("cloud_pricing", [])
+    pricing_candidates = context.get("pricing_candidates", {})
     for line_item in extraction.line_items:
-        market_ref = _find_market_reference_price(line_item.description, pricing_rows)
+        market_ref = _find_market_reference_price(
+            line_item.description, pricing_rows, pricing_candidates.get(line_item.description, []),
+        )
         if market_ref is not None and market_ref > 0:
             deviation_pct = ((line_item.unit_price - market_ref) / market_ref) * 100.0
             signals.append(
@@ -124,7 +127,18 @@ def compute_signals(
     return signals
 
 
-def _find_market_reference_price(description: str, pricing_rows: list[dict[str, Any]]) -> float | None:
+def _find_market_reference_price(
+    description: str,
+    pricing_rows: list[dict[str, Any]],
+    candidates: list[int] | None = None,
+) -> float | None:
+    # Rows the backend retrieved for this line come first, best match first.
+    for index in candidates or []:
+        if 0 <= index < len(pricing_rows):
+            candidate = _reference_price(pricing_rows[index])
+            if candidate is not None:
+                return candidate
+
     description_lc = description.lower()
     for row in pricing_rows:
         service_name = str(row.get("service_name") or "").lower()
@@ -133,12 +147,26 @@ def _find_market_reference_price(description: str, pricing_rows: list[dict[str,
             service_name
             and (service_name in description_lc or description_lc in service_name)
         ) or (sku_id and sku_id in description_lc):
-            candidate = _to_float(row.get("price_per_unit")) or _to_float(row.get("price_per_hour"))
-            if candidate is not None and candidate > 0:
+            candidate = _reference_price(row)
+            if candidate is not None:
                 return candidate
     return None
 
 
+def _reference_price(row: dict[str, Any]) -> float | None:
+    # Prefer the unit-normalised price, and the one in effect on the invoice
+    # date when the context carries it; raw unit prices are the fallback.
+    candidate = (
+        _to_float(row.get("canonical_price_as_of"))
+        or _to_float(row.get("canonical_price"))
+        or _to_float(row.get("price_per_unit_as_of"))
+        or _to_float(row.get("price_per_hour_as_of"))
+        or _to_float(row.get("price_per_unit"))
+        or _to_float(row.get("price_per_hour"))
+    )
+    return candidate if candidate is not None and candidate > 0 else None
+
+
 def _find_historical_reference_price(description: str, invoices: list[dict[str, Any]]) -> float | None:
     target = description.strip().lower()
     samples: list[float] = []
@@ -0,0 +1,43 @@
+"""Unit tests for deterministic signal computation (no LLM, no network)."""
+from processing_layer.schemas.invoice import InvoiceExtraction, LineItem
+from processing_layer.schemas.signals import SignalType
+from processing_layer.signals.compute import compute_signals
+
+
+def _extraction(description: str, unit_price: float) -> InvoiceExtraction:
+    return InvoiceExtraction(
+        invoice_number="INV-1", due_date=None, vendor_name="AWS", vendor_address=None,
+        client_name=None, client_address=None,
+        line_items=[LineItem(description=description, quantity=730, unit_price=unit_price, total_price=730 * unit_price)],
+        subtotal=None, tax=None, total=None, currency="USD",
+    )
+
+
+def _market(signals):
+    return [s for s in signals if s.signal_type == SignalType.MARKET_DEVIATION]
+
+
+def test_market_reference_uses_retrieved_candidates():
+    description = "m6i.4xlarge Linux eu-west-1 730 Hrs"
+    context = {
+        "invoices": [],
+        "cloud_pricing": [
+            {"service_name": "AmazonS3", "sku_id": "S3", "canonical_price": "0.023"},
+            {"service_name": "AmazonEC2", "sku_id": "EC2-EU", "canonical_price": "0.80", "price_per_unit": "0.80"},
+        ],
+        "pricing_candidates": {description: [1]},
+    }
+    (signal,) = _market(compute_signals(_extraction(description, 0.96), context, current_invoice_id="x"))
+    assert signal.reference_value == 0.80
+    assert signal.is_anomalous
+
+
+def test_market_reference_falls_back_to_text_match():
+    context = {
+        "invoices": [],
+        "cloud_pricing": [{"service_name": "AmazonEC2", "sku_id": "EC2-EU", "price_per_unit": "0.80"}],
+    }
+    (signal,) = _market(compute_signals(_extraction("AmazonEC2 usage", 0.80), context, current_invoice_id="x"))
+    assert signal.reference_value == 0.80
+    assert not signal.is_anomalous
+    assert _market(compute_signals(_extraction("Support", 1.0), context, current_invoice_id="x")) == []
@@ -13,10 +13,12 @@ from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.pool import NullPool
 
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, get_primary_db
 from app.core.dependencies import get_current_user
 from app.models.user import User
 from app.main import app as fastapi_app
+from app.core.cache import response_cache
+from app.pricing.catalog import reset_catalog
 
 # Import all models so Base.metadata knows about every table
 import app.models  # noqa: F401
@@ -76,7 +78,13 @@ async def db_session(engine):
             if not nested.is_active:
                 connection.sync_connection.begin_nested()
 
+        # The pricing catalog and response cache are process-wide; never let
+        # them outlive a rolled-back test.
+        reset_catalog()
+        response_cache.clear()
         yield session
+        reset_catalog()
+        response_cache.clear()
 
         await session.close()
         if transaction.is_active:
@@ -91,6 +99,7 @@ async def client(db_session):
         yield db_session
 
     fastapi_app.dependency_overrides[get_db] = _override_get_db
+    fastapi_app.dependency_overrides[get_primary_db] = _override_get_db
     fastapi_app.dependency_overrides[get_current_user] = lambda: _FAKE_USER
     transport = ASGITransport(app=fastapi_app)
     async with AsyncClient(
@@ -1,7 +1,5 @@
 """Endpoint tests for POST /api/v1/invoices/{id}/approve."""
 
-from unittest.mock import patch, AsyncMock
-
 INVOICES = "/api/v1/invoices"
 VENDORS = "/api/v1/vendors"
 
@@ -32,8 +30,7 @@ class TestApproveInvoice:
         })
         return resp.json()["id"]
 
-    @patch("app.api.routers.approve.execute_vendor_payment", new_callable=AsyncMock)
-    async def test_approve_pending_invoice(self, mock_payment, client):
+    async def test_approve_pending_invoice(self, client):
         invoice_id = await self._create_invoice(client)
 
         resp = await client.post(f"{INVOICES}/{invoice_id}/approve")
@@ -43,17 +40,14 @@ class TestApproveInvoice:
         assert data["approved"] is True
         assert data["invoice_id"] == invoice_id
 
-    @patch("app.api.routers.approve.execute_vendor_payment", new_callable=AsyncMock)
-    async def test_approve_with_payment(self, mock_payment, client):
-        mock_payment.return_value = {"payment_id": "pay_123", "transfer_id": "tr_123", "status": "initiated"}
-
+    async def test_approve_with_payment(self, client):
         vendor_id = await self._create_vendor(client)
         invoice_id = await self._create_invoice(client, vendor_id=vendor_id)
         # PATCH total onto the invoice (InvoiceUpdate supports it but InvoiceCreate doesn't)
         # The approve router reads invoice.total from the DB object directly,
         # so we need to ensure it's set. Use the DB model via the update endpoint.
         # Actually InvoiceUpdate doesn't have 'total' either, so we set it via db_session.
-        # For this test, we just verify the mock is called when vendor_id + total exist.
+        # For this test, we just verify a payout is only queued when vendor_id + total exist.
         # We'll verify the approve response instead.
 
         resp = await client.post(f"{INVOICES}/{invoice_id}/approve")
@@ -62,13 +56,14 @@ class TestApproveInvoice:
         data = resp.json()
         assert data["approved"] is True
         # Payment is None because the invoice has no total (can't set via API)
-        # The mock won't be called without a total
+        # No payout is queued without a total
         # This verifies the conditional payment logic works
 
-    @patch("app.api.routers.approve.execute_vendor_payment", new_callable=AsyncMock)
-    async def test_approve_triggers_payment(self, mock_payment, client, db_session):
-        """Use db_session directly to set total, verifying payment is triggered."""
+    async def test_approve_triggers_payment(self, client, db_session):
+        """Use db_session directly to set total, verifying a payout is queued."""
+        from sqlalchemy import select
         from app.models.invoice import Invoice
+        from app.models.payment import Payment
         from app.models.vendor import Vendor
 
         vendor = Vendor(name="Pay Vendor", category="computing")
@@ -79,25 +74,24 @@ class TestApproveInvoice:
         db_session.add(invoice)
         await db_session.flush()
 
-        mock_payment.return_value = {"payment_id": "pay_123", "transfer_id": "tr_123", "status": "initiated"}
-
         resp = await client.post(f"{INVOICES}/{str(invoice.id)}/approve")
         assert resp.status_code == 200
         data = resp.json()
         assert data["approved"] is True
-        assert data["payment"]["transfer_id"] == "tr_123"
-        mock_payment.assert_called_once()
+        # Queued in the approving transaction; payment_worker performs the transfer.
+        assert data["payment"]["status"] == "pending"
+        payment = (await db_session.execute(select(Payment).where(Payment.invoice_id == invoice.id))).scalar_one()
+        assert str(payment.id) == data["payment"]["payment_id"]
+        assert payment.stripe_payout_id is None
 
-    @patch("app.api.routers.approve.execute_vendor_payment", new_callable=AsyncMock)
-    async def test_approve_already_approved(self, mock_payment, client):
+    async def test_approve_already_approved(self, client):
         invoice_id = await self._create_invoice(client, status="approved")
 
         resp = await client.post(f"{INVOICES}/{invoice_id}/approve")
         assert resp.status_code == 400
         assert "already approved" in resp.json()["detail"]
 
-    @patch("app.api.routers.approve.execute_vendor_payment", new_callable=AsyncMock)
-    async def test_approve_already_paid(self, mock_payment, client):
+    async def test_approve_already_paid(self, client):
         invoice_id = await self._create_invoice(client, status="paid")
 
         resp = await client.post(f"{INVOICES}/{invoice_id}/approve")
@@ -108,11 +102,9 @@ class TestApproveInvoice:
         resp = await client.post(f"{INVOICES}/00000000-0000-0000-0000-000000000000/approve")
         assert resp.status_code == 404
 
-    @patch("app.api.routers.approve.execute_vendor_payment", new_callable=AsyncMock)
-    async def test_approve_no_vendor(self, mock_payment, client):
+    async def test_approve_no_vendor(self, client):
         invoice_id = await self._create_invoice(client)
 
         resp = await client.post(f"{INVOICES}/{invoice_id}/approve")
         assert resp.status_code == 200
         assert resp.json()["payment"] is None
-        mock_payment.assert_not_called()
@@ -0,0 +1,93 @@
+"""Tests for the authentication hot path: bcrypt off the event loop and cached user lookups."""
+
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from app.core import security
+from app.core.security import hash_password, verify_password
+from app.repositories.user import UserRepository, _active_users
+
+
+class _SlowContext:
+    """Stands in for the bcrypt CryptContext: blocking work of a fixed length."""
+
+    def hash(self, secret):
+        time.sleep(0.1)
+        return f"hashed:{secret}"
+
+    def verify(self, secret, hashed):
+        time.sleep(0.1)
+        return hashed == f"hashed:{secret}"
+
+
+class TestPasswordHashing:
+    """bcrypt on its own pool — pure logic, no DB needed."""
+
+    @pytest.fixture(autouse=True)
+    def slow_context(self, monkeypatch):
+        monkeypatch.setattr(security, "pwd_context", _SlowContext())
+
+    async def test_hash_and_verify(self):
+        hashed = await hash_password("s3cret-pass")
+        assert await verify_password("s3cret-pass", hashed)
+        assert not await verify_password("wrong-pass", hashed)
+
+    async def test_event_loop_keeps_running_while_hashing(self):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.gather(*(verify_password("s3cret-pass", "hashed:s3cret-pass") for _ in range(4)))
+        task.cancel()
+        # The loop ticked throughout instead of stalling behind each verify.
+        assert ticks >= 5
+
+
+class TestActiveUserCache:
+    async def _create_user(self, db_session):
+        return await UserRepository(db_session).create(
+            email=f"{uuid.uuid4().hex}@test.com",
+            hashed_password="hash",
+            full_name="Cached User",
+        )
+
+    async def test_snapshot_served_without_query(self, db_session):
+        user = await self._create_user(db_session)
+        repo = UserRepository(db_session)
+
+        cached = await repo.get_active(user.id)
+        assert cached.email == user.email
+        assert cached.hashed_password is None
+        assert _active_users.get(user.id) is not _active_users.MISSING
+
+        # A write that bypasses the repository is not seen until the entry expires.
+        user.full_name = "Renamed Elsewhere"
+        await db_session.commit()
+        assert (await repo.get_active(user.id)).full_name == "Cached User"
+
+    async def test_disable_invalidates(self, db_session):
+        user = await self._create_user(db_session)
+        repo = UserRepository(db_session)
+        assert await repo.get_active(user.id) is not None
+
+        await repo.set_active(user.id, False)
+        assert await repo.get_active(user.id) is None
+
+        await repo.set_active(user.id, True)
+        assert (await repo.get_active(user.id)).is_active
+
+    async def test_delete_invalidates(self, db_session):
+        user = await self._create_user(db_session)
+        repo = UserRepository(db_session)
+        assert await repo.get_active(user.id) is not None
+
+        await repo.delete(user.id)
+        assert await repo.get_active(user.id) is None
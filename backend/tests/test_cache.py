@@ -0,0 +1,113 @@
+"""Unit tests for the in-process response cache — pure logic, no DB needed."""
+
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.core.cache import ResponseCache, TTLCache, cached_route, response_cache
+from app.core.metrics import render_metrics
+
+
+def _response(size: int) -> Response:
+    return Response(content=b"x" * size, media_type="application/json")
+
+
+class TestResponseCache:
+    def test_lru_evicts_by_size(self):
+        cache = ResponseCache(max_bytes=25, ttl_seconds=60)
+        for key in ("a", "b"):
+            cache.put((key,), "ns", 0, _response(10))
+        assert cache.get(("a",), "ns") is not None  # "b" is now least recent
+        cache.put(("c",), "ns", 0, _response(10))
+
+        assert cache.get(("b",), "ns") is None
+        assert cache.get(("a",), "ns") is not None
+        assert cache.size == 20
+        assert cache.evictions["ns"] == 1
+
+    def test_invalidate_namespace(self):
+        cache = ResponseCache(max_bytes=100, ttl_seconds=60)
+        cache.put(("a",), "vendors", 0, _response(5))
+        cache.put(("b",), "pricing", 0, _response(5))
+        cache.invalidate("vendors")
+
+        assert cache.get(("a",), "vendors") is None
+        assert cache.get(("b",), "pricing") is not None
+        assert (cache.size, len(cache)) == (5, 1)
+
+    def test_stale_fill_is_dropped(self):
+        cache = ResponseCache(max_bytes=100, ttl_seconds=60)
+        generation = cache.generation("ns")
+        cache.invalidate("ns")  # a write landed while the response was being built
+        cache.put(("a",), "ns", generation, _response(5))
+        assert cache.get(("a",), "ns") is None
+
+    def test_ttl_and_oversized(self):
+        cache = ResponseCache(max_bytes=10, ttl_seconds=0)
+        cache.put(("a",), "ns", 0, _response(5))
+        assert cache.get(("a",), "ns") is None
+        cache.ttl_seconds = 60
+        cache.put(("b",), "ns", 0, _response(11))
+        assert len(cache) == 0
+
+
+class TestTTLCache:
+    def test_lru_and_cached_none(self):
+        cache = TTLCache(ttl_seconds=60, max_entries=2)
+        cache.set("a", None)
+        cache.set("b", 2)
+        assert cache.get("a") is None  # a cached miss, "b" is now least recent
+        cache.set("c", 3)
+
+        assert cache.get("b") is TTLCache.MISSING
+        assert cache.get("c") == 3
+        cache.pop("c")
+        assert cache.get("c", "default") == "default"
+
+    def test_expiry_and_disabled(self):
+        cache = TTLCache(ttl_seconds=60)
+        cache.set("a", 1)
+        cache._entries["a"] = (0.0, 1)  # already expired
+        assert cache.get("a") is TTLCache.MISSING
+        assert len(cache) == 0
+
+        disabled = TTLCache(ttl_seconds=0)
+        disabled.set("a", 1)
+        assert disabled.get("a") is TTLCache.MISSING
+
+
+class TestCachedRoute:
+    def _client(self, calls: list) -> TestClient:
+        router = APIRouter(prefix="/things", route_class=cached_route("things", uncached=("/live",)))
+
+        @router.get("/")
+        async def list_things(q: int = 0):
+            calls.append(q)
+            return {"q": q}
+
+        @router.get("/live")
+        async def live():
+            calls.append("live")
+            return {}
+
+        app = FastAPI()
+        app.include_router(router)
+        return TestClient(app)
+
+    def test_hit_miss_and_invalidation(self):
+        response_cache.clear()
+        calls: list = []
+        client = self._client(calls)
+
+        assert client.get("/things/?q=1").headers["x-cache"] == "MISS"
+        hit = client.get("/things/?q=1")
+        assert hit.headers["x-cache"] == "HIT" and hit.json() == {"q": 1}
+        assert client.get("/things/?q=2").headers["x-cache"] == "MISS"
+        client.get("/things/live")
+        client.get("/things/live")
+        assert calls == [1, 2, "live", "live"]
+
+        response_cache.invalidate("things")
+        client.get("/things/?q=1")
+        assert calls[-1] == 1
+        assert 'response_cache_hits_total{namespace="things"}' in render_metrics()
+        response_cache.clear()
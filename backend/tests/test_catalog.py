@@ -0,0 +1,112 @@
+"""Unit tests for the in-memory pricing catalog — pure logic, no DB needed."""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from app.pricing.catalog import COLUMNS, PricingCatalog, service_tokens
+
+_T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _row(sku, instance_type=None, region=None, hourly="0.10", vendor="aws", age_days=0):
+    values = {
+        "id": sku,
+        "vendor": vendor,
+        "service_name": "AmazonEC2",
+        "category": "Compute",
+        "sku_id": sku,
+        "description": None,
+        "region": region,
+        "instance_type": instance_type,
+        "operating_system": None,
+        "price_per_unit": Decimal(hourly or "0.01"),
+        "unit": "Hrs",
+        "price_per_hour": Decimal(hourly) if hourly else None,
+        "unit_dimension": "time" if hourly else "storage",
+        "canonical_unit": "hour" if hourly else "GB-month",
+        "canonical_price": Decimal(hourly or "0.01"),
+        "currency": "USD",
+        "effective_date": None,
+        "source_api": "aws_ec2",
+        "created_at": _T0,
+        "updated_at": _T0 - timedelta(days=age_days),
+    }
+    return tuple(values[c] for c in COLUMNS)
+
+
+def _catalog():
+    return PricingCatalog(
+        [
+            _row("SKU-US", "m5.large", "us-east-1", age_days=1),
+            _row("SKU-EU", "M5.Large", "eu-west-1", age_days=2),
+            _row("SKU-NEW", "m5.large", "ap-south-1", age_days=0),
+            _row("SKU-STORAGE", None, "eu-west-1", hourly=None, age_days=5),
+            _row("SKU-AZ", "Standard_D2", "westeurope", vendor="azure"),
+        ],
+        generation=(3, _T0),
+    )
+
+
+class TestPricingCatalog:
+    def test_indexes(self):
+        catalog = _catalog()
+        assert len(catalog) == 5
+        assert catalog.generation == (3, _T0)
+        assert len(catalog.by_instance_type[("aws", "m5.large")]) == 3
+        assert catalog.row(catalog.by_vendor["azure"][0])["sku_id"] == "SKU-AZ"
+
+    def test_match_tiers(self):
+        catalog = _catalog()
+        sku = lambda pos: catalog.row(pos)["sku_id"] if pos is not None else None
+        assert sku(catalog.find_best_match("AWS", "SKU-US", "m5.large", "eu")) == "SKU-US"
+        assert sku(catalog.find_best_match("aws", None, "m5.large", "EU-WEST")) == "SKU-EU"
+        # Instance-only falls back to the most recently updated row.
+        assert sku(catalog.find_best_match("aws", None, "m5.large", None)) == "SKU-NEW"
+        # Non-hourly SKUs never match.
+        assert catalog.find_best_match("aws", "SKU-STORAGE", None, None) is None
+        assert catalog.find_best_match("gcp", None, "m5.large", None) is None
+
+    def test_latest(self):
+        catalog = _catalog()
+        latest = [catalog.row(i)["sku_id"] for i in catalog.latest("aws", limit=2)]
+        assert latest == ["SKU-NEW", "SKU-US"]
+        assert catalog.latest("unknown") == []
+        assert "unknown" not in catalog.by_vendor
+
+    def test_recognize(self):
+        catalog = _catalog()
+        found = catalog.recognize("AWS", "m5.large Linux eu-west-1 730 Hrs")
+        assert (found.instance_type, found.region) == ("m5.large", "eu-west-1")
+        sku = catalog.row(catalog.find_best_match("aws", None, *found))["sku_id"]
+        assert sku == "SKU-EU"
+        # Terms are per vendor.
+        assert catalog.recognize("azure", "m5.large eu-west-1").instance_type is None
+        assert catalog.recognizer("aws") is catalog.recognizer("AWS")
+
+    def test_candidates(self):
+        catalog = PricingCatalog([
+            _row("SKU-US", "m5.large", "us-east-1", age_days=1),
+            _row("SKU-EU", "m5.large", "eu-west-1", age_days=2),
+            _row("SKU-XL", "m5.xlarge", "eu-west-1", age_days=0),
+            _row("SKU-AZ", "Standard_D2", "westeurope", vendor="azure"),
+        ])
+        sku = lambda positions: [catalog.row(i)["sku_id"] for i in positions]
+        # Recognised instance type, rows in the recognised region first.
+        assert sku(catalog.candidates("aws", "m5.large Linux eu-west-1 730 Hrs")) == ["SKU-EU", "SKU-US"]
+        # Quoted SKU ids rank above everything else.
+        assert sku(catalog.candidates("aws", "SKU-XL / m5.large", limit=2)) == ["SKU-XL", "SKU-US"]
+        # Service-name tokens: "AmazonEC2" is indexed as "ec2".
+        assert sku(catalog.candidates("aws", "EC2 usage eu-west-1", limit=1)) == ["SKU-XL"]
+        assert sku(catalog.candidates(None, "Standard_D2 VM")) == ["SKU-AZ"]
+        assert catalog.candidates("aws", "Support plan") == []
+
+    def test_service_tokens(self):
+        assert service_tokens("AmazonEC2") == {"ec2"}
+        assert service_tokens("AWSLambda") == {"lambda"}
+        assert service_tokens("Compute Engine") == {"compute", "engine"}
+        assert service_tokens(None) == set()
+
+    def test_empty(self):
+        catalog = PricingCatalog([])
+        assert len(catalog) == 0
+        assert catalog.find_best_matches([("aws", "x", "y", "z")]) == [None]
@@ -0,0 +1,117 @@
+"""Unit tests for read/write session routing — pure logic, no DB needed."""
+
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import database
+from app.core.consistency import READ_AFTER_COOKIE, ReadYourWritesMiddleware, _read_after
+from app.core.database import RoutingSession, WriteFence, _record_write, write_fence
+from app.core.metrics import render_metrics
+from app.models.vendor import Vendor
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    # Engines connect lazily, so nothing here touches a server.
+    replica = create_async_engine("postgresql+asyncpg://replica/db")
+    monkeypatch.setattr(database, "replica_engine", replica)
+    yield replica.sync_engine
+
+
+@pytest.fixture
+def fence():
+    fence = WriteFence()
+    token = write_fence.set(fence)
+    yield fence
+    write_fence.reset(token)
+
+
+class TestRoutingSession:
+    def test_without_replica_everything_goes_to_primary(self):
+        session = RoutingSession()
+        assert session.get_bind(clause=select(Vendor)) is database.engine.sync_engine
+
+    def test_reads_go_to_replica(self, replica):
+        session = RoutingSession()
+        assert session.get_bind(clause=select(Vendor)) is replica
+
+    def test_write_pins_session_to_primary(self, replica):
+        session = RoutingSession()
+        assert session.get_bind(clause=update(Vendor).values(name="x")) is database.engine.sync_engine
+        assert session.get_bind(clause=select(Vendor)) is database.engine.sync_engine
+
+    def test_locking_read_and_raw_sql_go_to_primary(self, replica):
+        assert RoutingSession().get_bind(clause=select(Vendor).with_for_update()) is database.engine.sync_engine
+        assert RoutingSession().get_bind(clause=text("SELECT 1")) is database.engine.sync_engine
+
+    def test_explicit_primary(self, replica):
+        session = RoutingSession()
+        session.info["primary"] = True
+        assert session.get_bind(clause=select(Vendor)) is database.engine.sync_engine
+
+    def test_recent_write_keeps_client_on_primary(self, replica, fence):
+        writer = RoutingSession()
+        writer.info["wrote"] = True
+        _record_write(writer)
+        assert fence.wrote
+        assert fence.read_after > time.time()
+        assert RoutingSession().get_bind(clause=select(Vendor)) is database.engine.sync_engine
+
+    def test_read_only_commit_does_not_hold_back_replica(self, replica, fence):
+        _record_write(RoutingSession())
+        assert not fence.wrote
+        assert RoutingSession().get_bind(clause=select(Vendor)) is replica
+
+    def test_write_outside_request_holds_back_nobody(self, replica):
+        writer = RoutingSession()
+        writer.info["wrote"] = True
+        _record_write(writer)
+        assert RoutingSession().get_bind(clause=select(Vendor)) is replica
+
+
+class TestReadYourWritesMiddleware:
+    def _client(self) -> TestClient:
+        app = FastAPI()
+        app.add_middleware(ReadYourWritesMiddleware)
+
+        @app.post("/write")
+        async def write():
+            session = RoutingSession()
+            session.info["wrote"] = True
+            _record_write(session)
+            return {}
+
+        @app.get("/read")
+        async def read():
+            on_replica = RoutingSession().get_bind(clause=select(Vendor)) is database.replica_engine.sync_engine
+            return {"replica": on_replica}
+
+        return TestClient(app)
+
+    def test_writer_reads_primary_others_replica(self, replica):
+        writer, other = self._client(), self._client()
+        assert writer.get("/read").json() == {"replica": True}
+
+        response = writer.post("/write")
+        assert READ_AFTER_COOKIE in response.cookies
+        assert writer.get("/read").json() == {"replica": False}
+        assert other.get("/read").json() == {"replica": True}
+
+    def test_cookie_is_clamped_to_window(self):
+        def scope(value: str) -> dict:
+            return {"type": "http", "headers": [(b"cookie", f"{READ_AFTER_COOKIE}={value}".encode())]}
+
+        assert _read_after(scope(str(time.time() + 3600)), 5) <= time.time() + 5
+        assert _read_after(scope("not-a-time"), 5) == 0.0
+        assert _read_after(scope("inf"), 5) == 0.0
+
+
+def test_pool_metrics_exported():
+    body = render_metrics()
+    assert 'db_pool_size{engine="primary"}' in body
+    assert 'db_pool_saturation{engine="primary"}' in body
@@ -1,5 +1,9 @@
-from app.api.routers.extraction import _get_or_create_vendor, _normalize_iban
+from datetime import datetime, timezone
+
+from app.api.routers.extraction import _get_or_create_vendor, _normalize_iban, _pricing_as_of
+from app.models.invoice import Invoice
 from app.models.vendor import Vendor
+from processing_layer.schemas.invoice import InvoiceExtraction
 
 
 class TestVendorIbanPersistence:
@@ -85,3 +89,24 @@ class TestVendorIbanPersistence:
 
         assert updated.registered_iban == "DE89370400440532013000"
         assert updated.known_iban_changes is None
+
+
+class TestPricingAsOf:
+    """Pure logic, no DB needed."""
+
+    def _extraction(self, **dates) -> InvoiceExtraction:
+        return InvoiceExtraction(
+            invoice_number="INV-1", vendor_name="Acme", vendor_address=None, client_name=None,
+            client_address=None, line_items=[], subtotal=None, tax=None, total=None, currency=None,
+            **{"due_date": None, **dates},
+        )
+
+    def test_issue_date_not_due_date(self):
+        received = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        invoice = Invoice(created_at=received)
+
+        as_of = _pricing_as_of(self._extraction(invoice_date="2026-01-15", due_date="2026-02-14"), invoice)
+        assert as_of == datetime(2026, 1, 15, tzinfo=timezone.utc)
+
+        assert _pricing_as_of(self._extraction(due_date="2026-02-14"), invoice) == received
+        assert _pricing_as_of(self._extraction(invoice_date="15/01/2026"), invoice) == received
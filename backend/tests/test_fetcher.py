@@ -0,0 +1,235 @@
+"""Unit tests for the pricing fetcher's pooled, sharded pagination — no network needed."""
+
+import threading
+
+import pytest
+import requests
+
+from app.pricing import fetcher
+
+
+class _FakeResponse:
+    def __init__(self, body: dict, status_code: int = 200):
+        self._body = body
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error", response=self)
+
+    def json(self):
+        return self._body
+
+
+class _FakeSession:
+    """Serves canned pages keyed by (url, $filter / pageToken) and records calls."""
+
+    def __init__(self, pages: dict):
+        self.pages = pages
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self._lock:
+            self.calls.append((url, params))
+        key = (url, (params or {}).get("$filter") or (params or {}).get("pageToken"))
+        return _FakeResponse(self.pages[key])
+
+
+@pytest.fixture
+def fake_session(monkeypatch):
+    def install(pages):
+        session = _FakeSession(pages)
+        monkeypatch.setattr(fetcher, "_get_session", lambda: session)
+        return session
+    return install
+
+
+class TestSession:
+    def test_session_is_shared_and_retries(self):
+        session = fetcher._get_session()
+        assert fetcher._get_session() is session
+        retry = session.get_adapter("https://prices.azure.com").max_retries
+        assert 429 in retry.status_forcelist
+        assert retry.respect_retry_after_header
+
+    def test_infracost_post_retries_less(self):
+        session = fetcher._get_session()
+        retry = session.get_adapter(fetcher._INFRACOST_ENDPOINT).max_retries
+        assert "POST" in retry.allowed_methods
+        assert retry.total < fetcher._RETRY.total
+        assert "POST" not in session.get_adapter("https://prices.azure.com").max_retries.allowed_methods
+
+
+class TestAzure:
+    def test_shards_page_independently(self, fake_session, monkeypatch):
+        monkeypatch.setattr(fetcher, "MAX_RECORDS", 100)
+        monkeypatch.setattr(fetcher, "AZURE_REGIONS", ["westeurope"])
+        monkeypatch.setattr(fetcher, "AZURE_SERVICE_FAMILIES", ["Compute", "Storage"])
+        base = "https://prices.azure.com/api/retail/prices"
+        compute, storage = fetcher._azure_shard_filters()
+        session = fake_session({
+            (base, compute): {"Items": [{"skuId": "c1"}], "NextPageLink": f"{base}?page=2"},
+            (f"{base}?page=2", None): {"Items": [{"skuId": "c2"}]},
+            (base, storage): {"Items": [{"skuId": "s1"}]},
+        })
+
+        result = fetcher.fetch_azure()
+
+        assert [i["skuId"] for i in result["raw_records"]] == ["c1", "c2", "s1"]
+        assert result["failed_shards"] == []
+        assert len(session.calls) == 3
+
+    def test_failed_shard_does_not_abort_others(self, fake_session, monkeypatch):
+        monkeypatch.setattr(fetcher, "MAX_RECORDS", 100)
+        monkeypatch.setattr(fetcher, "AZURE_REGIONS", ["westeurope"])
+        monkeypatch.setattr(fetcher, "AZURE_SERVICE_FAMILIES", ["Compute", "Storage"])
+        base = "https://prices.azure.com/api/retail/prices"
+        compute, storage = fetcher._azure_shard_filters()
+        fake_session({(base, compute): {"Items": [{"skuId": "c1"}]}})
+
+        result = fetcher.fetch_azure()
+
+        assert [i["skuId"] for i in result["raw_records"]] == ["c1"]
+        assert result["failed_shards"] == [storage]
+
+    def test_each_shard_fetches_only_its_share(self, fake_session, monkeypatch):
+        monkeypatch.setattr(fetcher, "MAX_RECORDS", 3)
+        monkeypatch.setattr(fetcher, "AZURE_REGIONS", ["westeurope"])
+        monkeypatch.setattr(fetcher, "AZURE_SERVICE_FAMILIES", ["Compute", "Storage"])
+        base = "https://prices.azure.com/api/retail/prices"
+        compute, storage = fetcher._azure_shard_filters()
+        session = fake_session({
+            (base, compute): {"Items": [{"skuId": "c1"}, {"skuId": "c2"}], "NextPageLink": f"{base}?page=2"},
+            (f"{base}?page=2", None): {"Items": [{"skuId": "c3"}]},
+            (base, storage): {"Items": [{"skuId": "s1"}, {"skuId": "s2"}, {"skuId": "s3"}]},
+        })
+
+        result = fetcher.fetch_azure()
+
+        assert [i["skuId"] for i in result["raw_records"]] == ["c1", "c2", "s1"]
+        assert len(session.calls) == 2
+
+    def test_region_only_shards_without_families(self, monkeypatch):
+        monkeypatch.setattr(fetcher, "AZURE_REGIONS", ["westeurope", "northeurope"])
+        monkeypatch.setattr(fetcher, "AZURE_SERVICE_FAMILIES", [])
+        assert fetcher._azure_shard_filters() == [
+            "armRegionName eq 'westeurope' and priceType eq 'Consumption'",
+            "armRegionName eq 'northeurope' and priceType eq 'Consumption'",
+        ]
+
+
+    def test_skipped_without_regions(self, monkeypatch):
+        monkeypatch.setattr(fetcher, "AZURE_REGIONS", [])
+        assert fetcher.fetch_azure() == {"status": "skipped", "reason": "no Azure shards configured"}
+
+
+class TestGcp:
+    def test_services_fetched_with_pagination(self, fake_session, monkeypatch):
+        monkeypatch.setattr(fetcher, "MAX_RECORDS", 100)
+        monkeypatch.setattr(fetcher, "GCP_KEY", "test-key")
+        url = "https://cloudbilling.googleapis.com/v1/services/{}/skus"
+        sku = lambda i: {"skuId": i, "pricingInfo": [{"pricingExpression": {
+            "usageUnit": "h", "tieredRates": [{"unitPrice": {"units": "1", "nanos": 500_000_000}}],
+        }}]}
+        pages = {(url.format(svc), None): {"skus": [sku(f"{svc}-1")]} for svc in fetcher._GCP_SERVICES}
+        compute = url.format("6F81-5844-456A")
+        pages[(compute, None)] = {"skus": [sku("cpu-1")], "nextPageToken": "t2"}
+        pages[(compute, "t2")] = {"skus": [sku("cpu-2")]}
+        fake_session(pages)
+
+        result = fetcher.fetch_gcp()
+
+        ids = [r["skuId"] for r in result["raw_records"]]
+        assert ids[:2] == ["cpu-1", "cpu-2"]
+        assert len(ids) == 4
+        assert result["raw_records"][0]["priceUSD"] == 1.5
+        assert result["raw_records"][0]["service"] == "Compute Engine"
+
+    def test_skipped_without_key(self, monkeypatch):
+        monkeypatch.setattr(fetcher, "GCP_KEY", "")
+        assert fetcher.fetch_gcp()["status"] == "skipped"
+
+
+class _FakeGraphQLSession:
+    """Answers aliased products queries; rejects with 413 any request carrying more than
+    ``max_aliases``, or raises ``error`` for every request."""
+
+    def __init__(self, max_aliases: int = 100, error: Exception | None = None):
+        self.max_aliases = max_aliases
+        self.error = error
+        self.requests = []
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        variables = json["variables"]
+        self.requests.append(variables)
+        if self.error is not None:
+            raise self.error
+        aliases = [k[1:] for k in variables if k.startswith("f")]
+        if len(aliases) > self.max_aliases:
+            return _FakeResponse({}, status_code=413)
+        data = {
+            f"q{i}": [{"vendorName": variables[f"f{i}"]["vendorName"], "region": variables[f"f{i}"].get("region")}]
+            for i in aliases
+        }
+        return _FakeResponse({"data": data})
+
+
+class TestInfracost:
+    def test_default_specs_match_original_queries(self):
+        filters = fetcher._expand_infracost_specs(fetcher.DEFAULT_INFRACOST_SPECS)
+        assert [(f["product_filter"]["vendorName"], f["product_filter"]["region"]) for f in filters] == [
+            ("aws", "us-east-1"), ("aws", "eu-west-1"), ("azure", "westus"),
+        ]
+        assert filters[2]["price_filter"] == {"purchaseOption": "Consumption"}
+
+    def test_query_is_aliased_with_variables(self):
+        filters = fetcher._expand_infracost_specs(fetcher.DEFAULT_INFRACOST_SPECS)
+        query, variables = fetcher._build_infracost_query(filters)
+        assert "q2: products(filter: $f2)" in query
+        assert "$p2: PriceFilter" in query
+        assert variables["f1"]["region"] == "eu-west-1"
+
+    def test_batches_requests(self, monkeypatch):
+        monkeypatch.setattr(fetcher, "INFRACOST_KEY", "test-key")
+        monkeypatch.setattr(fetcher, "MAX_RECORDS", 100)
+        monkeypatch.setattr(fetcher, "INFRACOST_BATCH_SIZE", 2)
+        session = _FakeGraphQLSession()
+        monkeypatch.setattr(fetcher, "_get_session", lambda: session)
+
+        result = fetcher.fetch_infracost()
+
+        assert result["requests_made"] == 2
+        assert [p["region"] for p in result["raw_records"]] == ["us-east-1", "eu-west-1", "westus"]
+        assert result["raw_records"][2]["_query_label"] == "Azure VMs Consumption (westus)"
+
+    def test_failed_batch_is_split(self, monkeypatch):
+        monkeypatch.setattr(fetcher, "INFRACOST_KEY", "test-key")
+        monkeypatch.setattr(fetcher, "MAX_RECORDS", 100)
+        monkeypatch.setattr(fetcher, "INFRACOST_BATCH_SIZE", 3)
+        session = _FakeGraphQLSession(max_aliases=1)
+        monkeypatch.setattr(fetcher, "_get_session", lambda: session)
+
+        result = fetcher.fetch_infracost()
+
+        assert len(result["raw_records"]) == 3
+
+    def test_transport_failure_is_not_split(self, monkeypatch):
+        monkeypatch.setattr(fetcher, "INFRACOST_KEY", "test-key")
+        monkeypatch.setattr(fetcher, "MAX_RECORDS", 100)
+        monkeypatch.setattr(fetcher, "INFRACOST_BATCH_SIZE", 3)
+        session = _FakeGraphQLSession(error=requests.ConnectionError("connection reset"))
+        monkeypatch.setattr(fetcher, "_get_session", lambda: session)
+
+        result = fetcher.fetch_infracost()
+
+        assert result["raw_records"] == []
+        assert len(session.requests) == 1
+
+    def test_specs_from_file(self, monkeypatch, tmp_path):
+        path = tmp_path / "filters.json"
+        path.write_text('[{"vendorName": "gcp", "service": "Compute Engine", "regions": ["europe-west1", "us-central1"]}]')
+        monkeypatch.setenv("INFRACOST_FILTERS_FILE", str(path))
+        filters = fetcher._expand_infracost_specs(fetcher._load_infracost_specs())
+        assert [f["product_filter"]["region"] for f in filters] == ["europe-west1", "us-central1"]
+        assert filters[0]["price_filter"] == {}
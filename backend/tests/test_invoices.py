@@ -83,3 +83,77 @@ class TestInvoices:
 
         resp = await client.get(f"{BASE}/{iid}")
         assert resp.status_code == 404
+
+
+class TestInvoicePagination:
+    async def test_cursor_walks_every_invoice_once(self, client):
+        created = {(await client.post(BASE, json={})).json()["id"] for _ in range(5)}
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            resp = await client.get(BASE, params=params)
+            assert resp.status_code == 200
+            assert len(resp.json()) <= 2
+            seen.extend(i["id"] for i in resp.json())
+            cursor = resp.headers.get("x-next-cursor")
+            if not cursor:
+                break
+
+        assert len(seen) == len(set(seen))
+        assert created <= set(seen)
+
+    async def test_newest_first(self, client):
+        first = (await client.post(BASE, json={})).json()["id"]
+        second = (await client.post(BASE, json={})).json()["id"]
+
+        ids = [i["id"] for i in (await client.get(BASE)).json()]
+        assert ids.index(second) < ids.index(first)
+
+    async def test_last_page_has_no_cursor(self, client):
+        await client.post(BASE, json={})
+        resp = await client.get(BASE, params={"limit": 1000})
+        assert "x-next-cursor" not in resp.headers
+
+    async def test_invalid_cursor(self, client):
+        resp = await client.get(BASE, params={"cursor": "not-a-cursor"})
+        assert resp.status_code == 400
+
+
+class TestInvoiceSummary:
+    async def test_projects_summary_columns(self, client):
+        created = (await client.post(BASE, json={})).json()["id"]
+
+        rows = (await client.get(f"{BASE}/summary")).json()
+        row = next(r for r in rows if r["id"] == created)
+        assert row["status"] == "pending"
+        assert "extracted_data" not in row and "items" not in row
+
+    async def test_fields_selection(self, client):
+        await client.post(BASE, json={})
+        rows = (await client.get(f"{BASE}/summary", params={"fields": "status,total"})).json()
+        assert set(rows[0]) == {"id", "status", "total"}
+
+        resp = await client.get(f"{BASE}/summary", params={"fields": "status,anomalies"})
+        assert resp.status_code == 400
+
+    async def test_etag_not_modified(self, client):
+        created = (await client.post(BASE, json={})).json()["id"]
+        first = await client.get(f"{BASE}/summary")
+        etag = first.headers["etag"]
+
+        again = await client.get(f"{BASE}/summary", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+
+        await client.patch(f"{BASE}/{created}", json={"status": "approved"})
+        changed = await client.get(f"{BASE}/summary", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+
+    async def test_status_filter_and_cursor(self, client):
+        for _ in range(3):
+            await client.post(BASE, json={})
+        resp = await client.get(f"{BASE}/summary", params={"status": "pending", "limit": 2, "fields": "status"})
+        assert [r["status"] for r in resp.json()] == ["pending", "pending"]
+        assert resp.headers.get("x-next-cursor")
@@ -1,5 +1,11 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
 import pytest
 
+from app.models.market_data import MarketData
+from app.repositories.market_data import MarketDataRepository
+
 BASE = "/api/v1/market-data"
 
 
@@ -73,3 +79,69 @@ class TestMarketData:
 
         resp = await client.get(f"{BASE}/{mid}")
         assert resp.status_code == 404
+
+
+class TestMarketDataSeries:
+    async def test_record_samples_merges_hour_bucket(self, db_session):
+        repo = MarketDataRepository(db_session)
+        await repo.record_samples([{"name": "SeriesSvc", "category": "Compute", "price_per_unit": Decimal("1"), "sample_count": 1}])
+        await repo.record_samples([{"name": "SeriesSvc", "category": "Compute", "price_per_unit": Decimal("4"), "sample_count": 3}])
+
+        rows = [r for r in await repo.get_by_name("SeriesSvc") if r.granularity == "hour"]
+        assert len(rows) == 1
+        assert rows[0].sample_count == 4
+        assert rows[0].price_per_unit == Decimal("3.25")
+
+    async def test_completed_hours_roll_up_into_days(self, db_session):
+        yesterday = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+        db_session.add_all([
+            MarketData(name="RollSvc", category="Compute", granularity="hour", price_per_unit=Decimal("2"),
+                       sample_count=1, timestamp=yesterday + timedelta(hours=1)),
+            MarketData(name="RollSvc", category="Compute", granularity="hour", price_per_unit=Decimal("6"),
+                       sample_count=3, timestamp=yesterday + timedelta(hours=5)),
+        ])
+        await db_session.commit()
+
+        await MarketDataRepository(db_session).record_samples(
+            [{"name": "Other", "category": "Compute", "price_per_unit": Decimal("1"), "sample_count": 1}]
+        )
+
+        days = await MarketDataRepository(db_session).get_series(
+            "RollSvc", "day", yesterday - timedelta(days=1), yesterday + timedelta(days=1),
+        )
+        assert len(days) == 1
+        assert days[0].timestamp == yesterday
+        assert days[0].price_per_unit == Decimal("5")
+        assert days[0].sample_count == 4
+
+    async def test_expired_hours_are_deleted(self, db_session):
+        old = datetime.now(timezone.utc) - timedelta(days=60)
+        db_session.add(MarketData(name="OldSvc", category="Compute", granularity="hour",
+                                  price_per_unit=Decimal("1"), sample_count=1, timestamp=old))
+        await db_session.commit()
+
+        await MarketDataRepository(db_session).record_samples(
+            [{"name": "Other", "category": "Compute", "price_per_unit": Decimal("1"), "sample_count": 1}]
+        )
+        assert await MarketDataRepository(db_session).get_by_name("OldSvc") == []
+
+    async def test_series_endpoint(self, client):
+        await client.post(BASE, json={"name": "chart-sku", "category": "Compute", "price_per_unit": "0.5"})
+
+        resp = await client.get(f"{BASE}/series", params={"name": "chart-sku", "granularity": "hour"})
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["granularity"] == "hour"
+        assert len(data["points"]) == 1
+        assert data["points"][0]["sample_count"] == 1
+
+    async def test_series_auto_granularity(self, client):
+        resp = await client.get(f"{BASE}/series", params={"name": "chart-sku"})
+        assert resp.status_code == 200
+        assert resp.json()["granularity"] == "day"
+
+    async def test_series_rejects_inverted_range(self, client):
+        resp = await client.get(f"{BASE}/series", params={
+            "name": "x", "start": "2026-02-01T00:00:00Z", "end": "2026-01-01T00:00:00Z",
+        })
+        assert resp.status_code == 400
@@ -10,20 +10,27 @@ from app.pricing.normalizer import (
     normalize_azure,
     normalize_gcp,
     normalize_infracost,
-    _is_hourly,
+    _unit_fields,
     _to_decimal,
     _category_from_service,
 )
 
 
 class TestHelpers:
-    def test_is_hourly(self):
-        assert _is_hourly("Hrs") is True
-        assert _is_hourly("hour") is True
-        assert _is_hourly("h") is True
-        assert _is_hourly("1 Hour") is True
-        assert _is_hourly("GB") is False
-        assert _is_hourly("Requests") is False
+    def test_unit_fields_hourly(self):
+        for unit in ("Hrs", "hour", "h", "1 Hour"):
+            fields = _unit_fields(Decimal("0.5"), unit)
+            assert fields["unit_dimension"] == "time"
+            assert fields["price_per_hour"] == Decimal("0.5")
+        assert _unit_fields(Decimal("50"), "100 Hours")["price_per_hour"] == Decimal("0.5")
+
+    def test_unit_fields_non_hourly(self):
+        gb = _unit_fields(Decimal("0.09"), "GB")
+        assert gb["unit_dimension"] == "transfer"
+        assert gb["price_per_hour"] is None
+        assert gb["canonical_price"] == Decimal("0.09")
+        assert _unit_fields(Decimal("0.4"), "Requests")["price_per_hour"] is None
+        assert _unit_fields(Decimal("1"), "Quantity")["unit_dimension"] is None
 
     def test_to_decimal(self):
         assert _to_decimal("0.046") == Decimal("0.046")
@@ -58,7 +65,7 @@ class TestNormalizeAwsEc2:
                 "EffectiveDate": "2024-01-01",
             }]
         }
-        records = normalize_aws_ec2(payload)
+        records = list(normalize_aws_ec2(payload))
         assert len(records) == 1
         r = records[0]
         assert r["vendor"] == "aws"
@@ -77,13 +84,13 @@ class TestNormalizeAwsEc2:
                 "serviceName": "Amazon S3",
             }]
         }
-        records = normalize_aws_ec2(payload)
+        records = list(normalize_aws_ec2(payload))
         assert len(records) == 1
         assert records[0]["price_per_hour"] is None
 
     def test_empty(self):
-        assert normalize_aws_ec2({"raw_records": []}) == []
-        assert normalize_aws_ec2({}) == []
+        assert list(normalize_aws_ec2({"raw_records": []})) == []
+        assert list(normalize_aws_ec2({})) == []
 
 
 class TestNormalizeAwsS3:
@@ -98,7 +105,7 @@ class TestNormalizeAwsS3:
                 "Currency": "USD",
             }]
         }
-        records = normalize_aws_s3(payload)
+        records = list(normalize_aws_s3(payload))
         assert len(records) == 1
         assert records[0]["category"] == "Storage"
         assert records[0]["price_per_hour"] is None
@@ -119,7 +126,7 @@ class TestNormalizeAzure:
                 "currencyCode": "USD",
             }]
         }
-        records = normalize_azure(payload)
+        records = list(normalize_azure(payload))
         assert len(records) == 1
         r = records[0]
         assert r["vendor"] == "azure"
@@ -140,7 +147,7 @@ class TestNormalizeGcp:
                 "currencyCode": "USD",
             }]
         }
-        records = normalize_gcp(payload)
+        records = list(normalize_gcp(payload))
         assert len(records) == 1
         r = records[0]
         assert r["vendor"] == "gcp"
@@ -161,16 +168,33 @@ class TestNormalizeAll:
                 }]
             },
         }
-        records = normalize_all(payloads)
+        records = list(normalize_all(payloads))
         assert len(records) == 1
         assert records[0]["sku_id"] == "S3OK"
 
     def test_skips_unknown_source(self):
         payloads = {"unknown_source": {"raw_records": [{"foo": "bar"}]}}
-        records = normalize_all(payloads)
+        records = list(normalize_all(payloads))
         assert records == []
 
     def test_skips_skipped_sources(self):
         payloads = {"gcp": {"status": "skipped", "reason": "no key"}}
-        records = normalize_all(payloads)
+        records = list(normalize_all(payloads))
         assert records == []
+
+
+class TestStreaming:
+    def test_normalize_all_is_lazy(self):
+        def raw_records():
+            yield {"SKU": "LAZY1", "PricePerUnit": "0.01", "Unit": "Hrs"}
+            raise AssertionError("consumed past the first record")
+
+        records = normalize_all({"aws_ec2": {"raw_records": raw_records()}})
+        assert next(records)["sku_id"] == "LAZY1"
+
+    def test_raw_fields_projection(self):
+        payload = {"raw_records": [{"SKU": "P1", "PricePerUnit": "0.01", "Unit": "Hrs", "Noise": "x" * 100}]}
+        projected = list(normalize_all({"aws_ec2": payload}, raw_fields=("SKU", "Missing")))
+        assert projected[0]["raw_attributes"] == {"SKU": "P1"}
+        full = list(normalize_all({"aws_ec2": payload}, raw_fields=None))
+        assert full[0]["raw_attributes"]["Noise"] == "x" * 100
@@ -0,0 +1,191 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from paid.errors import NotFoundError
+from sqlalchemy import delete, update
+
+from app.api.routers import paid_blocks
+from app.models.invoice import Invoice
+from app.models.vendor_usage_rollup import VendorUsageRollup
+from app.repositories.vendor import VendorRepository
+from app.repositories.vendor_usage_rollup import VendorUsageRollupRepository
+
+BASE = "/api/v1/paid-blocks"
+
+
+def _events(resp) -> dict:
+    return {s["eventName"]: s for s in resp.json()["data"]["usageSummary"]}
+
+
+class TestVendorUsage:
+    async def test_unknown_vendor_is_empty(self, client):
+        resp = await client.get(f"{BASE}/usage/{uuid.uuid4()}")
+        assert resp.status_code == 200
+        assert resp.json()["data"]["usageSummary"] == []
+
+    async def test_usage_follows_invoice_writes(self, client, db_session):
+        vendor = await VendorRepository(db_session).create(name="Rolled Up")
+        flagged = Invoice(vendor_id=vendor.id, total=Decimal("40"), status="pending")
+        db_session.add_all([
+            Invoice(vendor_id=vendor.id, total=Decimal("100"), status="approved"),
+            flagged,
+        ])
+        await db_session.commit()
+
+        events = _events(await client.get(f"{BASE}/usage/{vendor.id}"))
+        assert events["invoices_processed"]["eventsQuantity"] == 2
+        assert events["invoices_processed"]["subtotal"] == 14000
+        assert "fraud_blocked_euros" not in events
+
+        flagged.status = "rejected"
+        flagged.negotiation_email = "Dear vendor, ..."
+        await db_session.commit()
+
+        events = _events(await client.get(f"{BASE}/usage/{vendor.id}"))
+        assert events["fraud_blocked_euros"]["eventsQuantity"] == 1
+        assert events["fraud_blocked_euros"]["subtotal"] == 4000
+        assert events["negotiation_email_sent"]["eventsQuantity"] == 1
+
+        await db_session.delete(flagged)
+        await db_session.commit()
+
+        events = _events(await client.get(f"{BASE}/usage/{vendor.id}"))
+        assert events["invoices_processed"]["eventsQuantity"] == 1
+        assert "fraud_blocked_euros" not in events
+
+    async def test_reconcile_repairs_drift(self, db_session):
+        vendor = await VendorRepository(db_session).create(name="Drifted Usage")
+        db_session.add(Invoice(vendor_id=vendor.id, total=Decimal("25"), status="overcharge"))
+        await db_session.commit()
+        await db_session.execute(
+            update(VendorUsageRollup).where(VendorUsageRollup.vendor_id == vendor.id).values(fraud_count=9)
+        )
+
+        repo = VendorUsageRollupRepository(db_session)
+        assert await repo.reconcile() >= 1
+        rollup = await repo.get(vendor.id)
+        assert (rollup.invoice_count, rollup.fraud_count, rollup.fraud_total) == (1, 1, Decimal("25"))
+        assert await repo.reconcile() == 0
+
+    async def test_reconcile_restores_missing_and_empties_stale(self, db_session):
+        vendors = VendorRepository(db_session)
+        billed = await vendors.create(name="Lost Rollup")
+        idle = await vendors.create(name="Stale Rollup")
+        db_session.add(Invoice(vendor_id=billed.id, total=Decimal("10"), status="approved"))
+        await db_session.commit()
+        await db_session.execute(delete(VendorUsageRollup).where(VendorUsageRollup.vendor_id == billed.id))
+        db_session.add(VendorUsageRollup(vendor_id=idle.id, invoice_count=3, total_sum=Decimal("30")))
+        await db_session.commit()
+
+        repo = VendorUsageRollupRepository(db_session)
+        assert await repo.reconcile() >= 2
+        assert (await repo.get(billed.id)).invoice_count == 1
+        stale = await repo.get(idle.id)
+        assert (stale.invoice_count, stale.total_sum, stale.last_invoice_at) == (0, 0, None)
+
+
+class TestVendorInvoices:
+    async def test_paginated_projection(self, client, db_session):
+        vendor = await VendorRepository(db_session).create(name="Billing Rows")
+        db_session.add_all([
+            Invoice(vendor_id=vendor.id, total=Decimal("12.5"), status="paid"),
+            Invoice(vendor_id=vendor.id, total=None, extracted_data={"total": 7, "currency": "USD"}),
+        ])
+        await db_session.commit()
+
+        data = (await client.get(f"{BASE}/invoices/{vendor.id}")).json()["data"]
+        assert sorted((d["invoiceTotal"], d["currency"]) for d in data) == [(700, "USD"), (1250, "EUR")]
+
+        page = (await client.get(f"{BASE}/invoices/{vendor.id}", params={"skip": 1, "limit": 1})).json()["data"]
+        assert len(page) == 1
+        assert page[0]["number"] == 2
+
+    async def test_keyset_pages_cover_every_invoice(self, client, db_session):
+        vendor = await VendorRepository(db_session).create(name="Many Billing Rows")
+        db_session.add_all([Invoice(vendor_id=vendor.id, total=Decimal(i), status="paid") for i in range(5)])
+        await db_session.commit()
+
+        everything = (await client.get(f"{BASE}/invoices/{vendor.id}")).json()["data"]
+        assert len(everything) == 5
+
+        seen, params = [], {"limit": 2}
+        while True:
+            resp = await client.get(f"{BASE}/invoices/{vendor.id}", params=params)
+            seen.extend(d["id"] for d in resp.json()["data"])
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params = {"limit": 2, "cursor": cursor}
+        assert seen == [d["id"] for d in everything]
+
+
+class _FakeInvoices:
+    def __init__(self, total: int):
+        self.total = total
+        self.calls: list[dict] = []
+
+    async def list_invoices(self, *, external_customer_id, limit, offset):
+        self.calls.append({"external_customer_id": external_customer_id, "limit": limit, "offset": offset})
+        if external_customer_id == "unknown":
+            raise NotFoundError(body=None)
+        data = [
+            SimpleNamespace(
+                id=f"inv-{i}", payment_status="paid", issue_date=date(2026, 1, 1), due_date=None,
+                invoice_total=1000.0, currency=None,
+            )
+            for i in range(offset, min(offset + limit, self.total))
+        ]
+        return SimpleNamespace(data=data, pagination=SimpleNamespace(has_more=offset + limit < self.total))
+
+
+class TestPaidInvoices:
+    """Paid.ai lookups with a fake SDK client — pure logic, no DB needed."""
+
+    @pytest.fixture
+    def paid(self, monkeypatch):
+        client = SimpleNamespace(invoices=_FakeInvoices(total=5))
+        monkeypatch.setattr(paid_blocks, "get_paid_client", lambda: client)
+        monkeypatch.setattr(paid_blocks.settings, "paid_invoice_page_size", 2)
+        paid_blocks._customer_invoices.clear()
+        yield client
+        paid_blocks._customer_invoices.clear()
+
+    async def test_paginates_filtered_by_external_id(self, paid):
+        result = await paid_blocks._fetch_paid_invoices("v1")
+
+        assert [inv["id"] for inv in result] == [f"inv-{i}" for i in range(5)]
+        assert [inv["number"] for inv in result] == [1, 2, 3, 4, 5]
+        assert [call["offset"] for call in paid.invoices.calls] == [0, 2, 4]
+        assert {call["external_customer_id"] for call in paid.invoices.calls} == {"v1"}
+
+    async def test_lists_are_cached(self, paid):
+        await paid_blocks._fetch_paid_invoices("v1")
+        await paid_blocks._fetch_paid_invoices("v1")
+        assert len(paid.invoices.calls) == 3
+
+        paid_blocks._customer_invoices.clear()
+        await paid_blocks._fetch_paid_invoices("v1")
+        assert len(paid.invoices.calls) == 6
+
+    async def test_unknown_customer_is_cached_as_miss(self, paid):
+        assert await paid_blocks._fetch_paid_invoices("unknown") is None
+        assert await paid_blocks._fetch_paid_invoices("unknown") is None
+        assert len(paid.invoices.calls) == 1
+
+    async def test_window_matches_local_listing(self, paid):
+        invoices = await paid_blocks._fetch_paid_invoices("v1")
+
+        assert paid_blocks._paid_window(invoices, 0, None, None) == (invoices, None)
+        page, _ = paid_blocks._paid_window(invoices, 1, 1, None)
+        assert [inv["number"] for inv in page] == [2]
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = paid_blocks._paid_window(invoices, 0, 2, cursor)
+            seen.extend(inv["id"] for inv in page)
+            if not cursor:
+                break
+        assert seen == [inv["id"] for inv in invoices]
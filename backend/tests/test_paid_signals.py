@@ -0,0 +1,179 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from paid.errors import BadRequestError, TooManyRequestsError
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.core.outbox import OutboxWorker, next_attempt_at
+from app.models.paid_signal import PaidSignal
+from app.services import paid_service
+from app.services.paid_service import flush_signals, track_value
+
+
+class _FakeSignals:
+    """Rejects a batch holding the ``poison`` value by raising ``error``, or — with
+    ``error=None`` — by counting it as failed in a 200 response."""
+
+    def __init__(self, fail: bool = False, poison: float | None = None, error: type | None = BadRequestError):
+        self.fail = fail
+        self.poison = poison
+        self.error = error
+        self.calls: list[list] = []
+
+    async def create_signals(self, signals):
+        self.calls.append(signals)
+        if self.fail:
+            raise RuntimeError("paid.ai unavailable")
+        failed = sum(s.data["value_generated"] == self.poison for s in signals)
+        if failed and self.error is not None:
+            raise self.error(body="rejected signal")
+        return SimpleNamespace(ingested=len(signals) - failed, duplicates=0, failed=failed)
+
+
+class _FakeClient:
+    def __init__(self, fail: bool = False, poison: float | None = None, error: type | None = BadRequestError):
+        self.signals = _FakeSignals(fail, poison, error)
+
+
+def _row(id: int, value: float) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=id, event_name="time_saved_minutes", customer_external_id="vendor-1", data={"value_generated": value},
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+@pytest.fixture
+def paid_client(monkeypatch):
+    client = _FakeClient()
+    monkeypatch.setattr(paid_service, "_client", client)
+    return client
+
+
+class TestOutboxWorker:
+    """Pure logic, no DB needed."""
+
+    def test_backoff_doubles_and_caps(self):
+        now = datetime.now(timezone.utc)
+        delays = [(next_attempt_at(n, 5, 30) - now).total_seconds() for n in (1, 2, 3, 4)]
+        assert [round(d) for d in delays] == [5, 10, 20, 30]
+
+    async def test_drain_all_stops_on_short_batch(self):
+        batches = [3, 3, 1, 3]
+
+        async def drain() -> int:
+            return batches.pop(0)
+
+        worker = OutboxWorker("test", drain, batch_size=3, flush_seconds=60)
+        assert await worker.drain_all() == 7
+        assert batches == [3]
+
+    def test_notify_wakes_on_full_batch(self):
+        async def drain() -> int:
+            return 0
+
+        worker = OutboxWorker("test", drain, batch_size=3, flush_seconds=60)
+        worker.notify(2)
+        assert not worker._wake.is_set()
+        worker.notify(1)
+        assert worker._wake.is_set()
+
+
+class TestSignalBatchSplitting:
+    """Pure logic, no DB needed."""
+
+    async def test_rejected_batch_isolates_bad_row(self, monkeypatch):
+        client = _FakeClient(poison=13.0)
+        monkeypatch.setattr(paid_service, "_client", client)
+        rows = [_row(i, float(i)) for i in range(10, 18)]
+
+        sent, failed = await paid_service._send(rows)
+
+        assert [r.id for r in sent] == [10, 11, 12, 14, 15, 16, 17]
+        assert [r.id for r, _ in failed] == [13]
+        assert isinstance(failed[0][1], BadRequestError)
+        # 1 full batch + bisection down to the bad row, not one call per row.
+        assert len(client.signals.calls) <= 7
+
+    async def test_failed_count_in_response_isolates_bad_row(self, monkeypatch):
+        client = _FakeClient(poison=13.0, error=None)
+        monkeypatch.setattr(paid_service, "_client", client)
+        rows = [_row(i, float(i)) for i in range(10, 14)]
+
+        sent, failed = await paid_service._send(rows)
+
+        assert [r.id for r in sent] == [10, 11, 12]
+        assert [r.id for r, _ in failed] == [13]
+        assert isinstance(failed[0][1], paid_service.SignalsRejected)
+
+    def test_signal_carries_event_time_and_idempotency_key(self):
+        signal = paid_service._to_signal(_row(42, 1.0))
+        assert signal.idempotency_key == "paid-signal-42"
+        assert signal.timestamp == datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    async def test_transient_error_is_not_split(self, monkeypatch):
+        client = _FakeClient(poison=13.0, error=TooManyRequestsError)
+        monkeypatch.setattr(paid_service, "_client", client)
+        rows = [_row(i, float(i)) for i in range(10, 14)]
+
+        sent, failed = await paid_service._send(rows)
+
+        assert sent == []
+        assert len(failed) == 4
+        assert len(client.signals.calls) == 1
+
+
+class TestPaidSignalOutbox:
+    async def test_track_value_only_queues(self, db_session, paid_client):
+        track_value(db_session, "vendor-1", "time_saved_minutes", 11.5, {"invoice_id": "x"})
+        await db_session.commit()
+
+        rows = (await db_session.execute(select(PaidSignal))).scalars().all()
+        assert [(r.event_name, r.data["value_generated"]) for r in rows] == [("time_saved_minutes", 11.5)]
+        assert paid_client.signals.calls == []
+
+    async def test_flush_sends_one_batch_and_deletes(self, db_session, paid_client):
+        for value in (1.0, 2.0, 3.0):
+            track_value(db_session, "vendor-1", "negotiation_email_sent", value)
+        await db_session.commit()
+
+        assert await flush_signals(db_session) == 3
+        assert len(paid_client.signals.calls) == 1
+        assert len(paid_client.signals.calls[0]) == 3
+        assert (await db_session.execute(select(PaidSignal))).scalars().all() == []
+
+    async def test_failed_batch_is_kept_with_backoff(self, db_session, monkeypatch):
+        monkeypatch.setattr(paid_service, "_client", _FakeClient(fail=True))
+        track_value(db_session, "vendor-1", "fraud_blocked_euros", 99.0)
+        await db_session.commit()
+
+        assert await flush_signals(db_session) == 0
+        row = (await db_session.execute(select(PaidSignal))).scalar_one()
+        assert row.attempts == 1
+        assert row.last_error == "paid.ai unavailable"
+        assert row.next_attempt_at > datetime.now(timezone.utc)
+        # Not due yet, so the next flush does not retry it.
+        assert await flush_signals(db_session) == 0
+
+    async def test_poison_row_does_not_block_batch(self, db_session, monkeypatch):
+        monkeypatch.setattr(paid_service, "_client", _FakeClient(poison=13.0))
+        monkeypatch.setattr(get_settings(), "paid_signal_max_attempts", 2)
+        for value in (1.0, 13.0, 2.0, 3.0):
+            track_value(db_session, "vendor-1", "fraud_blocked_euros", value)
+        await db_session.commit()
+
+        assert await flush_signals(db_session) == 3
+        row = (await db_session.execute(select(PaidSignal))).scalar_one()
+        assert row.data["value_generated"] == 13.0
+        assert (row.attempts, row.failed_at) == (1, None)
+
+        # Due again: the second failure dead-letters it and it is never claimed again.
+        row.next_attempt_at = datetime.now(timezone.utc)
+        await db_session.commit()
+        assert await flush_signals(db_session) == 0
+        await db_session.refresh(row)
+        assert row.attempts == 2
+        assert row.failed_at is not None
+        assert row.last_error
+        assert await flush_signals(db_session) == 0
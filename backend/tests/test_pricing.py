@@ -1,4 +1,19 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
 import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.cloud_pricing import CloudPricing
+from app.models.pricing_sync_run import PricingSyncRun
+from app.pricing import sync as pricing_sync
+from app.pricing.catalog import get_catalog
+from app.pricing.normalizer import _unit_fields
+from app.repositories.cloud_price_history import CloudPriceHistoryRepository
+from app.repositories.cloud_pricing import CloudPricingRepository
+from app.repositories.pricing_sync_run import PricingSyncRunRepository
 
 BASE = "/api/v1/pricing"
 
@@ -44,7 +59,261 @@ class TestPricing:
         assert len(data["items"]) == 1
         assert data["items"][0]["status"] == "NO_MATCH"
 
+    async def test_search_requires_query(self, client):
+        resp = await client.get(f"{BASE}/search")
+        assert resp.status_code == 422
+
     async def test_list_with_filters(self, client):
         resp = await client.get(BASE, params={"vendor": "aws", "category": "Compute"})
         assert resp.status_code == 200
         assert isinstance(resp.json(), list)
+
+
+def _record(sku: str, price: str, unit: str = "Hrs", **overrides) -> dict:
+    record = {
+        "vendor": "aws",
+        "service_name": "AmazonEC2",
+        "category": "Compute",
+        "sku_id": sku,
+        "description": f"test sku {sku}",
+        "region": "eu-west-1",
+        "instance_type": "t3.micro",
+        "operating_system": "Linux",
+        "price_per_unit": Decimal(price),
+        "unit": unit,
+        **_unit_fields(Decimal(price), unit),
+        "currency": "USD",
+        "effective_date": None,
+        "raw_attributes": {"sku": sku},
+        "source_api": "aws_bulk_csv",
+    }
+    record.update(overrides)
+    return record
+
+
+class TestBulkUpsert:
+    async def test_inserts_and_updates(self, db_session):
+        repo = CloudPricingRepository(db_session)
+        affected = await repo.bulk_upsert_records(
+            [_record("BULK-1", "0.01"), _record("BULK-2", "0.02")], copy_batch_size=1,
+        )
+        assert affected == 2
+
+        await repo.bulk_upsert_records([_record("BULK-1", "0.05")])
+        rows = (await db_session.execute(
+            select(CloudPricing).where(CloudPricing.sku_id.in_(["BULK-1", "BULK-2"]))
+            .order_by(CloudPricing.sku_id)
+        )).scalars().all()
+        assert [r.sku_id for r in rows] == ["BULK-1", "BULK-2"]
+        assert rows[0].price_per_unit == Decimal("0.05")
+        assert rows[0].raw_attributes == {"sku": "BULK-1"}
+
+    async def test_last_duplicate_wins(self, db_session):
+        repo = CloudPricingRepository(db_session)
+        await repo.bulk_upsert_records([_record("DUP-1", "0.10"), _record("DUP-1", "0.20")])
+        price = (await db_session.execute(
+            select(CloudPricing.price_per_unit).where(CloudPricing.sku_id == "DUP-1")
+        )).scalar_one()
+        assert price == Decimal("0.20")
+
+    async def test_empty_input(self, db_session):
+        repo = CloudPricingRepository(db_session)
+        assert await repo.bulk_upsert_records([]) == 0
+
+
+class TestPriceHistory:
+    async def test_records_changes_only(self, db_session):
+        repo = CloudPricingRepository(db_session)
+        history = CloudPriceHistoryRepository(db_session)
+        published = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+        await repo.bulk_upsert_records([_record("HIST-1", "0.10", effective_date=published)])
+        await repo.bulk_upsert_records([_record("HIST-1", "0.10", effective_date=published)])
+        assert len(await history.get_history("aws", "HIST-1", "aws_bulk_csv")) == 1
+
+        await repo.bulk_upsert_records([_record("HIST-1", "0.12", effective_date=published)])
+        rows = await history.get_history("aws", "HIST-1", "aws_bulk_csv")
+        assert [r.price_per_unit for r in rows] == [Decimal("0.10"), Decimal("0.12")]
+
+    async def test_price_at(self, db_session):
+        repo = CloudPricingRepository(db_session)
+        history = CloudPriceHistoryRepository(db_session)
+        published = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+        await repo.bulk_upsert_records([_record("HIST-2", "0.20", effective_date=published)])
+        await repo.bulk_upsert_records([_record("HIST-2", "0.25", effective_date=published)])
+
+        old = await history.get_price_at("aws", "HIST-2", "aws_bulk_csv", published + timedelta(days=30))
+        assert old.price_per_unit == Decimal("0.20")
+        assert await history.get_price_at("aws", "HIST-2", "aws_bulk_csv", published - timedelta(days=1)) is None
+
+        future = datetime.now(timezone.utc) + timedelta(days=1)
+        current = await history.get_prices_at([("aws", "HIST-2", "aws_bulk_csv")], future)
+        assert current[("aws", "HIST-2", "aws_bulk_csv")].price_per_unit == Decimal("0.25")
+
+
+class TestBestMatches:
+    async def test_tiers_and_order(self, db_session):
+        repo = CloudPricingRepository(db_session)
+        await repo.bulk_upsert_records([
+            _record("MATCH-SKU", "0.30", instance_type="m5.large", region="us-east-1"),
+            _record("MATCH-EU", "0.40", instance_type="M5.Large", region="eu-west-1"),
+            _record("MATCH-NOHOUR", "0.01", instance_type="x9.none", unit="GB-Mo"),
+        ])
+
+        matches = await repo.find_best_matches([
+            ("aws", None, "m5.large", "eu-west"),
+            ("AWS", "MATCH-SKU", "m5.large", "eu-west"),
+            ("aws", None, "nonexistent.9xlarge", None),
+            ("aws", None, "x9.none", None),
+            ("azure", "MATCH-SKU", None, None),
+        ])
+
+        assert [m.sku_id if m else None for m in matches] == ["MATCH-EU", "MATCH-SKU", None, None, None]
+
+    async def test_single_match_wrapper(self, db_session):
+        repo = CloudPricingRepository(db_session)
+        await repo.bulk_upsert_records([_record("WRAP-1", "0.50", instance_type="c5.xlarge")])
+        match = await repo.find_best_match("aws", None, "C5.XLARGE", None)
+        assert match.sku_id == "WRAP-1"
+        assert await repo.find_best_matches([]) == []
+
+
+class TestCatalogGeneration:
+    async def test_sync_bumps_generation_and_reloads(self, db_session):
+        repo = CloudPricingRepository(db_session)
+        before = await get_catalog(db_session)
+
+        await repo.bulk_upsert_records([_record("GEN-1", "0.07", instance_type="r5.large")])
+        generation, _ = await repo.get_generation()
+        assert generation == before.generation[0] + 1
+
+        after = await get_catalog(db_session, force=True)
+        assert after.generation[0] == generation
+        pos = after.find_best_match("aws", None, "r5.large", None)
+        assert after.row(pos)["sku_id"] == "GEN-1"
+
+    async def test_invoice_check_uses_catalog(self, client, db_session):
+        await CloudPricingRepository(db_session).bulk_upsert_records(
+            [_record("CHK-1", "0.50", instance_type="c6.large", region="eu-west-1")]
+        )
+        resp = await client.post(f"{BASE}/invoice/check", json={
+            "items": [{"vendor": "aws", "instance_type": "c6.large", "region": "eu-west", "hours": "10", "billed_amount": "6.00"}]
+        })
+        item = resp.json()["items"][0]
+        assert item["status"] == "OVERBILLED"
+        assert item["matched_sku"]["sku_id"] == "CHK-1"
+        assert item["expected_amount"] == "5.0000"
+
+    async def test_invoice_check_reads_description(self, client, db_session):
+        await CloudPricingRepository(db_session).bulk_upsert_records([
+            _record("DSC-EU", "0.80", instance_type="m6i.4xlarge", region="eu-west-1"),
+            _record("DSC-US", "0.77", instance_type="m6i.4xlarge", region="us-east-1"),
+        ])
+        resp = await client.post(f"{BASE}/invoice/check", json={
+            "items": [{"vendor": "aws", "description": "m6i.4xlarge Linux eu-west-1 730 Hrs", "hours": "730", "billed_amount": "584.00"}]
+        })
+        item = resp.json()["items"][0]
+        assert item["line"]["instance_type"] == "m6i.4xlarge"
+        assert item["line"]["region"] == "eu-west-1"
+        assert item["matched_sku"]["sku_id"] == "DSC-EU"
+        assert item["status"] == "OK"
+
+
+class TestSyncStatus:
+    async def test_summary_stored_by_sync(self, db_session):
+        repo = CloudPricingRepository(db_session)
+        before = await repo.get_sync_status()
+
+        await repo.bulk_upsert_records([
+            _record("STAT-1", "0.10"),
+            _record("STAT-2", "0.20", vendor="gcp", category="Storage"),
+        ])
+        status = await repo.get_sync_status()
+
+        assert status["total_skus"] == before["total_skus"] + 2
+        assert status["by_vendor"]["gcp"] == before["by_vendor"].get("gcp", 0) + 1
+        assert status["by_category"]["Storage"] == before["by_category"].get("Storage", 0) + 1
+        assert status["last_sync"] is not None
+
+    async def test_status_matches_table(self, client, db_session):
+        await CloudPricingRepository(db_session).bulk_upsert_records([_record("STAT-3", "0.30")])
+        total = len((await db_session.execute(select(CloudPricing.id))).all())
+
+        data = (await client.get(f"{BASE}/sync/status")).json()
+        assert data["total_skus"] == total
+        assert sum(data["by_vendor"].values()) == total
+        assert data["message"] == "OK"
+
+
+class TestSyncRuns:
+    async def test_lock_is_single_flight(self, engine):
+        async with engine.connect() as a, engine.connect() as b:
+            first = PricingSyncRunRepository(AsyncSession(bind=a))
+            second = PricingSyncRunRepository(AsyncSession(bind=b))
+            assert await first.try_lock() is True
+            assert await second.try_lock() is False
+            await first.unlock()
+            assert await second.try_lock() is True
+            await second.unlock()
+
+    async def test_start_sync_skips_while_locked(self, engine):
+        async with engine.connect() as conn:
+            holder = PricingSyncRunRepository(AsyncSession(bind=conn))
+            assert await holder.try_lock()
+            try:
+                run_id, started = await pricing_sync.start_sync(engine)
+            finally:
+                await holder.unlock()
+        assert started is False
+
+    async def test_run_is_recorded(self, engine, monkeypatch):
+        monkeypatch.setattr("app.services.cloud_pricing.fetch_all", lambda: {"gcp": {"status": "skipped", "reason": "test"}})
+
+        run_id, started = await pricing_sync.start_sync(engine)
+        assert started is True
+        await asyncio.gather(*pricing_sync._tasks)
+
+        async with AsyncSession(engine) as db:
+            run = await db.get(PricingSyncRun, run_id)
+            assert run.status == "succeeded"
+            assert run.finished_at is not None
+            assert run.records_seen == 0
+            assert run.sources == {"gcp": {"status": "skipped", "reason": "test"}}
+            await db.delete(run)
+            await db.commit()
+
+    async def test_runs_endpoint(self, client, db_session):
+        run = await PricingSyncRunRepository(db_session).create(status="failed", error="boom")
+
+        resp = await client.get(f"{BASE}/sync/runs")
+        assert resp.status_code == 200
+        assert any(r["id"] == str(run.id) and r["error"] == "boom" for r in resp.json())
+
+        resp = await client.get(f"{BASE}/sync/runs/{run.id}")
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "failed"
+
+    async def test_run_not_found(self, client):
+        resp = await client.get(f"{BASE}/sync/runs/00000000-0000-0000-0000-000000000000")
+        assert resp.status_code == 404
+
+
+class TestSearch:
+    async def test_ranked_hits(self, client, db_session):
+        await CloudPricingRepository(db_session).bulk_upsert_records([
+            _record("SRCH-1", "0.10", instance_type="m6i.4xlarge", description="Linux on-demand m6i.4xlarge"),
+            _record("SRCH-2", "0.20", instance_type="r6g.large", description="Linux on-demand r6g.large"),
+            _record("SRCH-3", "0.02", service_name="Blob Storage", category="Storage",
+                    instance_type=None, description="Hot LRS", vendor="azure"),
+        ])
+
+        resp = await client.get(f"{BASE}/search", params={"q": "m6i.4xlarge", "limit": 5})
+        assert resp.status_code == 200
+        hits = resp.json()
+        assert hits[0]["sku_id"] == "SRCH-1"
+        assert hits[0]["score"] > 0
+        assert all(h["score"] <= hits[0]["score"] for h in hits)
+
+        resp = await client.get(f"{BASE}/search", params={"q": "blob storage", "vendor": "azure"})
+        assert [h["sku_id"] for h in resp.json()] == ["SRCH-3"]
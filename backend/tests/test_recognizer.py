@@ -0,0 +1,39 @@
+"""Unit tests for description attribute recognition — pure logic, no DB needed."""
+
+from app.pricing.recognizer import Attributes, Recognizer
+
+_TERMS = [
+    ("instance_type", "m6i.4xlarge"),
+    ("instance_type", "m6i.large"),
+    ("instance_type", "Standard_D2"),
+    ("instance_type", "Standard_D2_v2"),
+    ("region", "eu-west-1"),
+    ("region", "us-east-1"),
+    ("region", "eu"),
+]
+
+
+class TestRecognizer:
+    def test_extracts_both_kinds(self):
+        found = Recognizer(_TERMS).recognize("M6i.4xlarge Linux EU-WEST-1 730 Hrs")
+        assert found == Attributes(instance_type="m6i.4xlarge", region="eu-west-1")
+
+    def test_whole_tokens_only(self):
+        recognizer = Recognizer(_TERMS)
+        assert recognizer.recognize("eu-west-1a xm6i.large") == Attributes()
+        assert recognizer.recognize("VM Standard_D2_v2 (westeurope)").instance_type == "Standard_D2_v2"
+        assert recognizer.recognize("Standard_D2, 10 hours").instance_type == "Standard_D2"
+
+    def test_longest_then_leftmost(self):
+        recognizer = Recognizer(_TERMS)
+        assert recognizer.recognize("us-east-1 then eu-west-1").region == "us-east-1"
+        assert recognizer.recognize("m6i.large and m6i.4xlarge").instance_type == "m6i.4xlarge"
+
+    def test_short_terms_ignored(self):
+        recognizer = Recognizer(_TERMS)
+        assert recognizer.size == 6
+        assert recognizer.recognize("Data transfer EU") == Attributes()
+
+    def test_empty(self):
+        assert Recognizer([]).recognize("m6i.4xlarge") == Attributes()
+        assert Recognizer(_TERMS).recognize(None) == Attributes()
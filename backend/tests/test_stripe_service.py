@@ -1,7 +1,7 @@
-"""Unit tests for app.services.stripe_service.execute_vendor_payment."""
+"""Unit tests for the payment outbox in app.services.stripe_service."""
 
-import uuid
-from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
 
 import stripe as stripe_lib
 from sqlalchemy import select
@@ -9,13 +9,14 @@ from sqlalchemy import select
 from app.models.vendor import Vendor
 from app.models.invoice import Invoice
 from app.models.payment import Payment
-from app.services.stripe_service import execute_vendor_payment
+from app.services import stripe_service
+from app.services.stripe_service import idempotency_key, process_pending_payments, queue_vendor_payment
 
 VENDORS = "/api/v1/vendors"
 INVOICES = "/api/v1/invoices"
 
 
-class TestExecuteVendorPayment:
+class TestVendorPaymentOutbox:
     async def _create_vendor(self, db_session, *, stripe_account_id=None):
         vendor = Vendor(
             name="Test Vendor",
@@ -32,25 +33,39 @@ class TestExecuteVendorPayment:
         await db_session.flush()
         return invoice
 
+    async def _queue(self, db_session, invoice, amount):
+        payment = await queue_vendor_payment(db_session, invoice_id=invoice.id, amount_euros=amount)
+        await db_session.commit()
+        return payment
+
+    @patch("app.services.stripe_service.stripe.Transfer.create")
+    async def test_queue_only_writes_pending_row(self, mock_transfer, db_session):
+        vendor = await self._create_vendor(db_session, stripe_account_id="acct_test")
+        invoice = await self._create_invoice(db_session, vendor.id)
+
+        payment = await self._queue(db_session, invoice, 250.00)
+
+        assert payment.status == "pending"
+        assert payment.stripe_payout_id is None
+        mock_transfer.assert_not_called()
+        # Queuing again for the same invoice returns the same intent.
+        assert (await queue_vendor_payment(db_session, invoice_id=invoice.id, amount_euros=250.00)).id == payment.id
+
     @patch("app.services.stripe_service.stripe.Transfer.create")
     async def test_successful_transfer(self, mock_transfer, db_session):
         mock_transfer.return_value = MagicMock(id="tr_test_123")
 
         vendor = await self._create_vendor(db_session, stripe_account_id="acct_test")
         invoice = await self._create_invoice(db_session, vendor.id)
+        payment = await self._queue(db_session, invoice, 250.00)
 
         # Ensure stripe.api_key is truthy so the branch executes
         with patch("app.services.stripe_service.stripe.api_key", "sk_test_fake"):
-            result = await execute_vendor_payment(
-                invoice_id=invoice.id,
-                vendor_id=vendor.id,
-                amount_euros=250.00,
-                db=db_session,
-            )
+            assert await process_pending_payments(db_session) == 1
 
-        assert result["transfer_id"] == "tr_test_123"
-        assert result["status"] == "initiated"
-        assert "payment_id" in result
+        await db_session.refresh(payment)
+        assert payment.stripe_payout_id == "tr_test_123"
+        assert payment.status == "initiated"
 
         mock_transfer.assert_called_once_with(
             amount=25000,
@@ -60,78 +75,108 @@ class TestExecuteVendorPayment:
                 "invoice_id": str(invoice.id),
                 "vendor_id": str(vendor.id),
             },
+            idempotency_key=idempotency_key(invoice.id),
         )
 
     @patch("app.services.stripe_service.stripe.Transfer.create")
     async def test_vendor_no_stripe_account(self, mock_transfer, db_session):
         vendor = await self._create_vendor(db_session, stripe_account_id=None)
         invoice = await self._create_invoice(db_session, vendor.id)
+        payment = await self._queue(db_session, invoice, 100.00)
 
-        result = await execute_vendor_payment(
-            invoice_id=invoice.id,
-            vendor_id=vendor.id,
-            amount_euros=100.00,
-            db=db_session,
-        )
+        assert await process_pending_payments(db_session) == 1
 
+        await db_session.refresh(payment)
         mock_transfer.assert_not_called()
-        assert isinstance(result["transfer_id"], str)
-        assert result["transfer_id"].startswith("local_tr_")
-        assert result["status"] == "initiated"
+        assert payment.stripe_payout_id.startswith("local_tr_")
+        assert payment.status == "initiated"
 
     async def test_vendor_not_found(self, db_session):
-        fake_invoice_id = uuid.uuid4()
-        fake_vendor_id = uuid.uuid4()
-
-        result = await execute_vendor_payment(
-            invoice_id=fake_invoice_id,
-            vendor_id=fake_vendor_id,
-            amount_euros=50.00,
-            db=db_session,
-        )
+        invoice = Invoice(vendor_id=None, total=50.00, status="approved")
+        db_session.add(invoice)
+        await db_session.flush()
+        payment = await self._queue(db_session, invoice, 50.00)
+
+        assert await process_pending_payments(db_session) == 1
 
-        assert result == {"error": "Vendor not found"}
+        await db_session.refresh(payment)
+        assert payment.status == "failed"
+        assert payment.last_error == "Vendor not found"
 
     @patch("app.services.stripe_service.stripe.Transfer.create")
     async def test_stripe_error_handled(self, mock_transfer, db_session):
-        mock_transfer.side_effect = stripe_lib.StripeError("Connection error")
+        mock_transfer.side_effect = stripe_lib.StripeError("Invalid destination")
+
+        vendor = await self._create_vendor(db_session, stripe_account_id="acct_test")
+        invoice = await self._create_invoice(db_session, vendor.id)
+        payment = await self._queue(db_session, invoice, 200.00)
+
+        with patch("app.services.stripe_service.stripe.api_key", "sk_test_fake"):
+            await process_pending_payments(db_session)
+
+        await db_session.refresh(payment)
+        assert payment.stripe_payout_id is None
+        assert payment.status == "failed"
+        assert payment.last_error == "Invalid destination"
+
+    @patch("app.services.stripe_service.stripe.Transfer.create")
+    async def test_transient_error_is_retried_later(self, mock_transfer, db_session):
+        mock_transfer.side_effect = stripe_lib.APIConnectionError("Connection error")
 
         vendor = await self._create_vendor(db_session, stripe_account_id="acct_test")
         invoice = await self._create_invoice(db_session, vendor.id)
+        payment = await self._queue(db_session, invoice, 200.00)
 
         with patch("app.services.stripe_service.stripe.api_key", "sk_test_fake"):
-            result = await execute_vendor_payment(
-                invoice_id=invoice.id,
-                vendor_id=vendor.id,
-                amount_euros=200.00,
-                db=db_session,
-            )
-
-        assert isinstance(result["transfer_id"], str)
-        assert result["transfer_id"].startswith("local_tr_")
-        assert result["status"] == "initiated"
-        assert "payment_id" in result
+            await process_pending_payments(db_session)
+            # Backed off, so an immediate second pass claims nothing.
+            assert await process_pending_payments(db_session) == 0
+
+        await db_session.refresh(payment)
+        assert payment.status == "pending"
+        assert payment.attempts == 1
+        assert payment.stripe_payout_id is None
+
+    @patch("app.services.stripe_service.stripe.Transfer.create")
+    async def test_exhausted_retries_fail_the_payment(self, mock_transfer, db_session, monkeypatch):
+        mock_transfer.side_effect = stripe_lib.APIConnectionError("Connection error")
+        monkeypatch.setattr(stripe_service.settings, "payment_max_attempts", 2)
+
+        vendor = await self._create_vendor(db_session, stripe_account_id="acct_test")
+        invoice = await self._create_invoice(db_session, vendor.id)
+        payment = await self._queue(db_session, invoice, 75.00)
+
+        with patch("app.services.stripe_service.stripe.api_key", "sk_test_fake"):
+            await process_pending_payments(db_session)
+            await db_session.refresh(payment)
+            assert (payment.status, payment.attempts) == ("pending", 1)
+
+            payment.next_attempt_at = datetime.now(timezone.utc)
+            await db_session.commit()
+            await process_pending_payments(db_session)
+
+        await db_session.refresh(payment)
+        assert payment.status == "failed"
+        assert payment.attempts == 2
+        assert payment.stripe_payout_id is None
+        assert payment.last_error == "Connection error"
+        assert mock_transfer.call_count == 2
 
     @patch("app.services.stripe_service.stripe.Transfer.create")
     async def test_internal_transfer_ids_are_unique(self, mock_transfer, db_session):
         vendor = await self._create_vendor(db_session, stripe_account_id=None)
         invoice_1 = await self._create_invoice(db_session, vendor.id)
         invoice_2 = await self._create_invoice(db_session, vendor.id)
+        await self._queue(db_session, invoice_1, 10.00)
+        await self._queue(db_session, invoice_2, 20.00)
 
-        first = await execute_vendor_payment(
-            invoice_id=invoice_1.id,
-            vendor_id=vendor.id,
-            amount_euros=10.00,
-            db=db_session,
-        )
-        second = await execute_vendor_payment(
-            invoice_id=invoice_2.id,
-            vendor_id=vendor.id,
-            amount_euros=20.00,
-            db=db_session,
-        )
+        assert await process_pending_payments(db_session) == 2
 
-        assert first["transfer_id"].startswith("local_tr_")
-        assert second["transfer_id"].startswith("local_tr_")
-        assert first["transfer_id"] != second["transfer_id"]
+        result = await db_session.execute(
+            select(Payment.stripe_payout_id).where(Payment.invoice_id.in_([invoice_1.id, invoice_2.id]))
+        )
+        first, second = result.scalars().all()
+        assert first.startswith("local_tr_")
+        assert second.startswith("local_tr_")
+        assert first != second
         mock_transfer.assert_not_called()
@@ -0,0 +1,48 @@
+"""Unit tests for pricing unit canonicalisation — pure logic, no DB needed."""
+
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from app.pricing.units import canonical_price, canonicalize_unit
+
+
+class TestCanonicalizeUnit:
+    @pytest.mark.parametrize("unit", ["Hrs", "1 Hour", "h", "hour", "hour(s)", "per hour"])
+    def test_hour_spellings(self, unit):
+        assert canonicalize_unit(unit) == ("time", "hour", Fraction(1))
+
+    @pytest.mark.parametrize("unit", ["GB-Mo", "GiBy.mo", "1 GB/Month", "GB-Month"])
+    def test_storage_spellings(self, unit):
+        assert canonicalize_unit(unit) == ("storage", "GB-month", Fraction(1))
+
+    @pytest.mark.parametrize("unit", ["GB", "1 GB", "GiBy"])
+    def test_transfer_spellings(self, unit):
+        assert canonicalize_unit(unit) == ("transfer", "GB", Fraction(1))
+
+    @pytest.mark.parametrize("unit, factor", [
+        ("100 Hours", Fraction(100)),
+        ("1/Month", Fraction(730)),
+        ("1 Minute", Fraction(1, 60)),
+        ("10K", Fraction(10_000)),
+        ("1M", Fraction(1_000_000)),
+        ("1,000,000 Requests", Fraction(1_000_000)),
+        ("TB", Fraction(1024)),
+    ])
+    def test_multipliers(self, unit, factor):
+        assert canonicalize_unit(unit).factor == factor
+
+    @pytest.mark.parametrize("unit", [None, "", "Quantity", "vCPU-Hours"])
+    def test_unrecognised(self, unit):
+        assert canonicalize_unit(unit) is None
+
+
+class TestCanonicalPrice:
+    def test_scales_to_canonical_unit(self):
+        assert canonical_price(Decimal("0.02"), canonicalize_unit("10K")) == Decimal("0.000002")
+        assert canonical_price(Decimal("73"), canonicalize_unit("1/Month")) == Decimal("0.1")
+
+    def test_missing_inputs(self):
+        assert canonical_price(None, canonicalize_unit("Hrs")) is None
+        assert canonical_price(Decimal("1"), None) is None
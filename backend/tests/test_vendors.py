@@ -1,5 +1,11 @@
+import uuid
 from decimal import Decimal
 import pytest
+from sqlalchemy import update
+
+from app.models.invoice import Invoice
+from app.models.vendor import Vendor
+from app.repositories.vendor import VendorRepository
 
 BASE = "/api/v1/vendors"
 INVOICES_BASE = "/api/v1/invoices"
@@ -64,6 +70,17 @@ class TestVendors:
         resp = await client.get(f"{BASE}/{vid}")
         assert resp.status_code == 404
 
+    async def test_cached_read_invalidated_by_update(self, client):
+        vid = (await client.post(BASE, json={"name": "Cached"})).json()["id"]
+        await client.get(f"{BASE}/{vid}")
+        hit = await client.get(f"{BASE}/{vid}")
+        assert hit.headers["x-cache"] == "HIT"
+
+        await client.patch(f"{BASE}/{vid}", json={"name": "Renamed"})
+        resp = await client.get(f"{BASE}/{vid}")
+        assert resp.headers["x-cache"] == "MISS"
+        assert resp.json()["name"] == "Renamed"
+
     async def test_trust_score_is_average_of_vendor_invoice_scores(self, client):
         create_vendor = await client.post(BASE, json={"name": "Metrics Vendor"})
         assert create_vendor.status_code == 201
@@ -95,3 +112,45 @@ class TestVendors:
         trust_score = Decimal(vendor_payload["trust_score"])
         assert vendor_payload["invoice_count"] == 3
         assert trust_score.quantize(Decimal("0.0001")) == Decimal("0.4667")
+
+
+class TestVendorMetrics:
+    async def test_metrics_follow_invoice_writes(self, client, db_session):
+        vendor_id = (await client.post(BASE, json={"name": "Running Sums"})).json()["id"]
+        vid = uuid.UUID(vendor_id)
+        db_session.add_all([
+            Invoice(vendor_id=vid, total=Decimal("100"), confidence_score=90),
+            Invoice(vendor_id=vid, total=Decimal("300"), confidence_score=70),
+            Invoice(vendor_id=vid, total=None, confidence_score=None),
+        ])
+        await db_session.commit()
+
+        data = (await client.get(f"{BASE}/{vendor_id}")).json()
+        assert data["invoice_count"] == 3
+        assert Decimal(data["avg_invoice_amount"]) == Decimal("200")
+        assert Decimal(data["trust_score"]).quantize(Decimal("0.0001")) == Decimal("0.5333")
+
+        invoices = (await client.get(INVOICES_BASE)).json()
+        for invoice in invoices:
+            if invoice["vendor_id"] == vendor_id and invoice["total"] is None:
+                assert (await client.delete(f"{INVOICES_BASE}/{invoice['id']}")).status_code == 204
+
+        data = (await client.get(f"{BASE}/{vendor_id}")).json()
+        assert data["invoice_count"] == 2
+        assert Decimal(data["trust_score"]) == Decimal("0.8")
+
+    async def test_reconcile_repairs_drift(self, db_session):
+        repo = VendorRepository(db_session)
+        vendor = await repo.create(name="Drifted")
+        db_session.add(Invoice(vendor_id=vendor.id, total=Decimal("50"), confidence_score=40))
+        await db_session.commit()
+        await db_session.execute(
+            update(Vendor).where(Vendor.id == vendor.id).values(invoice_count=7, confidence_sum=0)
+        )
+
+        assert await repo.reconcile_metrics() >= 1
+        vendor = await repo.get_by_id(vendor.id)
+        assert vendor.invoice_count == 1
+        assert vendor.avg_invoice_amount == Decimal("50")
+        assert vendor.trust_score == Decimal("0.4")
+        assert await repo.reconcile_metrics() == 0
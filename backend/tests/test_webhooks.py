@@ -3,12 +3,16 @@
 import json
 import uuid
 from datetime import datetime, timezone
-from unittest.mock import patch, MagicMock, AsyncMock
+from unittest.mock import patch, MagicMock
 
 import stripe as stripe_lib
+from sqlalchemy import func, select
 
 from app.models.invoice import Invoice
 from app.models.payment import Payment
+from app.models.stripe_webhook_event import StripeWebhookEvent
+from app.services import stripe_webhooks
+from app.services.stripe_webhooks import process_webhook_events, record_event
 
 BASE = "/api/v1/webhooks/stripe"
 
@@ -21,11 +25,20 @@ def _make_settings(*, webhook_secret="whsec_test"):
 
 def _make_event(event_type, data_object):
     return {
+        "id": f"evt_{uuid.uuid4().hex}",
         "type": event_type,
         "data": {"object": data_object},
     }
 
 
+async def _post(client, event):
+    return await client.post(
+        BASE,
+        content=json.dumps(event).encode(),
+        headers={"stripe-signature": "t=123,v1=valid"},
+    )
+
+
 class TestStripeWebhook:
     @patch("app.api.routers.webhooks.get_settings", return_value=_make_settings(webhook_secret=""))
     async def test_missing_webhook_secret(self, mock_settings, client):
@@ -52,8 +65,7 @@ class TestStripeWebhook:
 
     @patch("app.api.routers.webhooks.get_settings", return_value=_make_settings())
     @patch("app.api.routers.webhooks.stripe.Webhook.construct_event")
-    @patch("app.api.routers.webhooks.AsyncSessionLocal")
-    async def test_transfer_paid(self, mock_session_local, mock_construct, mock_settings, client, db_session):
+    async def test_transfer_paid(self, mock_construct, mock_settings, client, db_session):
         # Create invoice and payment in test DB
         invoice = Invoice(total=100.00, status="approved")
         db_session.add(invoice)
@@ -69,26 +81,22 @@ class TestStripeWebhook:
         db_session.add(payment)
         await db_session.flush()
 
-        # Mock construct_event to return a transfer.paid event
-        mock_construct.return_value = _make_event("transfer.paid", {
+        event = _make_event("transfer.paid", {
             "id": "tr_test_paid",
             "metadata": {"invoice_id": str(invoice.id)},
         })
+        mock_construct.return_value = event
 
-        # Mock AsyncSessionLocal to use our test db_session
-        mock_ctx = AsyncMock()
-        mock_ctx.__aenter__ = AsyncMock(return_value=db_session)
-        mock_ctx.__aexit__ = AsyncMock(return_value=False)
-        mock_session_local.return_value = mock_ctx
-
-        resp = await client.post(
-            BASE,
-            content=b'{"type": "transfer.paid"}',
-            headers={"stripe-signature": "t=123,v1=valid"},
-        )
+        resp = await _post(client, event)
         assert resp.status_code == 200
         assert resp.json()["status"] == "ok"
 
+        # Acknowledged before any processing
+        await db_session.refresh(payment)
+        assert payment.status == "initiated"
+
+        assert await process_webhook_events(db_session) == 1
+
         # Verify DB updates
         await db_session.refresh(payment)
         await db_session.refresh(invoice)
@@ -98,48 +106,90 @@ class TestStripeWebhook:
 
     @patch("app.api.routers.webhooks.get_settings", return_value=_make_settings())
     @patch("app.api.routers.webhooks.stripe.Webhook.construct_event")
-    @patch("app.api.routers.webhooks.AsyncSessionLocal")
-    async def test_transfer_paid_no_metadata(self, mock_session_local, mock_construct, mock_settings, client):
-        mock_construct.return_value = _make_event("transfer.paid", {
+    async def test_duplicate_event_stored_and_processed_once(self, mock_construct, mock_settings, client, db_session):
+        event = _make_event("customer.subscription.deleted", {"customer": "cus_dup"})
+        mock_construct.return_value = event
+
+        for _ in range(3):
+            resp = await _post(client, event)
+            assert resp.status_code == 200
+
+        count = await db_session.scalar(
+            select(func.count()).select_from(StripeWebhookEvent).where(StripeWebhookEvent.id == event["id"])
+        )
+        assert count == 1
+        assert await process_webhook_events(db_session) == 1
+        assert await process_webhook_events(db_session) == 0
+
+    async def test_bad_event_does_not_block_batch(self, db_session, monkeypatch):
+        monkeypatch.setattr(stripe_webhooks.settings, "stripe_webhook_max_attempts", 2)
+        invoice = Invoice(total=100.00, status="approved")
+        db_session.add(invoice)
+        await db_session.flush()
+        payment = Payment(
+            invoice_id=invoice.id, stripe_payout_id="tr_good", amount=100.00, currency="eur", status="initiated",
+        )
+        db_session.add(payment)
+        # No data.object, so applying it raises every time.
+        bad = {"id": f"evt_{uuid.uuid4().hex}", "type": "transfer.paid"}
+        await record_event(db_session, bad)
+        await record_event(db_session, _make_event("transfer.paid", {
+            "id": "tr_good", "metadata": {"invoice_id": str(invoice.id)},
+        }))
+        await db_session.commit()
+
+        assert await process_webhook_events(db_session) == 1
+        await db_session.refresh(payment)
+        assert payment.status == "confirmed"
+        row = await db_session.get(StripeWebhookEvent, bad["id"])
+        await db_session.refresh(row)
+        assert (row.attempts, row.processed_at, row.failed_at) == (1, None, None)
+        assert row.last_error
+
+        # Due again: the second failure dead-letters it and it is never claimed again.
+        row.next_attempt_at = datetime.now(timezone.utc)
+        await db_session.commit()
+        assert await process_webhook_events(db_session) == 0
+        await db_session.refresh(row)
+        assert row.attempts == 2
+        assert row.failed_at is not None
+        assert await process_webhook_events(db_session) == 0
+
+    @patch("app.api.routers.webhooks.get_settings", return_value=_make_settings())
+    @patch("app.api.routers.webhooks.stripe.Webhook.construct_event")
+    async def test_transfer_paid_no_metadata(self, mock_construct, mock_settings, client, db_session):
+        event = _make_event("transfer.paid", {
             "id": "tr_no_meta",
             "metadata": {},
         })
+        mock_construct.return_value = event
 
-        resp = await client.post(
-            BASE,
-            content=b'{"type": "transfer.paid"}',
-            headers={"stripe-signature": "t=123,v1=valid"},
-        )
+        resp = await _post(client, event)
         assert resp.status_code == 200
         assert resp.json()["status"] == "ok"
+        assert await process_webhook_events(db_session) == 1
 
     @patch("app.api.routers.webhooks.get_settings", return_value=_make_settings())
     @patch("app.api.routers.webhooks.stripe.Webhook.construct_event")
     async def test_checkout_completed(self, mock_construct, mock_settings, client):
-        mock_construct.return_value = _make_event("checkout.session.completed", {
+        event = _make_event("checkout.session.completed", {
             "customer": "cus_test",
             "metadata": {"user_id": "usr_123"},
         })
+        mock_construct.return_value = event
 
-        resp = await client.post(
-            BASE,
-            content=b'{"type": "checkout.session.completed"}',
-            headers={"stripe-signature": "t=123,v1=valid"},
-        )
+        resp = await _post(client, event)
         assert resp.status_code == 200
         assert resp.json()["status"] == "ok"
 
     @patch("app.api.routers.webhooks.get_settings", return_value=_make_settings())
     @patch("app.api.routers.webhooks.stripe.Webhook.construct_event")
     async def test_subscription_cancelled(self, mock_construct, mock_settings, client):
-        mock_construct.return_value = _make_event("customer.subscription.deleted", {
+        event = _make_event("customer.subscription.deleted", {
             "customer": "cus_test",
         })
+        mock_construct.return_value = event
 
-        resp = await client.post(
-            BASE,
-            content=b'{"type": "customer.subscription.deleted"}',
-            headers={"stripe-signature": "t=123,v1=valid"},
-        )
+        resp = await _post(client, event)
         assert resp.status_code == 200
         assert resp.json()["status"] == "ok"